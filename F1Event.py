@@ -1,16 +1,35 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import fastf1 as ff1
 import os
-import seaborn as sns
+import re
+import functools
+import warnings
+import contextlib
+import contextvars
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from fastf1.core import Laps
-from fastf1 import utils
-from fastf1 import plotting
-from timple.timedelta import strftimedelta
-from fastf1 import plotting
-from aceleration import compute_accelerations
-from typing import Optional
+from aceleration import compute_accelerations_batch, accelerations_from_arrays, to_seconds
+from session_index import SessionIndex, SectorIndex
+from live_session import LiveSession
+from telemetry_store import TelemetryStore
+from instrumentation import Instrumentation
+from race_gaps import RaceGaps
+from telemetry_tensor import TelemetryTensor
+from gg_envelope import GGEnvelope
+from lap_summary import LapSummary
+from corners import CornerTable
+from lap_index import LapIndex, LapVectors
+from cache import SessionCache, default_cache
+from compact import compact_session
+from degradation import DegradationModel, fuel_corrected_laptime
+from strategy import StrategySimulator
+from downsample import downsample as downsample_line, methods as downsample_methods
+from fastf1.core import Telemetry
+from fastf1.mvapi import get_circuit_info
+from typing import Optional, Union
 
 
 race_type_enum = {
@@ -25,44 +44,490 @@ race_type_enum = {
 }
 
 
+# Canais carregados sob demanda no modo lazy (voltas e resultados são sempre carregados)
+# 'telemetry' inclui car data e position data
+session_channels = ('telemetry', 'weather', 'messages')
+
+# Versões (maior, menor) do FastF1 cuja sequência interna de Session.load _load_concurrently reproduz;
+# nas demais o carregamento é o Session.load sequencial
+concurrent_fastf1_versions = ((3, 8),)
+
+# Motor de cada equipe (engine_manufacter)
+team_engines = {'Red Bull Racing': 'Red Bull Racing',
+                'Ferrari': 'Ferrari',
+                'Haas F1 Team': 'Ferrari',
+                'Aston Martin': 'Mercedes',
+                'Alpine': 'Alpine',
+                'Kick Sauber': 'Ferrari',
+                'Racing Bulls': 'Red Bull Racing',
+                'McLaren': 'Mercedes',
+                'Mercedes': 'Mercedes',
+                'Williams': 'Mercedes'}
+
+# Módulos de gráficos, importados só quando um gráfico é pedido (ver plots)
+plt = None
+sns = None
+plotting = None
+strftimedelta = None
+
+
+def _import_plotting():
+    global plt, sns, plotting, strftimedelta
+    if plt is None:
+        import matplotlib.pyplot as pyplot
+        import seaborn
+        from fastf1 import plotting as ff1_plotting
+        from timple.timedelta import strftimedelta as timple_strftimedelta
+        ff1_plotting.setup_mpl()
+        plt, sns, plotting, strftimedelta = pyplot, seaborn, ff1_plotting, timple_strftimedelta
+
+
+def _fastf1_version():
+    return tuple(int(part) for part in re.findall(r'\d+', ff1.__version__)[:2])
+
+
+def _delta_time(reference, compare):
+    # Tempo (s) que `compare` está atrás de `reference` em cada amostra de `reference`, como utils.delta_time:
+    # tempo de `compare` interpolado na distância de `reference`, com as distâncias escaladas para o mesmo total
+    ref_distance = reference['Distance'].to_numpy(dtype=float)
+    distance = compare['Distance'].to_numpy(dtype=float)
+    time = to_seconds(compare['Time'])
+    if len(ref_distance) == 0 or len(distance) < 2:
+        return np.full(len(ref_distance), np.nan)
+    # extrapola uma amostra em cada ponta para cobrir a volta toda
+    distance = np.concatenate(([2 * distance[0] - distance[1]], distance, [2 * distance[-1] - distance[-2]]))
+    time = np.concatenate(([2 * time[0] - time[1]], time, [2 * time[-1] - time[-2]]))
+    distance *= ref_distance[-1] / distance[-2]
+    return np.interp(ref_distance, distance, time) - to_seconds(reference['Time'])
+
+
+def _add_marker_distance(circuit_info, telemetry):
+    # Como CircuitInfo.add_marker_distance, com a telemetria de uma volta (amostras de posição) já em mãos
+    if 'Source' in telemetry.columns:
+        telemetry = telemetry[telemetry['Source'] == 'pos']
+    xy = telemetry[['X', 'Y']].to_numpy(dtype=float)
+    distance = telemetry['Distance'].to_numpy(dtype=float)
+    for markers in (circuit_info.corners, circuit_info.marshal_sectors, circuit_info.marshal_lights):
+        error = ((xy[None, :, :] - markers[['X', 'Y']].to_numpy(dtype=float)[:, None, :]) ** 2).sum(axis=2)
+        markers['Distance'] = distance[np.nanargmin(error, axis=1)] if len(markers) else []
+
+
+def requires(*channels):
+    # Garante que os canais da sessão usados pelo método estejam carregados
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            self.load_channels(*channels)
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def plots(method):
+    # Métodos que desenham: importam matplotlib/seaborn e configuram o FastF1 na primeira chamada
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _import_plotting()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def traced(method):
+    # Mede o tempo do método em self.instrumentation (sem custo relevante quando desligada)
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.instrumentation.span(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class F1Event:
-    def __init__(self, year, place, modality):
+    def __init__(self, year, place, modality, acceleration_cache_size: int = 64,
+                 lazy: bool = False, channels: Optional[list] = None, telemetry_store: Optional[str] = None,
+                 save_figures: bool = True, session: Optional[ff1.core.Session] = None,
+                 instrument: bool = False, concurrent: bool = False, compact: bool = False,
+                 cache: Optional[Union[SessionCache, str]] = None, downsample: Optional[str] = None,
+                 downsample_points: int = 250):
         self.year = year
         self.place = place
         self.modality = modality
-        if not os.path.exists('../cache'):
-            os.makedirs('../cache')
-        ff1.Cache.enable_cache('../cache')
-        self.event = ff1.get_session(self.year,self.place,self.modality)
-        self.event.load()
-        plotting.setup_mpl()
-
+        # Alguns gráficos são salvos no diretório atual (Engine.png, car_characteristics.png, ...)
+        self.save_figures = save_figures
+        # Decimação das linhas dos gráficos ('minmax' ou 'lttb'), até downsample_points pontos por linha
+        if downsample is not None and downsample not in downsample_methods:
+            raise ValueError(f"Unknown downsampling method '{downsample}', expected one of {downsample_methods}")
+        self.downsample = downsample
+        self.downsample_points = downsample_points
+        # Acelerações já calculadas por (piloto, volta), descartando as menos usadas
+        self.acceleration_cache_size = acceleration_cache_size
+        self._acceleration_cache = OrderedDict()
+        # Matrizes de gaps por número de pilotos de referência (ver race_gaps)
+        self._race_gaps = dict()
+        self._degradation_model = None
+        # Tempos por método/fase e contadores; ver instrumentation.Instrumentation
+        self.instrumentation = Instrumentation(enabled=instrument)
+        # Carrega voltas, telemetria, clima e mensagens em paralelo (ver _load_concurrently)
+        self.concurrent = concurrent
+        if concurrent and _fastf1_version() not in concurrent_fastf1_versions:
+            warnings.warn(f"concurrent loading is not supported with FastF1 {ff1.__version__}, loading sequentially")
+        self._circuit_info = None
+        # Categóricos e tipos numéricos menores nas voltas, telemetria em float32 (ver compact.py)
+        self.compact = compact
+        self.memory_saved = dict()
+        # Cache do FastF1 (diretório, limite de tamanho, hits/misses); ver cache.SessionCache
+        if isinstance(cache, str):
+            cache = SessionCache(cache)
+        self.cache = cache
+        if session is not None:
+            # Sessão já carregada (ex.: sessões sintéticas dos benchmarks)
+            self.event = session
+            self._loaded_channels = set(session_channels)
+        elif lazy:
+            # Carrega apenas voltas e resultados; os demais canais vêm em load_channels
+            channels = set(channels or [])
+            self._open_session()
+            self._load(laps=True, telemetry='telemetry' in channels,
+                       weather='weather' in channels, messages='messages' in channels)
+            self._loaded_channels = channels
+        else:
+            # Com telemetry_store a telemetria bruta só é lida se faltar alguma volta no store (load_channels)
+            channels = set(session_channels) - ({'telemetry'} if telemetry_store is not None else set())
+            self._open_session()
+            self._load(telemetry='telemetry' in channels)
+            self._loaded_channels = channels
+        if self.compact:
+            self._compact(laps=True, telemetry='telemetry' in self._loaded_channels)
+        self._build_session_index()
+        # Telemetria por volta já processada (distância e acelerações), lida via memory map
+        self.telemetry_store = None
+        if telemetry_store is not None:
+            self.telemetry_store = TelemetryStore(os.path.join(telemetry_store, str(self.year), str(self.place), self.modality))
+
+    def _open_session(self):
+        if self.cache is None:
+            self.cache = default_cache()
+        self.event = self.cache.get_session(self.year, self.place, self.modality)
+
+    def _track_cache(self):
+        # Leituras do cache durante a carga; sessões passadas prontas não usam o cache
+        if self.cache is None:
+            return contextlib.nullcontext()
+        return self.cache.track(self.event)
+
+    @classmethod
+    async def aload(cls, year, place, modality, **kwargs):
+        # Construtor assíncrono, ex.: event = await F1Event.aload(2024, 'Monza', 'R')
+        kwargs.setdefault('concurrent', True)
+        return await asyncio.to_thread(cls, year, place, modality, **kwargs)
+
+    def _load(self, laps=True, telemetry=True, weather=True, messages=True):
+        with self.instrumentation.span('load'), self._track_cache():
+            if self.concurrent and _fastf1_version() in concurrent_fastf1_versions:
+                self._load_concurrently(laps=laps, telemetry=telemetry, weather=weather, messages=messages)
+            else:
+                self.event.load(laps=laps, telemetry=telemetry, weather=weather, messages=messages)
+
+    def _load_laps(self):
+        # Mesma sequência de Session.load para as voltas (dependem do status e da contagem de voltas)
+        session = self.event
+        session._load_session_status_data()
+        session._load_total_lap_count()
+        session._load_track_status_data()
+        session._load_laps_data()
+        session._add_first_lap_time_from_ergast()
+        session._fix_missing_laps_retired_on_track()
+
+    def _load_laps_and_telemetry(self, laps=True, telemetry=True):
+        # Em sequência, como em Session.load: _load_telemetry lê e altera session._laps (LapStartDate)
+        if laps:
+            self._load_laps()
+        if telemetry:
+            self.event._load_telemetry()
+
+    def _fetch_circuit_info(self):
+        # Mesma consulta de Session.get_circuit_info; as distâncias dos marcadores são calculadas depois
+        circuit = self.event.session_info['Meeting']['Circuit']
+        circuit_key = 146 if (circuit['Key'] == 149 and circuit['ShortName'] == 'Mugello') else circuit['Key']
+        return get_circuit_info(year=self.event.event.year, circuit_key=circuit_key)
+
+    def _load_concurrently(self, laps=True, telemetry=True, weather=True, messages=True):
+        # Session.load com os passos independentes em paralelo: info || pilotos, depois
+        # (voltas -> telemetria) || clima || mensagens || circuito; a telemetria altera _laps
+        session = self.event
+        with ThreadPoolExecutor() as pool:
+            def submit(step):
+                # cada passo numa cópia do contexto atual (contagem de hits/misses do cache)
+                return pool.submit(contextvars.copy_context().run, step)
+
+            for future in [submit(session._load_session_info), submit(session._load_drivers_results)]:
+                future.result()
+
+            steps = []
+            circuit_info = None
+            if session.f1_api_support:
+                if laps or telemetry:
+                    steps.append(submit(functools.partial(self._load_laps_and_telemetry, laps, telemetry)))
+                if telemetry:
+                    circuit_info = submit(self._fetch_circuit_info)
+                if weather:
+                    steps.append(submit(session._load_weather_data))
+                if messages:
+                    steps.append(submit(session._load_race_control_messages))
+            for future in steps:
+                future.result()
+
+        session._set_laps_deleted_from_rcm()
+        session._calculate_quali_like_session_results()
+        session._calculate_race_like_session_results()
+
+        if circuit_info is not None:
+            try:
+                self._circuit_info = circuit_info.result()
+                self._circuit_info.add_marker_distance(reference_lap=session.laps.pick_fastest())
+            except Exception:
+                # fica para circuit_info(), como no carregamento sequencial
+                self._circuit_info = None
+
+    def _compact(self, laps=True, telemetry=True):
+        with self.instrumentation.span('compact'):
+            saved = compact_session(self.event, laps=laps, telemetry=telemetry)
+        for table, n_bytes in saved.items():
+            self.memory_saved[table] = self.memory_saved.get(table, 0) + n_bytes
+
+    def _build_session_index(self):
+        with self.instrumentation.span('session_index'):
+            self.session_index = SessionIndex(self.event)
+        self._sector_index = None
+        self._lap_summary = None
+        self._corner_table = None
+        self._lap_vectors = None
+        self.instrumentation.count('index_rows', len(self.event.laps))
+
+    @property
+    def sector_index(self):
+        # Melhores setores de cada piloto, calculados na primeira consulta
+        if self._sector_index is None:
+            self._sector_index = SectorIndex(self.event)
+        return self._sector_index
+
+    @property
+    def lap_summary(self):
+        # Velocidades, acelerador, freio e trocas de marcha de cada volta, só do car data (ver lap_summary.py)
+        if self._lap_summary is None:
+            self.load_channels('telemetry')
+            with self.instrumentation.span('lap_summary'):
+                self._lap_summary = LapSummary(self.event)
+        return self._lap_summary
+
+    @property
+    def corner_table(self):
+        # Entrada, ápice, saída e frenagem de cada curva em todas as voltas (ver corners.py)
+        if self._corner_table is None:
+            corners = self.circuit_info().corners
+            with self.instrumentation.span('corner_table'):
+                self._corner_table = CornerTable(self.event, corners)
+        return self._corner_table
+
+    @property
+    def lap_vectors(self):
+        # Velocidade, acelerador e freio de cada volta numa grade fixa de frações da volta (ver lap_index.py)
+        if self._lap_vectors is None:
+            self.load_channels('telemetry')
+            with self.instrumentation.span('lap_vectors'):
+                self._lap_vectors = LapVectors(self.event)
+        return self._lap_vectors
+
+    @traced
+    def append_laps(self, laps: pd.DataFrame):
+        # Voltas novas (ex.: live.LiveReplay): índice e gaps são atualizados só com as linhas novas
+        laps = laps.reset_index(drop=True)
+        if isinstance(self.event, LiveSession):
+            # a tabela de voltas só é concatenada na próxima leitura de event.laps
+            start = self.event.append_laps(laps)
+        else:
+            start = len(self.event.laps)
+            self.event._laps = Laps(pd.concat([self.event.laps, laps], ignore_index=True), session=self.event)
+        self.session_index.append(laps, start)
+        for gaps in self._race_gaps.values():
+            gaps.append(laps)
+        self._sector_index = None
+        self._lap_summary = None
+        self._corner_table = None
+        self._lap_vectors = None
+        self._degradation_model = None
+        self.instrumentation.count('appended_laps', len(laps))
+
+    def _reset_caches(self):
+        # Descarta tudo que foi calculado a partir da sessão (ex.: medições a frio nos benchmarks)
+        self._acceleration_cache.clear()
+        self._race_gaps = dict()
+        self._degradation_model = None
+        self._sector_index = None
+        self._lap_summary = None
+        self._corner_table = None
+        self._lap_vectors = None
+
+    def load_channels(self, *channels):
+        # Declara (e carrega) os canais que serão usados, ex.: load_channels('telemetry', 'weather')
+        for channel in channels:
+            if channel not in session_channels:
+                raise ValueError(f"Unknown channel '{channel}', expected one of {session_channels}")
+            if channel in self._loaded_channels:
+                continue
+            with self.instrumentation.span(f'load_{channel}'), self._track_cache():
+                if channel == 'telemetry':
+                    self.event._load_telemetry()
+                elif channel == 'weather':
+                    self.event._load_weather_data()
+                elif channel == 'messages':
+                    self.event._load_race_control_messages()
+                    # voltas deletadas pela direção de prova afetam pick_fastest
+                    self.event._set_laps_deleted_from_rcm()
+            if channel == 'telemetry' and self.compact:
+                self._compact(laps=False, telemetry=True)
+            if channel == 'messages':
+                self._build_session_index()
+            self._loaded_channels.add(channel)
+
+    def _save_figure(self, name):
+        if self.save_figures:
+            with self.instrumentation.span('savefig'):
+                plt.savefig(name, dpi=350)
+
+    def _plot_line(self, ax, x, y, *args, **kwargs):
+        # ax.plot com a decimação opcional (ver downsample.py)
+        if self.downsample is not None:
+            n_points = len(x)
+            x, y = downsample_line(x, y, self.downsample_points, self.downsample)
+            self.instrumentation.count('downsampled_points', n_points - len(x))
+        return ax.plot(x, y, *args, **kwargs)
+
+    def _fetch_telemetry(self, laps, driver_ahead: bool = True):
+        # Merge de car data e position data do FastF1 (a parte cara de get_telemetry)
+        # Sem driver_ahead, pula add_driver_ahead (DriverAhead/DistanceToDriverAhead), que domina o custo
+        with self.instrumentation.span('fetch_telemetry'):
+            if driver_ahead:
+                telemetry = laps.get_telemetry()
+            else:
+                pos_data = laps.get_pos_data(pad=1, pad_side='both')
+                car_data = laps.get_car_data(pad=1, pad_side='both').add_distance().add_relative_distance()
+                telemetry = pos_data.merge_channels(car_data).slice_by_lap(laps, interpolate_edges=True)
+        self.instrumentation.count('telemetry_fetches')
+        self.instrumentation.count('telemetry_rows', len(telemetry))
+        return telemetry
+
+    @traced
     def get_laps(self, drv:str):
+        if drv in self.session_index.driver_rows:
+            return self.session_index.laps(drv)
         return self.event.laps.pick_drivers(drv)
     
+    @traced
+    def get_lap_telemetry(self, drv: str, lap_number: int, driver_ahead: bool = True):
+        lap = self.session_index.lap(drv, lap_number)
+        if self.telemetry_store is not None and (drv, lap_number) in self.telemetry_store:
+            self.instrumentation.count('telemetry_store_hits')
+            return Telemetry(self.telemetry_store.read_lap(drv, lap_number), session=self.event, driver=lap['DriverNumber'])
+        self.load_channels('telemetry')
+        return self._fetch_telemetry(lap, driver_ahead).add_distance()
+
+    @traced
+    def persist_telemetry(self, drivers: Optional[list] = None, accelerations: bool = True):
+        # Grava no telemetry_store todas as voltas cronometradas dos pilotos que ainda não estão lá
+        if self.telemetry_store is None:
+            raise ValueError("F1Event was created without a telemetry_store")
+        if drivers is None:
+            drivers = self.session_index.drivers()
+
+        keys = []
+        for drv in drivers:
+            drv_laps = self.get_laps(drv)
+            drv_laps = drv_laps[drv_laps['LapStartTime'].notna() & drv_laps['Time'].notna()]
+            keys += [(drv, int(lap_number)) for lap_number in drv_laps['LapNumber']
+                     if (drv, lap_number) not in self.telemetry_store]
+        if not keys:
+            return
+
+        telemetries = [self.get_lap_telemetry(*key) for key in keys]
+        if accelerations:
+            for telemetry, (lon_acc, lat_acc) in zip(telemetries, self.get_accelerations(keys, telemetries)):
+                telemetry['LonAcc'] = lon_acc
+                telemetry['LatAcc'] = lat_acc
+        with self.instrumentation.span('write_telemetry_store'):
+            self.telemetry_store.write_laps(dict(zip(keys, telemetries)))
+
+    @traced
+    def get_accelerations(self, laps: list, telemetries: Optional[list] = None):
+        # laps: lista de (piloto, volta); devolve (longitudinal, lateral) na mesma ordem
+        keys = [(drv, int(lap_number)) for drv, lap_number in laps]
+        computed = {}
+        missing = [idx for idx, key in enumerate(keys) if key not in self._acceleration_cache]
+        self.instrumentation.count('acceleration_cache_hits', len(keys) - len(missing))
+        self.instrumentation.count('acceleration_cache_misses', len(missing))
+        if missing:
+            if telemetries is None:
+                # as acelerações não usam DriverAhead (ver _fetch_telemetry)
+                missing_telemetry = [self.get_lap_telemetry(*keys[idx], driver_ahead=False) for idx in missing]
+            else:
+                missing_telemetry = [telemetries[idx] for idx in missing]
+            # acelerações gravadas no telemetry_store não precisam ser recalculadas
+            pending = []
+            for idx, tel in zip(missing, missing_telemetry):
+                if 'LonAcc' in tel.columns and tel['LonAcc'].notna().all():
+                    computed[keys[idx]] = (tel['LonAcc'].to_numpy(), tel['LatAcc'].to_numpy())
+                else:
+                    pending.append((idx, tel))
+            if pending:
+                with self.instrumentation.span('compute_accelerations'):
+                    accelerations = compute_accelerations_batch([tel for _, tel in pending])
+                self.instrumentation.count('acceleration_rows', sum(len(tel) for _, tel in pending))
+                for (idx, _), acc in zip(pending, accelerations):
+                    computed[keys[idx]] = acc
+
+        result = []
+        for key in keys:
+            if key in computed:
+                self._acceleration_cache[key] = computed[key]
+            result.append(self._acceleration_cache[key])
+            self._acceleration_cache.move_to_end(key)
+
+        while len(self._acceleration_cache) > self.acceleration_cache_size:
+            self._acceleration_cache.popitem(last=False)
+        return result
+
+    @traced
     def get_laps_race(self):
         return self.event.laps
     
+    @traced
     def get_drivers(self):
         return list(self.event.results['Abbreviation'])
     
-    def plot_bargraph_times(self):
-        list_fastest_laps = list()    
+    def _fastest_laps(self):
+        # Volta mais rápida de cada piloto, na ordem dos resultados
+        list_fastest_laps = list()
         for drv in self.event.results['Abbreviation']:
-                drvs_fastest_lap = self.event.laps.pick_drivers(drv).pick_fastest()
-                if not pd.isna(drvs_fastest_lap['LapTime']):
-                    list_fastest_laps.append(drvs_fastest_lap)
-        fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
+            drvs_fastest_lap = self.session_index.fastest_lap(drv)
+            if drvs_fastest_lap is not None:
+                list_fastest_laps.append(drvs_fastest_lap)
+        return list_fastest_laps
 
+    @traced
+    @requires('messages')
+    def bargraph_times_data(self):
+        # Volta mais rápida de cada piloto e diferença para a pole: Driver, Team, LapNumber, LapTime, LapTimeDelta
+        fastest_laps = Laps(self._fastest_laps()).sort_values(by='LapTime').reset_index(drop=True)
         pole_lap = fastest_laps.pick_fastest()
         fastest_laps['LapTimeDelta'] = fastest_laps['LapTime'] - pole_lap['LapTime']
-        team_colors = list()
-        for index, lap in fastest_laps.iterlaps():
-            color = ff1.plotting.get_team_color(lap['Team'], session = self.event)
-            team_colors.append(color)
+        return fastest_laps[['Driver', 'Team', 'LapNumber', 'LapTime', 'LapTimeDelta']]
 
+    @traced
+    @plots
+    def plot_bargraph_times(self):
+        fastest_laps = self.bargraph_times_data()
+        pole_lap = fastest_laps.iloc[0]
+        team_colors = [self.session_index.team_color[drv] for drv in fastest_laps['Driver']]
 
-            
         fig, ax = plt.subplots(figsize=(12, 6.75))
         ax.barh(fastest_laps.index, fastest_laps['LapTimeDelta'],
                 color=team_colors, edgecolor='grey')
@@ -77,152 +542,222 @@ class F1Event:
         plt.suptitle(f"{self.event.event['EventName']} {self.year} \n"
                 f"Fastest Lap: {lap_time_string} ({pole_lap['Driver']})")
         
+    @traced
+    def bargraph_best_sectors_data(self, n_drivers: int = 8):
+        # Melhores tempos de setor dos n_drivers primeiros em cada setor: Sector, Driver, Time, LapNumber
+        rankings = [self.sector_index.ranking(sector)[0:n_drivers].assign(Sector=sector)
+                    for sector in SectorIndex.sectors]
+        return pd.concat(rankings, ignore_index=True)[['Sector', 'Driver', 'Time', 'LapNumber']]
+
+    @traced
+    @plots
     def plot_bargraph_best_sectors(self):
         fig, axes = plt.subplots(nrows=1, ncols=3, figsize=(18, 6))
-        
-        self.event.laps['Sector1TimeSeconds'] = self.event.laps['Sector1Time'].dt.total_seconds()
-        self.event.laps['Sector2TimeSeconds'] = self.event.laps['Sector2Time'].dt.total_seconds()
-        self.event.laps['Sector3TimeSeconds'] = self.event.laps['Sector3Time'].dt.total_seconds()
-
-
-        # Organize os dados e ordene-os pelo tempo do setor
-        sorted_data_s1 = pd.DataFrame(self.event.laps.sort_values(by='Sector1TimeSeconds').drop_duplicates(subset='Driver')[0:8].reset_index())
-        sorted_data_s2 = pd.DataFrame(self.event.laps.sort_values(by='Sector2TimeSeconds').drop_duplicates(subset='Driver')[0:8].reset_index())
-        sorted_data_s3 = pd.DataFrame(self.event.laps.sort_values(by='Sector3TimeSeconds').drop_duplicates(subset='Driver')[0:8].reset_index())
+        data = self.bargraph_best_sectors_data()
 
-        # Gráfico 1: Popularidade x Energia com escala logarítmica
-        sns.barplot(data=sorted_data_s1, x="Sector1TimeSeconds", y="Driver", ax=axes[0], errorbar=None, hue="Driver")
-        axes[0].set_title('S1 Time')
-        xmin = sorted_data_s1['Sector1TimeSeconds'][0]
-        axes[0].set_xlim(xmin=xmin , xmax = sorted_data_s1['Sector1TimeSeconds'][6] + 0.2)
-
-        sns.barplot(data=sorted_data_s2, x="Sector2TimeSeconds", y="Driver", ax=axes[1], errorbar=None, hue="Driver")
-        axes[1].set_title('S2 Time')
-        xmin = sorted_data_s2['Sector2TimeSeconds'][0]
-        axes[1].set_xlim(xmin=xmin , xmax = sorted_data_s2['Sector2TimeSeconds'][6]+ 0.2)
-
-        sns.barplot(data=sorted_data_s3, x="Sector3TimeSeconds", y="Driver", ax=axes[2], errorbar=None , hue="Driver")
-        axes[2].set_title('S3 Time')
-        xmin = sorted_data_s3['Sector3TimeSeconds'][0]
-        axes[2].set_xlim(xmin=xmin , xmax = sorted_data_s3['Sector3TimeSeconds'][6]+ 0.2)
+        for ax, sector in zip(axes, SectorIndex.sectors):
+            # Melhores tempos de setor de cada piloto, já ordenados (ver session_index.SectorIndex)
+            sorted_data = data[data['Sector'] == sector].reset_index(drop=True)
+            if sorted_data.empty:
+                continue
+            sns.barplot(data=sorted_data, x="Time", y="Driver", ax=ax, errorbar=None, hue="Driver")
+            ax.set_title(f'S{sector} Time')
+            ax.set_xlim(xmin=sorted_data['Time'].iloc[0], xmax=sorted_data['Time'].iloc[min(6, len(sorted_data) - 1)] + 0.2)
 
         plt.show()
 
         
-    def telemetry_between_drivers(self, drv1: str , drv2:str, lap_number:list = []):
-        drv1_laps = self.event.laps.pick_drivers(drv1)        
-        drv2_laps = self.event.laps.pick_drivers(drv2)
-        circuit_info = self.event.get_circuit_info()
-
-
-        if lap_number == []:
-            drv1_telemetry = drv1_laps.pick_fastest().get_telemetry().add_distance()
-            drv2_telemetry = drv2_laps.pick_fastest().get_telemetry().add_distance()
-            
-            laps_drv_1 = drv1_laps.pick_fastest()
-            laps_drv_2 = drv2_laps.pick_fastest()
-            lap_number.append(int(laps_drv_1['LapNumber']))
-            lap_number.append(int(laps_drv_2['LapNumber']))
-
-            lap_time_drv_1 = drv1_laps.pick_fastest()['LapTime']
-            lap_time_drv_2 = drv2_laps.pick_fastest()['LapTime']
-        else:
-            drv1_telemetry = drv1_laps[drv1_laps.LapNumber == lap_number[0]].get_telemetry().add_distance()
-            drv2_telemetry = drv2_laps[drv2_laps.LapNumber == lap_number[1]].get_telemetry().add_distance()
-    
-            laps_drv_1 = drv1_laps[drv1_laps.LapNumber == lap_number[0]]
-            laps_drv_2 = drv2_laps[drv2_laps.LapNumber == lap_number[1]]
-
-            lap_time_drv_1 = drv1_laps[drv1_laps.LapNumber == lap_number[0]].reset_index()['LapTime'][0]
-            lap_time_drv_2 = drv2_laps[drv2_laps.LapNumber == lap_number[1]].reset_index()['LapTime'][0]
-
-        color_drv1 = ff1.plotting.get_team_color(drv1_laps['Team'].reset_index(drop = True)[0], session = self.event)
-        color_drv2 = ff1.plotting.get_team_color(drv2_laps['Team'].reset_index(drop = True)[0], session = self.event)
-        
+    @traced
+    @requires('messages')
+    def telemetry_between_drivers_data(self, drv1: str, drv2: str, lap_number: Optional[list] = None):
+        # Telemetria de duas voltas (padrão: as mais rápidas) com acelerações e Delta (s atrás de drv1, só nas linhas de drv1)
+        if lap_number is None:
+            lap_number = [int(self.session_index.fastest_lap(drv)['LapNumber']) for drv in (drv1, drv2)]
+        keys = [(drv1, int(lap_number[0])), (drv2, int(lap_number[1]))]
+        laps = [self.session_index.lap(*key) for key in keys]
+        telemetries = [self.get_lap_telemetry(*key, driver_ahead=False) for key in keys]
+        accelerations = self.get_accelerations(keys, telemetries)
+
+        # a telemetria vem do telemetry_store quando as voltas estão lá (sem ler car/pos data brutos)
+        delta = _delta_time(telemetries[0], telemetries[1])
+
+        frames = []
+        for idx, ((drv, lap), lap_data, tel, (lon_acc, lat_acc)) in enumerate(zip(keys, laps, telemetries, accelerations)):
+            frames.append(pd.DataFrame({'Reference': idx == 0, 'Driver': drv, 'LapNumber': lap,
+                                        'LapTime': lap_data['LapTime'],
+                                        'Distance': tel['Distance'].to_numpy(), 'Speed': tel['Speed'].to_numpy(),
+                                        'Throttle': tel['Throttle'].to_numpy(), 'Brake': tel['Brake'].to_numpy(),
+                                        'LonAcc': lon_acc, 'LatAcc': lat_acc,
+                                        'Delta': delta if idx == 0 else np.nan}))
+        return pd.concat(frames, ignore_index=True)
+
+    @traced
+    @plots
+    def telemetry_between_drivers(self, drv1: str , drv2:str, lap_number: Optional[list] = None):
+        data = self.telemetry_between_drivers_data(drv1, drv2, lap_number)
+        drv1_telemetry = data[data['Reference']]
+        drv2_telemetry = data[~data['Reference']]
+        lap_number = [drv1_telemetry['LapNumber'].iloc[0], drv2_telemetry['LapNumber'].iloc[0]]
+        circuit_info = self.circuit_info()
+
+        color_drv1 = plotting.get_team_color(self.session_index.team[drv1], session = self.event)
+        color_drv2 = plotting.get_team_color(self.session_index.team[drv2], session = self.event)
 
         if(color_drv1 == color_drv2):
             color_drv2 = "#B9DCE3"
 
-        delta_time , ref_tel , compare_tel = utils.delta_time(laps_drv_1, laps_drv_2)
-
         plot_ratios = [1, 3, 2, 2, 2, 2]
-        
 
         fig, ax = plt.subplots(6, gridspec_kw={'height_ratios': plot_ratios}, figsize=(22, 12))
-        lap_time_drv1_string = strftimedelta(lap_time_drv_1, '%m:%s.%ms')
-        lap_time_drv2_string = strftimedelta(lap_time_drv_2, '%m:%s.%ms')
+        lap_time_drv1_string = strftimedelta(drv1_telemetry['LapTime'].iloc[0], '%m:%s.%ms')
+        lap_time_drv2_string = strftimedelta(drv2_telemetry['LapTime'].iloc[0], '%m:%s.%ms')
 
         plt.suptitle(f"{self.event.event['EventName']} {self.year} \n"
                             f"{drv1} ({lap_time_drv1_string}) vs {drv2} ({lap_time_drv2_string}) ")
 
-
-        ax[0].plot(ref_tel['Distance'], delta_time, ls='--')
+        self._plot_line(ax[0], drv1_telemetry['Distance'], drv1_telemetry['Delta'], ls='--')
         ax[0].set(ylabel=f"<-- {drv2}  ahead | {drv1} ahead -->")
 
-        ax[1].plot(drv1_telemetry['Distance'],drv1_telemetry['Speed'], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1 )
-        ax[1].plot(drv2_telemetry['Distance'], drv2_telemetry['Speed'], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
+        self._plot_line(ax[1], drv1_telemetry['Distance'],drv1_telemetry['Speed'], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1 )
+        self._plot_line(ax[1], drv2_telemetry['Distance'], drv2_telemetry['Speed'], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
         ax[1].set(ylabel = 'Speed', xlabel = "Distance")
         ax[1].legend(loc = "lower right")
         ax[1].vlines(x=circuit_info.corners['Distance'], ymin=min(drv1_telemetry['Speed'].min(), drv2_telemetry['Speed'].min()) - 20, 
                     ymax=max(drv1_telemetry['Speed'].max(), drv2_telemetry['Speed'].max())+20,
         linestyles='dotted', colors='grey')
         
-        for _, corner in circuit_info.corners.iterrows():
-            txt = f"T{corner['Number']}{corner['Letter']}"
-            ax[1].text(corner['Distance'], min(drv1_telemetry['Speed'].min(), drv2_telemetry['Speed'].min()) -30, txt,
+        corners = circuit_info.corners
+        for number, letter, distance in zip(corners['Number'], corners['Letter'], corners['Distance']):
+            ax[1].text(distance, min(drv1_telemetry['Speed'].min(), drv2_telemetry['Speed'].min()) -30, f"T{number}{letter}",
                     va='center_baseline', ha='center', size='small')
 
-        ax[2].plot(drv1_telemetry['Distance'],drv1_telemetry['Throttle'], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1)
-        ax[2].plot(drv2_telemetry['Distance'], drv2_telemetry['Throttle'], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
-        ax[2].set(ylabel = 'Throttle', xlabel = "Distance")
-        ax[2].legend(loc = "lower right")
-
-        ax[3].plot(drv1_telemetry['Distance'],drv1_telemetry['Brake'], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1)
-        ax[3].plot(drv2_telemetry['Distance'], drv2_telemetry['Brake'], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
-        ax[3].set(ylabel = 'Brake', xlabel = "Distance")
-        ax[3].legend(loc = "lower right")
-
-        ax[4].plot(drv1_telemetry['Distance'],compute_accelerations(drv1_telemetry)[0], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1)
-        ax[4].plot(drv2_telemetry['Distance'], compute_accelerations(drv2_telemetry)[0], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
-        ax[4].set(ylabel = 'Longitudinal Acelerration', xlabel = "Distance")
-        ax[4].legend(loc = "lower right")
-
-        ax[5].plot(drv1_telemetry['Distance'],compute_accelerations(drv1_telemetry)[1], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1)
-        ax[5].plot(drv2_telemetry['Distance'], compute_accelerations(drv2_telemetry)[1], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
-        ax[5].set(ylabel = 'Lateral Acelerration', xlabel = "Distance")
-        ax[5].legend(loc = "lower right")
+        for axis, channel, label in ((ax[2], 'Throttle', 'Throttle'), (ax[3], 'Brake', 'Brake'),
+                                     (ax[4], 'LonAcc', 'Longitudinal Acelerration'),
+                                     (ax[5], 'LatAcc', 'Lateral Acelerration')):
+            self._plot_line(axis, drv1_telemetry['Distance'], drv1_telemetry[channel], label = f'{drv1}  Lap: {lap_number[0]}', color = color_drv1)
+            self._plot_line(axis, drv2_telemetry['Distance'], drv2_telemetry[channel], label = f'{drv2} Lap: {lap_number[1]}', color = color_drv2)
+            axis.set(ylabel = label, xlabel = "Distance")
+            axis.legend(loc = "lower right")
     
+    @traced
+    @requires('telemetry', 'messages')
+    def corner_data(self, drivers: Optional[list] = None, lap_number: Optional[list] = None,
+                    reference: Optional[str] = None):
+        # Tabela de curvas das voltas escolhidas com TimeLost (s) para a volta mais rápida de `reference`
+        table = self.corner_table
+        if reference is None:
+            fastest_laps = self._fastest_laps()
+            if not fastest_laps:
+                raise ValueError("No driver has a timed lap to use as the corner reference")
+            reference = min(fastest_laps, key=lambda lap: lap['LapTime'])['Driver']
+        if reference not in self.session_index.fastest_rows:
+            raise ValueError(f"{reference} has no timed lap to use as the corner reference")
+        rows = table.table['Row']
+        selected = np.ones(len(rows), dtype=bool)
+        if drivers is not None:
+            selected &= table.table['Driver'].isin(drivers).to_numpy()
+        if lap_number is not None:
+            selected &= table.table['LapNumber'].isin(lap_number).to_numpy()
+        return table.time_lost(self.session_index.fastest_rows[reference], rows=rows[selected].unique())
+
+    @traced
+    @plots
+    def corner_analysis(self, drivers: list, reference: Optional[str] = None):
+        # Tempo perdido em cada curva na volta mais rápida de cada piloto (pilotos sem volta válida ficam de fora)
+        drivers = [drv for drv in drivers if drv in self.session_index.fastest_rows]
+        if not drivers:
+            raise ValueError("None of the drivers has a timed lap")
+        data = self.corner_data(drivers, reference=reference)
+        fastest = [self.session_index.fastest_rows[drv] for drv in drivers]
+        data = data[data['Row'].isin(fastest)]
+        corners = self.corner_table.corners
+        width = 0.8 / len(drivers)
+
+        fig, ax = plt.subplots(figsize=(18, 6))
+        for idx, drv in enumerate(drivers):
+            lost = data[data['Driver'] == drv].set_index('Corner')['TimeLost'].reindex(corners)
+            ax.bar(np.arange(len(corners)) + idx * width, lost, width=width, label=drv,
+                   color=self.session_index.team_color[drv])
+        ax.axhline(0, color='grey', linewidth=0.8)
+        ax.set_xticks(np.arange(len(corners)) + width * (len(drivers) - 1) / 2, corners)
+        ax.set(xlabel='Corner', ylabel='Time lost (s)')
+        ax.legend()
+        plt.suptitle(f"Corner Analysis - {self.event.event['EventName']} {self.year}")
+        self._save_figure('corner_analysis')
+
+    @traced
+    @requires('telemetry')
+    def similar_laps(self, drv: str, lap_number: Optional[int] = None, index: Optional[Union[LapIndex, str]] = None,
+                     k: int = 10, channels: Optional[list] = None):
+        # As k voltas do índice (padrão: só esta sessão) mais parecidas com uma volta de `drv` (padrão: a mais rápida);
+        # o índice do chamador só é lido: se a sessão não está nele, a consulta usa uma cópia em memória
+        if index is None:
+            index = LapIndex()
+            index.append(self)
+        else:
+            if isinstance(index, str):
+                index = LapIndex(index)
+            if (self.year, self.place, self.modality) not in index:
+                index = index.with_vectors(self.year, self.place, self.modality, self.lap_vectors,
+                                           event_name=self.event.event['EventName'])
+        if lap_number is None:
+            lap_number = int(self.session_index.fastest_lap(drv)['LapNumber'])
+        similar = index.nearest(self.lap_vectors.vector(drv, lap_number), k + 1, channels)
+        itself = ((similar['Year'] == int(self.year)) & (similar['Place'] == str(self.place))
+                  & (similar['Modality'] == self.modality) & (similar['Driver'] == drv)
+                  & (similar['LapNumber'] == lap_number))
+        return similar[~itself].head(k).reset_index(drop=True)
+
+    @traced
+    @requires('messages')
+    def telemetry_tensor(self, drivers: Optional[list] = None, lap_number: Optional[list] = None, step: float = 5.0):
+        # Voltas de vários pilotos na mesma grade de distância (padrão: volta mais rápida de cada um)
+        if drivers is None:
+            drivers = [drv for drv in self.get_drivers() if self.session_index.fastest_lap(drv) is not None]
+        if lap_number is None:
+            keys = [(drv, int(self.session_index.fastest_lap(drv)['LapNumber'])) for drv in drivers]
+        else:
+            keys = [(drv, int(lap)) for drv, lap in zip(drivers, lap_number)]
+
+        telemetries = [self.get_lap_telemetry(*key, driver_ahead=False) for key in keys]
+        accelerations = self.get_accelerations(keys, telemetries)
+        with self.instrumentation.span('resample_telemetry'):
+            return TelemetryTensor(keys, telemetries, accelerations, step)
+
+    @traced
+    @requires('messages')
     def get_telemetry(self, drv1):
-        drv1_laps = self.event.laps.pick_drivers(drv1)  
-        drv1_telemetry = drv1_laps.pick_fastest().get_telemetry().add_distance()
+        drv1_telemetry = self.get_lap_telemetry(drv1, self.session_index.fastest_lap(drv1)['LapNumber'])
         return drv1_telemetry
     
-    def plot_tyre_degredation(self, drv: Optional[str] = None):
-        
+    @traced
+    @requires('messages')
+    def tyre_degredation_data(self, drv: Optional[str] = None):
+        # Menor LapTime corrigido pelo combustível (s) por Compound e TyreLife e quantas voltas entraram: Count
         if drv != None:
-            tyredev = self.event.laps.pick_drivers(drv).pick_quicklaps()
+            tyredev = self.get_laps(drv).pick_quicklaps()
         else:
             tyredev = self.event.laps[self.event.laps.TrackStatus == '1']
         
         tyredev= tyredev[['Compound', 'TyreLife', 'LapNumber', 'LapTime', 'Sector1Time', 'Sector2Time', 'Sector3Time']]
 
-        # Each kg of fuel adds 0.03s to laptime. Fuel is 110kg at start of race and 0 at finish
-        # Recalculate all lap times to cars with no fuel
-        
+        # Recalculate all lap times to cars with no fuel (see degradation.py)
         nolaps = tyredev.LapNumber.max()
-        totfuel = 110
-        secperkg = 0.03
-        tyredev['Fuel'] = totfuel - (tyredev['LapNumber'] * (totfuel / nolaps))
-        tyredev['LapTime'] = tyredev['LapTime'] / np.timedelta64(1, 's') - (secperkg * tyredev['Fuel'])
+        tyredev['LapTime'] = fuel_corrected_laptime(tyredev['LapTime'] / np.timedelta64(1, 's'), tyredev['LapNumber'], nolaps)
 
         # Drop first lap of the race and first track on set of tyres
         tyredev = tyredev[(tyredev.TyreLife > 1) & (tyredev.LapNumber > 1)]
 
         # Get minimum laptime per [Compound, TyreLife] and count of occurences of this combination
-        tyredev = tyredev[['Compound', 'TyreLife', 'LapTime']].groupby(['Compound', 'TyreLife']). \
+        tyredev = tyredev[['Compound', 'TyreLife', 'LapTime']].groupby(['Compound', 'TyreLife'], observed=True). \
                 agg({'LapTime': ['min', 'count']}).reset_index()
         tyredev.columns = ['Compound', 'TyreLife', 'LapTime', 'Count']
+        return tyredev
 
+    @traced
+    @plots
+    def plot_tyre_degredation(self, drv: Optional[str] = None):
+        tyredev = self.tyre_degredation_data(drv)
 
         fig, ax = plt.subplots(figsize=(10,6))
         for tyre,color in zip(['SOFT', 'MEDIUM', 'HARD', 'INTERMEDIATE', 'WET'], ['red', 'yellow', 'white', 'green', 'blue']):
@@ -238,14 +773,20 @@ class F1Event:
             _ = ax.set_title(f"Tyre degradation - {self.event.event['EventName']} {self.year}")
         _ = ax.set_ylabel('Fuel-Corrected Laptime (s)')
 
-    def driver_laptimes(self, drv):
-        driver_laps = self.event.laps.pick_drivers(drv).pick_quicklaps().reset_index()
+    @traced
+    @requires('messages')
+    def driver_laptimes_data(self, drv):
+        # Voltas rápidas do piloto com LapTime corrigido pelo combustível (s)
+        driver_laps = self.get_laps(drv).pick_quicklaps().reset_index()
 
         nolaps = self.event.total_laps
-        totfuel = 110
-        secperkg = 0.03
-        driver_laps['Fuel'] = totfuel - (driver_laps['LapNumber'] * (totfuel / nolaps))
-        driver_laps['LapTime'] = driver_laps['LapTime'] / np.timedelta64(1, 's') - (secperkg * driver_laps['Fuel'])
+        driver_laps['LapTime'] = fuel_corrected_laptime(driver_laps['LapTime'] / np.timedelta64(1, 's'), driver_laps['LapNumber'], nolaps)
+        return driver_laps
+
+    @traced
+    @plots
+    def driver_laptimes(self, drv):
+        driver_laps = self.driver_laptimes_data(drv)
         fig, ax = plt.subplots(figsize=(8, 8))
 
         sns.scatterplot(data=driver_laps,
@@ -253,7 +794,7 @@ class F1Event:
                         y="LapTime",
                         ax=ax,
                         hue="Compound",
-                        palette=ff1.plotting.COMPOUND_COLORS,
+                        palette=plotting.COMPOUND_COLORS,
                         s=80,
                         linewidth=0,
                         legend='auto')
@@ -262,115 +803,198 @@ class F1Event:
 
 
     
+    @traced
+    @requires('telemetry', 'messages')
+    def engine_manufacter_data(self):
+        # Volta mais rápida de cada piloto: Driver, Team, Engine, LapTime, LapTimeDelta (s), TopSpeed (km/h)
+        rows = []
+        lap_summary = self.lap_summary.laps
+        for drv_fastest_lap in self._fastest_laps():
+            drv = drv_fastest_lap['Driver']
+            rows.append({'Driver': drv, 'Team': drv_fastest_lap['Team'],
+                         'Engine': team_engines.get(drv_fastest_lap['Team'], drv_fastest_lap['Team']),
+                         'LapTime': drv_fastest_lap['LapTime'],
+                         'TopSpeed': lap_summary.at[self.session_index.fastest_rows[drv], 'TopSpeed']})
+        data = pd.DataFrame(rows, columns=['Driver', 'Team', 'Engine', 'LapTime', 'TopSpeed'])
+        data = data.sort_values(by='LapTime', kind='mergesort').reset_index(drop=True)
+        data.insert(4, 'LapTimeDelta', (data['LapTime'] - data['LapTime'].min()).dt.total_seconds())
+        return data
+
+    @traced
+    @requires('telemetry', 'messages')
+    def season_summary_data(self):
+        # Uma linha por piloto, como gravada no season store: volta mais rápida, velocidades, setores e TheoreticalBest
+        rows = []
+        lap_summary = self.lap_summary.laps
+        for drv_fastest_lap in self._fastest_laps():
+            drv = drv_fastest_lap['Driver']
+            speed = lap_summary.loc[self.session_index.fastest_rows[drv]]
+            rows.append({'Driver': drv, 'Team': drv_fastest_lap['Team'],
+                         'Engine': team_engines.get(drv_fastest_lap['Team'], drv_fastest_lap['Team']),
+                         'LapNumber': int(drv_fastest_lap['LapNumber']),
+                         'LapTime': drv_fastest_lap['LapTime'].total_seconds(),
+                         'TopSpeed': speed['TopSpeed'], 'MeanSpeed': speed['MeanSpeed']})
+        summary = pd.DataFrame(rows, columns=['Driver', 'Team', 'Engine', 'LapNumber', 'LapTime', 'TopSpeed', 'MeanSpeed'])
+        summary.insert(5, 'GapToPole', summary['LapTime'] - summary['LapTime'].min())
+        sectors = [f'Sector{n}Time' for n in SectorIndex.sectors] + ['TheoreticalBest']
+        return summary.join(self.sector_index.best[sectors], on='Driver')
+
+    @traced
+    @plots
     def engine_manufacter(self):
-        
-        list_fastest_laps = list()  
-        for drv in self.event.results['Abbreviation']:
-            drvs_fastest_lap = self.event.laps.pick_drivers(drv).pick_fastest()
-            if not pd.isna(drvs_fastest_lap['LapTime']):
-                list_fastest_laps.append(drvs_fastest_lap)
-        fastest_laps = Laps(list_fastest_laps).sort_values(by='LapTime').reset_index(drop=True)
-        driver_pole = fastest_laps.pick_fastest()
+        data = self.engine_manufacter_data()
+        driver_pole = data.iloc[0]
         lap_time_pole_string = strftimedelta( driver_pole['LapTime'], '%m:%s.%ms')
-        plt.rcParams["figure.figsize"] = [12, 6]
-        fig, ax = plt.subplots()
-
-        f1_teams_engine = {      'Red Bull Racing': 'Red Bull Racing', 
-                          'Ferrari': 'Ferrari',
-                          'Haas F1 Team': 'Ferrari', 
-                          'Aston Martin': 'Mercedes', 
-                          'Alpine' : 'Alpine',
-                          'Kick Sauber': 'Ferrari',
-                          'Racing Bulls': 'Red Bull Racing', 
-                          'McLaren': 'Mercedes',
-                          'Mercedes': 'Mercedes',
-                          'Williams': 'Mercedes'}
+        fig, ax = plt.subplots(figsize=(12, 6))
 
-        for drv in self.event.results['Abbreviation']:
-                drv_fastest_lap = self.event.laps.pick_drivers(drv).pick_fastest()
-                if not pd.isna(drv_fastest_lap['LapTime']):
-                    deltaTime = drv_fastest_lap['LapTime'] - driver_pole['LapTime'] 
-                    color = ff1.plotting.get_team_color(f1_teams_engine[drv_fastest_lap['Team']], session= self.event)
-                    ax.scatter(drv_fastest_lap.get_telemetry()['Speed'].max(), pd.Timedelta(deltaTime).total_seconds(), color = color)
-                    ax.text(drv_fastest_lap.get_telemetry()['Speed'].max() + 0.1, pd.Timedelta(deltaTime).total_seconds() + 0.03, drv)
+        for _, row in data.iterrows():
+                color = plotting.get_team_color(row['Engine'], session= self.event)
+                ax.scatter(row['TopSpeed'], row['LapTimeDelta'], color = color)
+                ax.text(row['TopSpeed'] + 0.1, row['LapTimeDelta'] + 0.03, row['Driver'])
         ax.set(xlabel='Speed- Telem Max. (km/h)', ylabel= 'LapTime Delta(s)')
         plt.suptitle(f"LapTime by Engine Manufacturer\n{self.event.event['EventName']} {self.year} \n"
                         f"Fastest Lap: {lap_time_pole_string} ({driver_pole['Driver']})")
-        plt.savefig('Engine', dpi=350)
+        self._save_figure('Engine')
 
+    @traced
+    def tyre_strategy_data(self):
+        # Driver, LapNumber, Stint, Compound de cada volta; Pitstop marca a primeira volta de cada stint após a largada
+        data = self.event.laps[['Driver', 'LapNumber', 'Stint', 'Compound']].reset_index(drop=True)
+        data['Pitstop'] = ~data.Stint.eq(data.Stint.shift()) & (data.LapNumber > 1)
+        return data
+
+    @traced
+    @plots
     def tyre_strategy(self):
         fig, ax = plt.subplots(figsize=(12,8))
 
-        pitstops = self.event.laps[['LapNumber', 'Stint', 'Driver']].copy()
-        pitstops['Pitstop'] = ~pitstops.Stint.eq(pitstops.Stint.shift())
-        pitstops = pitstops[pitstops.Pitstop] 
-        pitstops = pitstops[pitstops.LapNumber > 1]
+        data = self.tyre_strategy_data()
+        pitstops = data[data.Pitstop]
         pitstops.plot.scatter('LapNumber', 'Driver', ax=ax, color='purple', s=100)
-        df = self.event.laps[['Driver', 'LapNumber', 'Compound']]
-        df = pd.merge(self.event.results[['Abbreviation']], df, left_on='Abbreviation', right_on='Driver')
         for tyre,color in zip(['SOFT', 'MEDIUM', 'HARD', 'INTERMEDIATE', 'WET'], ['red', 'yellow', 'white', 'green', 'blue']):
-            df = self.event.laps[self.event.laps.Compound == tyre][['Driver', 'LapNumber', 'Compound']]
+            df = data[data.Compound == tyre]
             df.plot.scatter('LapNumber', 'Driver', ax=ax, color=color, s=16)
         ax.invert_yaxis()
         ax.set_title(f"Tyre Strategy - {self.event.event['EventName']} {self.year}")
         plt.show()
     
+    @traced
+    @requires('messages')
     def circuit_info(self):
-        return self.event.get_circuit_info()
+        # Buscado uma vez por sessão; distâncias dos marcadores pela volta mais rápida, do store se ela estiver lá
+        if self._circuit_info is None:
+            fastest = self.event.laps.pick_fastest()
+            key = None if fastest is None else (fastest['Driver'], int(fastest['LapNumber']))
+            if ('telemetry' not in self._loaded_channels and self.telemetry_store is not None
+                    and key in self.telemetry_store):
+                self._circuit_info = self._fetch_circuit_info()
+                _add_marker_distance(self._circuit_info, self.telemetry_store.read_lap(*key))
+            else:
+                self.load_channels('telemetry')
+                self._circuit_info = self.event.get_circuit_info()
+        return self._circuit_info
 
     
-    def race_trace_chart(self, drivers = [], inilap = None, nlaps = None):
+    @traced
+    def race_gaps(self, reference_drivers: int = 10):
+        # Gaps de todo o grid em todas as voltas, calculados uma vez por sessão
+        if reference_drivers not in self._race_gaps:
+            self._race_gaps[reference_drivers] = RaceGaps(self.event.laps, self.get_drivers(), reference_drivers)
+        return self._race_gaps[reference_drivers]
+
+    @traced
+    def degradation_model(self):
+        # Taxas de degradação por stint e por composto de todos os pilotos (ver degradation.py)
+        if self._degradation_model is None:
+            self._degradation_model = DegradationModel(self.event.laps, self.event.total_laps)
+        return self._degradation_model
+
+    @traced
+    def strategy_simulation_data(self, drv: Optional[str] = None, n_simulations: int = 1000, stops: tuple = (1, 2, 3),
+                                 seed: Optional[int] = None, workers: Optional[int] = 1, **kwargs):
+        # Estratégias por tempo esperado de prova; com `drv`, os tempos seguem o ritmo médio dos stints do piloto
+        model = self.degradation_model()
+        offset = 0.0
+        if drv is not None:
+            stints = model.stints[model.stints['Driver'] == drv]
+            base = model.compounds.set_index('Compound')['BaseLapTime']
+            offset = float((stints['Intercept'] - stints['Compound'].map(base).to_numpy(dtype=float)).mean())
+            offset = 0.0 if np.isnan(offset) else offset
+        simulator = StrategySimulator(self.event.laps, self.event.total_laps, model=model, offset=offset)
+        return simulator.simulate(n_simulations, stops=stops, seed=seed, workers=workers, **kwargs)
+
+    @traced
+    @plots
+    def plot_strategies(self, drv: Optional[str] = None, top: int = 10, n_simulations: int = 1000,
+                        seed: Optional[int] = None):
+        ranking = self.strategy_simulation_data(drv, n_simulations, seed=seed).head(top)
+        colors = dict(zip(['SOFT', 'MEDIUM', 'HARD'], ['red', 'yellow', 'white']))
+
+        fig, ax = plt.subplots(figsize=(15, 0.6 * len(ranking) + 2))
+        for idx, strategy in ranking.iterrows():
+            bounds = [0] + [int(lap) for lap in strategy['PitLaps'].split('-')] + [self.event.total_laps]
+            for compound, start, end in zip(strategy['Compounds'].split('-'), bounds[:-1], bounds[1:]):
+                ax.barh(idx, end - start, left=start, color=colors[compound], edgecolor='black')
+            ax.text(self.event.total_laps + 0.5, idx, f"+{strategy['GapToBest']:.1f}s", va='center')
+        ax.set_yticks(ranking.index, [f"{stops} stop" for stops in ranking['Stops']])
+        ax.invert_yaxis()
+        ax.set(xlabel='Laps', xlim=(0, self.event.total_laps + 4))
+        plt.title(f"Strategy Simulation{'' if drv is None else ' ' + drv} - {self.event.event['EventName']} {self.year}")
+        self._save_figure('strategies')
+
+    @traced
+    def race_trace_data(self, drivers = [], inilap = None, nlaps = None):
+        # Gap para o piloto virtual (s, > 0: à frente), pilotos x voltas de inilap a nlaps
+        gaps = self.race_gaps()
 
         if(nlaps == None):
-            nlaps = self.event.total_laps
+            nlaps = len(gaps.laps)
         
         if(inilap == None):
             inilap = 1
 
         if(drivers == []):
-            drivers = list(self.get_drivers())
-        
-        average_driver_laptime = []
-        for driver in self.event.results['Abbreviation'][:10]:
-            driver_laps = self.event.laps.pick_drivers(driver)
-            driver_laps['LapTimeSeconds'] = driver_laps['Time'].dt.total_seconds()
-            average_driver_laptime.append(driver_laps['LapTimeSeconds'].reset_index(drop = True))
-        virtual_driver = pd.DataFrame(average_driver_laptime)
-
-        plt.rcParams["figure.figsize"] = [20, 10]
-        plt.rcParams["figure.autolayout"] = True
-        fig, ax = plt.subplots()
-        color_list = []
+            drivers = gaps.drivers
 
-        if(drivers == []):
-            drivers = self.event.results['Abbreviation'] 
+        # pilotos sem volta (ex.: DNS, ou ao vivo antes da primeira volta) ficam de fora, como no gráfico original
+        drivers = [drv for drv in drivers if drv in gaps.drivers]
+        return gaps.frame('to_virtual').loc[drivers].iloc[:, inilap - 1:nlaps]
+
+    @traced
+    @plots
+    def race_trace_chart(self, drivers = [], inilap = None, nlaps = None):
+        data = self.race_trace_data(drivers, inilap, nlaps)
+
+        fig, ax = plt.subplots(figsize=(20, 10), tight_layout=True)
+        color_list = []
         
-        for driver in drivers:
-            driver_laps = self.event.laps.pick_drivers(driver)
-            driver_laps['LapTimeSeconds'] = driver_laps['Time'].dt.total_seconds()
-            try:
-                color = ff1.plotting.get_team_color(driver_laps['Team'].reset_index(drop=True)[0], session = self.event)
-            except Exception as e:
-                color = "#800080"
+        for driver, gap in data.iterrows():
+            lap_numbers = data.columns
+            color = self.session_index.team_color.get(driver) or "#800080"
             if color in color_list:
-                ax.plot(driver_laps['LapNumber'][inilap - 1:nlaps], virtual_driver.mean().reset_index(drop=True)[inilap - 1:len(driver_laps['LapTimeSeconds'][:nlaps])] - driver_laps['LapTimeSeconds'].reset_index(drop=True)[inilap - 1:nlaps], marker = 'o', label= driver, color = color, ls='--')
+                self._plot_line(ax, lap_numbers, gap, marker = 'o', label= driver, color = color, ls='--')
             else:
-                ax.plot(driver_laps['LapNumber'][inilap - 1:nlaps], virtual_driver.mean().reset_index(drop=True)[inilap - 1:len(driver_laps['LapTimeSeconds'][:nlaps])] - driver_laps['LapTimeSeconds'].reset_index(drop=True)[inilap - 1:nlaps], marker = 'o', label= driver)
+                self._plot_line(ax, lap_numbers, gap, marker = 'o', label= driver)
             color_list.append(color)
 
         ax.legend(loc="upper left", bbox_to_anchor=(1, 1))
         ax.set(xlabel='Laps', ylabel= '<-- Driver behind // Driver ahead --> ')
         plt.title(f"Race Trace - {self.event.event['EventName']} {self.year}")
-        plt.savefig(f"Race_Trace_{self.event.event['EventName']}", dpi=350)
-
+        self._save_figure(f"Race_Trace_{self.event.event['EventName']}")
+
+    @traced
+    @requires('telemetry')
+    def top_speed_data(self):
+        # Velocidade máxima de cada piloto na sessão com DRS aberto (DRS) e fechado (noDRS), km/h
+        speeds = self.lap_summary.laps.groupby('Driver', sort=False, observed=True)[['TopSpeedDRS', 'TopSpeedNoDRS']].max()
+        speeds = speeds.reindex(self.event.laps.Driver.unique())
+        return pd.DataFrame({'Driver': speeds.index, 'DRS': speeds['TopSpeedDRS'].to_numpy(),
+                             'noDRS': speeds['TopSpeedNoDRS'].to_numpy()})
+
+    @traced
+    @plots
     def plot_top_speed(self):
-        drslist = []
-        for driver in self.event.laps.Driver.unique():
-            drs = self.event.laps.pick_drivers(driver).get_telemetry()[['Speed', 'DRS']].groupby('DRS').max()
-            withoutDRS = drs[drs.index < 5]['Speed'].max()
-            withDRS = drs[drs.index > 5]['Speed'].max()
-            drslist.append({'Driver':driver, 'DRS':withDRS, 'noDRS': withoutDRS})
-        topspeeds = pd.DataFrame(drslist)
+        topspeeds = self.top_speed_data()
 
         fig, ax = plt.subplots(figsize=(15,10))
         topspeeds.plot.scatter('Driver', 'DRS', ax=ax, color='orange', s=16, label='DRS')
@@ -381,42 +1005,124 @@ class F1Event:
         ax.legend()
         plt.show()
     
-    def gg_plot(self, drivers: list, lap_number: Optional[list] = None):
-        fig, ax = plt.subplots(figsize=(12, 6.75))
+    @traced
+    @requires('messages')
+    def gg_data(self, drivers: list, lap_number: Optional[list] = None):
+        # Acelerações de cada amostra das voltas (padrão: a mais rápida de cada piloto): Driver, LapNumber, LonAcc, LatAcc
+        laps = []
         for idx, driver in enumerate(drivers):
-            driver_laps = self.event.laps.pick_drivers(driver) 
-            color_drv = ff1.plotting.get_team_color(driver_laps['Team'].reset_index(drop=True)[0], session=self.event)
-            
             if lap_number is None:
-                driver_telemetry = driver_laps.pick_fastest().get_telemetry()
+                laps.append((driver, int(self.session_index.fastest_lap(driver)['LapNumber'])))
             else:
-                driver_telemetry = driver_laps[driver_laps.LapNumber == lap_number[idx]].get_telemetry().add_distance()
-            ax.scatter(compute_accelerations(driver_telemetry)[1], compute_accelerations(driver_telemetry)[0], label=driver, color=color_drv)
-        
+                laps.append((driver, int(lap_number[idx])))
+
+        # Todas as voltas em uma única chamada, reaproveitando o cache
+        accelerations = self.get_accelerations(laps)
+        frames = [pd.DataFrame({'Driver': driver, 'LapNumber': lap, 'LonAcc': lon_acc, 'LatAcc': lat_acc})
+                  for (driver, lap), (lon_acc, lat_acc) in zip(laps, accelerations)]
+        return pd.concat(frames, ignore_index=True)
+
+    def _gg_samples(self, drv):
+        # Acelerações de todas as voltas válidas do piloto (bandeira verde, sem entrada/saída de box)
+        # Car data e position data do trecho entre a primeira e a última volta válida vão direto para
+        # arrays (X, Y interpolados no tempo do car data, distância integrada da velocidade), sem o
+        # merge do FastF1; as amostras fora das voltas válidas são descartadas depois
+        laps = self.get_laps(drv)
+        valid = laps[laps['LapTime'].notna() & laps['LapStartTime'].notna() & laps['PitInTime'].isna()
+                     & laps['PitOutTime'].isna() & (laps['TrackStatus'] == '1')]
+        if valid.empty:
+            return np.empty(0), np.empty(0)
+        lap_start = valid['LapStartTime'].dt.total_seconds().to_numpy()
+        lap_end = valid['Time'].dt.total_seconds().to_numpy()
+
+        number = str(valid['DriverNumber'].iloc[0])
+        car_data = self.event.car_data[number]
+        pos_data = self.event.pos_data[number]
+        car_time = car_data['SessionTime'].dt.total_seconds().to_numpy()
+        stretch = (car_time >= lap_start.min()) & (car_time <= lap_end.max())
+        car_time = car_time[stretch]
+        speed = car_data['Speed'].to_numpy(dtype=float)[stretch]
+        pos_time = pos_data['SessionTime'].dt.total_seconds().to_numpy()
+        x = np.interp(car_time, pos_time, pos_data['X'].to_numpy(dtype=float))
+        y = np.interp(car_time, pos_time, pos_data['Y'].to_numpy(dtype=float))
+        distance = np.concatenate(([0.0], np.cumsum(speed[1:] / 3.6 * np.diff(car_time))))
+        if len(car_time) < 7:
+            return np.empty(0), np.empty(0)
+        lon_acc, lat_acc = accelerations_from_arrays(car_time, speed, distance, x, y)
+
+        lap = np.searchsorted(lap_end, car_time, side='left')
+        inside = lap < len(lap_end)
+        inside[inside] = car_time[inside] >= lap_start[lap[inside]]
+        self.instrumentation.count('gg_samples', int(inside.sum()))
+        return lon_acc[inside], lat_acc[inside]
+
+    @traced
+    @requires('telemetry', 'messages')
+    def gg_envelope(self, drivers: Optional[list] = None, n_angles: int = 72, percentiles: tuple = (50, 90, 99),
+                    workers: Optional[int] = None):
+        # Círculo de aderência de cada piloto com todas as voltas válidas, pilotos em paralelo (ver gg_envelope.py)
+        if drivers is None:
+            drivers = [drv for drv in self.get_drivers() if drv in self.session_index.driver_rows]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            samples = list(pool.map(self._gg_samples, drivers))
+        with self.instrumentation.span('bin_accelerations'):
+            return GGEnvelope(drivers, samples, n_angles, percentiles)
+
+    @traced
+    @plots
+    def gg_plot(self, drivers: list, lap_number: Optional[list] = None, percentiles: tuple = (50, 90, 99)):
+        # Envelope de todas as voltas válidas (ou das voltas em lap_number); linha cheia no maior percentil
+        if lap_number is None:
+            envelope = self.gg_envelope(drivers, percentiles=percentiles)
+        else:
+            data = self.gg_data(drivers, lap_number)
+            samples = [(data.loc[data['Driver'] == drv, 'LonAcc'].to_numpy(),
+                        data.loc[data['Driver'] == drv, 'LatAcc'].to_numpy()) for drv in drivers]
+            envelope = GGEnvelope(drivers, samples, percentiles=percentiles)
+
+        fig, ax = plt.subplots(figsize=(12, 6.75))
+        for driver in drivers:
+            color_drv = plotting.get_team_color(self.session_index.team[driver], session=self.event)
+            for percentile in envelope.percentiles:
+                lat_acc, lon_acc = envelope.outline(driver, percentile)
+                if percentile == envelope.percentiles[-1]:
+                    ax.plot(lat_acc, lon_acc, label=driver, color=color_drv)
+                    ax.fill(lat_acc, lon_acc, color=color_drv, alpha=0.08)
+                else:
+                    ax.plot(lat_acc, lon_acc, color=color_drv, ls=':', lw=0.8)
+        ax.set(xlabel='Lateral Acelerration (g)', ylabel='Longitudinal Acelerration (g)', aspect='equal')
         ax.legend()
         
     
-    def plot_bargraph_team(self, session='q3'):
+    @traced
+    def bargraph_team_data(self, session='q3'):
+        # Melhor volta de cada equipe em Q1, Q2 ou Q3 como diferença para a melhor (s), em ordem
         q1, q2, q3 = self.event.laps.split_qualifying_sessions()
 
         if session == 'q1':
-            best_team_laptimes = q1.groupby('Team')['LapTime'].min().reset_index()
+            best_team_laptimes = q1.groupby('Team', observed=True)['LapTime'].min().reset_index()
         elif session == 'q2':
-            best_team_laptimes = q2.groupby('Team')['LapTime'].min().reset_index()
+            best_team_laptimes = q2.groupby('Team', observed=True)['LapTime'].min().reset_index()
         else:
-            best_team_laptimes = q3.groupby('Team')['LapTime'].min().reset_index()
+            best_team_laptimes = q3.groupby('Team', observed=True)['LapTime'].min().reset_index()
 
         # Calcular a diferença de tempo em segundos
         best_team_laptimes['LapTime'] = pd.to_timedelta(
             best_team_laptimes['LapTime'] - best_team_laptimes['LapTime'].min()
         ).dt.total_seconds()
+        return best_team_laptimes.sort_values(by='LapTime', ascending=True).reset_index(drop=True)
+
+    @traced
+    @plots
+    def plot_bargraph_team(self, session='q3'):
+        best_team_laptimes = self.bargraph_team_data(session)
 
         # Criar o gráfico
         plt.figure(figsize=(12, 6.75))
         ax = sns.barplot(
-            x='LapTime', y='Team', data=best_team_laptimes.sort_values(by='LapTime', ascending=True),
+            x='LapTime', y='Team', data=best_team_laptimes,
             hue='Team',
-            palette=[ ff1.plotting.get_team_color(team, session = self.event) for team in best_team_laptimes.sort_values(by='LapTime', ascending=True)["Team"]]  # Usando 'hue' para aplicar automaticamente as cores para cada equipe
+            palette=[ plotting.get_team_color(team, session = self.event) for team in best_team_laptimes["Team"]]  # Usando 'hue' para aplicar automaticamente as cores para cada equipe
         )
 
         # Adicionar rótulos de LapTime ao lado das barras com cor branca
@@ -441,38 +1147,53 @@ class F1Event:
 
 
     
-    def plot_car_characteristics(self):
+    @traced
+    @requires('telemetry', 'messages')
+    def car_characteristics_data(self):
+        # Volta mais rápida de cada equipe: Team, Driver, LapTime, MeanSpeed e TopSpeed (km/h)
         laps = self.event.laps
-        min_lap_indexes = laps.groupby('Team')['LapTime'].idxmin()
+        min_lap_indexes = laps.groupby('Team', observed=True)['LapTime'].idxmin()
         drivers_with_fastest_lap = laps.loc[min_lap_indexes, ['Driver', 'LapTime', 'Team']]
         df = drivers_with_fastest_lap.sort_values(by='LapTime')
         high_speed = []
-        plt.rcParams["figure.figsize"] = [12, 6]
-        fig, ax = plt.subplots()
-        for drv in df['Driver']:
-            color = ff1.plotting.get_team_color(laps.pick_drivers(drv)['Team'].reset_index(drop = True)[0], session = self.event)
-            telemetry = laps.pick_drivers(drv).pick_fastest().get_telemetry()
-            high_speed.append((telemetry['Speed'].mean(),color, telemetry['Speed'].max(), laps.pick_drivers(drv)['Team'].reset_index(drop = True)[0]))
+        lap_summary = self.lap_summary.laps
+        for drv, lap_time in zip(df['Driver'], df['LapTime']):
+            speed = lap_summary.loc[self.session_index.fastest_rows[drv]]
+            high_speed.append({'Team': self.session_index.team[drv], 'Driver': drv, 'LapTime': lap_time,
+                               'MeanSpeed': speed['MeanSpeed'], 'TopSpeed': speed['TopSpeed']})
+        return pd.DataFrame(high_speed, columns=['Team', 'Driver', 'LapTime', 'MeanSpeed', 'TopSpeed'])
+
+    @traced
+    @plots
+    def plot_car_characteristics(self):
+        high_speed = self.car_characteristics_data()
+        colors = [self.session_index.team_color[drv] for drv in high_speed['Driver']]
+        fig, ax = plt.subplots(figsize=(12, 6))
 
         ax.set(xlabel='Mean Speed (km/h)', ylabel= 'Top Speed (km/h)')
-        plt.scatter(list(zip(*high_speed))[0],list(zip(*high_speed))[2], color = list(zip(*high_speed))[1])
+        plt.scatter(high_speed['MeanSpeed'], high_speed['TopSpeed'], color = colors)
 
-        for i in range(len(high_speed)):
-            ax.annotate(list(zip(*high_speed))[3][i], (list(zip(*high_speed))[0][i], list(zip(*high_speed))[2][i] + 0.3))
+        for _, row in high_speed.iterrows():
+            ax.annotate(row['Team'], (row['MeanSpeed'], row['TopSpeed'] + 0.3))
 
         plt.suptitle(f"Car Characteristics\n{self.event.event['EventName']} {self.year} - {race_type_enum[self.modality]}")
-        plt.savefig('car_characteristics', dpi=350)
+        self._save_figure('car_characteristics')
     
+    @traced
+    def position_changes_data(self):
+        # Posição de cada piloto ao fim de cada volta: Driver, LapNumber, Position (ordem dos resultados)
+        frames = [self.get_laps(drv)[['Driver', 'LapNumber', 'Position']] for drv in self.event.results['Abbreviation']]
+        return pd.concat(frames, ignore_index=True)
+
+    @traced
+    @plots
     def position_changes(self):
         fig, ax = plt.subplots(figsize=(12, 6))
-        for drv in self.event.results['Abbreviation']:
-            drv_laps = self.event.laps.pick_drivers(drv)
-
-            abb = drv_laps['Driver'].iloc[0]
-            color = ff1.plotting.get_driver_color(abb, self.event)  # Atualizado conforme aviso
+        for abb, drv_laps in self.position_changes_data().groupby('Driver', sort=False, observed=True):
+            color = plotting.get_driver_color(abb, self.event)  # Atualizado conforme aviso
 
-            ax.plot(drv_laps['LapNumber'], drv_laps['Position'],
-                    label=abb, color=color)
+            self._plot_line(ax, drv_laps['LapNumber'], drv_laps['Position'],
+                            label=abb, color=color)
         
         ax.set_ylim([20.5, 0.5])
         ax.set_yticks([1, 5, 10, 15, 20])
@@ -482,12 +1203,13 @@ class F1Event:
         plt.title(f"Race Positions - {self.event.event['EventName']} {self.year}")
         plt.tight_layout()
 
-    def session_pace_evolution(self):
+    @traced
+    def session_pace_evolution_data(self):
+        # Melhor volta de cada equipe em Q1, Q2 e Q3: Team, LapTime, Qualify, LapTimeSeconds
         q1, q2, q3 = self.event.laps.split_qualifying_sessions()
-        fig, ax = plt.subplots()
-        resultados_q1 = q1.groupby('Team')['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
-        resultados_q2 = q2.groupby('Team')['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
-        resultados_q3 = q3.groupby('Team')['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
+        resultados_q1 = q1.groupby('Team', observed=True)['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
+        resultados_q2 = q2.groupby('Team', observed=True)['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
+        resultados_q3 = q3.groupby('Team', observed=True)['LapTime'].min().reset_index().sort_values(by='LapTime', ascending=True)
 
         resultados_q1['Qualify'] = 'Q1'
         resultados_q2['Qualify'] = 'Q2'
@@ -495,25 +1217,48 @@ class F1Event:
 
         resultados_totais = pd.concat([resultados_q1, resultados_q2, resultados_q3])
         resultados_totais['LapTimeSeconds'] = resultados_totais['LapTime'].dt.total_seconds()
+        return resultados_totais.reset_index(drop=True)
 
+    @traced
+    @plots
+    def session_pace_evolution(self):
+        resultados_totais = self.session_pace_evolution_data()
+        fig, ax = plt.subplots()
 
         # Crie um gráfico de linha para cada equipe
         for team in resultados_totais['Team'].unique():
             team_data = resultados_totais[resultados_totais['Team'] == team]
-            ax.plot(team_data['Qualify'], team_data['LapTimeSeconds'], label=team, marker='o', color=ff1.plotting.get_team_color(team, session = self.event))
+            self._plot_line(ax, team_data['Qualify'], team_data['LapTimeSeconds'], label=team, marker='o', color=plotting.get_team_color(team, session = self.event))
         
         ax.set(xlabel='Qualify', ylabel= 'LapTime (seconds)')
         ax.legend(loc="upper left", bbox_to_anchor=(1, 1))
         plt.suptitle(f"{self.event.event['EventName']} {self.year} \n"
                         f"Session Pace Evolution")
     
+    @traced
+    def race_pace_data(self, drivers = []):
+        # Voltas dos pilotos: Driver, LapNumber, LapTime (s)
+        frames = []
+        for drv in drivers:
+            drv1_laps = self.get_laps(drv)
+            frames.append(pd.DataFrame({'Driver': drv, 'LapNumber': drv1_laps['LapNumber'].to_numpy(),
+                                        'LapTime': (drv1_laps['LapTime'] / np.timedelta64(1, 's')).to_numpy()}))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['Driver', 'LapNumber', 'LapTime'])
+
+    @traced
+    @plots
     def plot_race_pace(self,drivers = []):
         fig, ax = plt.subplots(figsize=(12, 6))
+        data = self.race_pace_data(drivers)
         for drv in drivers:
-            drv1_laps = self.event.laps.pick_drivers(drv)
-            ax.plot(drv1_laps["LapNumber"], drv1_laps['LapTime'] / np.timedelta64(1, 's'), label=drv, marker= "o")
+            drv1_laps = data[data['Driver'] == drv]
+            self._plot_line(ax, drv1_laps["LapNumber"], drv1_laps['LapTime'], label=drv, marker= "o")
         ax.set_xlabel('Lap')
         ax.set_ylabel('LapTime')
         ax.legend()
         plt.title(f"Race Pace - {self.event.event['EventName']} {self.year}")
 
+
+if __name__ == '__main__':
+    from render import main
+    main()
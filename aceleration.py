@@ -1,77 +1,99 @@
 import numpy as np
+import pandas as pd
 import math
 
-def smooth_derivative(t_in, v_in):
-    #
-    # Function to compute a smooth estimation of a derivative.
-    # [REF: http://holoborodko.com/pavel/numerical-methods/numerical-derivative/smooth-low-noise-differentiators/]
-    #
+# Coefficients of the smooth low-noise differentiator (N=7)
+SMOOTH_COEFFICIENTS = (5.0 / 32.0, 4.0 / 32.0, 1.0 / 32.0)
 
-    # Configuration
-    #
-    # Derivative method: two options: 'smooth' or 'centered'. Smooth is more conservative
-    # but helps to supress the very noisy signals. 'centered' is more agressive but more noisy
-    method = "smooth"
+ACC_THRESHOLD_G = 7.5
 
-    t = t_in.copy()
-    v = v_in.copy()
 
-    # (0) Prepare inputs
-
-    # (0.1) Time needs to be transformed to seconds
-    try:
-        for i in range(0, t.size):
-            t.iloc[i] = t.iloc[i].total_seconds()
-    except:
-        pass
-
-    t = np.array(t)
-    v = np.array(v)
-
-    # (0.1) Assert they have the same size
-    assert t.size == v.size
+def to_seconds(t):
+    #
+    # Converts a time channel (timedelta Series/array or plain numbers) to float seconds.
+    #
+    if isinstance(t, pd.Series):
+        if pd.api.types.is_timedelta64_dtype(t):
+            return t.dt.total_seconds().to_numpy(dtype=float)
+        return t.to_numpy(dtype=float)
+
+    t = np.asarray(t)
+    if np.issubdtype(t.dtype, np.timedelta64):
+        return t / np.timedelta64(1, 's')
+    if t.dtype == object:
+        return np.array([x.total_seconds() if isinstance(x, pd.Timedelta) else x for x in t.ravel()],
+                        dtype=float).reshape(t.shape)
+    return t.astype(float)
+
+
+def _segment_bounds(n, lengths):
+    if lengths is None:
+        return np.array([0]), np.array([n])
+    lengths = np.asarray(lengths, dtype=np.int64)
+    ends = np.cumsum(lengths)
+    assert ends.size == 0 or ends[-1] == n
+    return ends - lengths, ends
+
+
+def _segmented_derivative(t, v, starts, ends, method):
+    n = t.size
+    m = max(n - 6, 0)
+    dvdt = np.zeros(n)
 
-    # (0.2) Initialize output
-    dvdt = np.zeros(t.size)
+    # (2) Interior points: the stencil is a convolution over the neighbours at distance j,
+    #     weighted by the (possibly non-uniform) time spacing
+    if method == "smooth":
+        for j, c in enumerate(SMOOTH_COEFFICIENTS, start=1):
+            num = v[3 + j:3 + j + m] - v[3 - j:3 - j + m]
+            den = t[3 + j:3 + j + m] - t[3 - j:3 - j + m]
+            dvdt[3:3 + m] += np.divide(2 * j * c * num, den, out=np.zeros(num.size), where=den != 0)
+    elif method == "centered":
+        num = v[4:4 + m] - v[2:2 + m]
+        den = t[4:4 + m] - t[2:2 + m]
+        dvdt[3:3 + m] = np.divide(num, den, out=np.zeros(num.size), where=den != 0)
+
+    # (1) Points out of the stencil, for every segment (lap) at once
+    s, e = starts, ends
+    dvdt[s] = (v[s + 1] - v[s]) / (t[s + 1] - t[s])
+    dvdt[s + 1] = (v[s + 2] - v[s]) / (t[s + 2] - t[s])
+    dvdt[s + 2] = (v[s + 3] - v[s + 1]) / (t[s + 3] - t[s + 1])
+    dvdt[e - 1] = (v[e - 1] - v[e - 2]) / (t[e - 1] - t[e - 2])
+    dvdt[e - 2] = (v[e - 1] - v[e - 3]) / (t[e - 1] - t[e - 3])
+    dvdt[e - 3] = (v[e - 2] - v[e - 4]) / (t[e - 2] - t[e - 4])
 
-    # (1) Manually compute points out of the stencil
+    return dvdt
 
-    # (1.1) First point
-    dvdt[0] = (v[1] - v[0]) / (t[1] - t[0])
 
-    # (1.2) Second point
-    dvdt[1] = (v[2] - v[0]) / (t[2] - t[0])
+def smooth_derivative(t_in, v_in, method="smooth", lengths=None):
+    #
+    # Function to compute a smooth estimation of a derivative.
+    # [REF: http://holoborodko.com/pavel/numerical-methods/numerical-derivative/smooth-low-noise-differentiators/]
+    #
+    # Derivative method: two options: 'smooth' or 'centered'. Smooth is more conservative
+    # but helps to supress the very noisy signals. 'centered' is more agressive but more noisy
+    #
+    # Inputs may be 1D (one lap), 2D (stacked laps, samples on the last axis) or 1D
+    # concatenated laps with their sizes given in `lengths` (ragged batch).
+    #
 
-    # (1.3) Third point
-    dvdt[2] = (v[3] - v[1]) / (t[3] - t[1])
+    # (0) Prepare inputs: time needs to be transformed to seconds
+    t = to_seconds(t_in)
+    v = np.asarray(v_in, dtype=float)
 
-    # (1.4) Last points
-    n = t.size
-    dvdt[n - 1] = (v[n - 1] - v[n - 2]) / (t[n - 1] - t[n - 2])
-    dvdt[n - 2] = (v[n - 1] - v[n - 3]) / (t[n - 1] - t[n - 3])
-    dvdt[n - 3] = (v[n - 2] - v[n - 4]) / (t[n - 2] - t[n - 4])
+    # (0.1) Assert they have the same size
+    assert t.shape == v.shape
 
-    # (2) Compute the rest of the points
-    if method == "smooth":
-        c = [5.0 / 32.0, 4.0 / 32.0, 1.0 / 32.0]
-        for i in range(3, t.size - 3):
-            for j in range(1, 4):
-                if (t[i + j] - t[i - j]) == 0:
-                    dvdt[i] += 0
-                else:
-                    dvdt[i] += (
-                        2 * j * c[j - 1] * (v[i + j] - v[i - j]) / (t[i + j] - t[i - j])
-                    )
-    elif method == "centered":
-        for i in range(3, t.size - 2):
-            for j in range(1, 4):
-                if (t[i + j] - t[i - j]) == 0:
-                    dvdt[i] += 0
-                else:
+    shape = t.shape
+    if t.ndim == 2:
+        lengths = np.full(shape[0], shape[1])
+    t = t.ravel()
+    v = v.ravel()
 
-                    dvdt[i] = (v[i + 1] - v[i - 1]) / (t[i + 1] - t[i - 1])
+    starts, ends = _segment_bounds(t.size, lengths)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dvdt = _segmented_derivative(t, v, starts, ends, method)
 
-    return dvdt
+    return dvdt.reshape(shape)
 
 
 def truncated_remainder(dividend, divisor):
@@ -110,40 +132,112 @@ def transform_to_pipi(input_angle):
     return output_angle, revolutions
 
 
-def remove_acceleration_outliers(acc):
-    acc_threshold_g = 7.5
-    if math.fabs(acc[0]) > acc_threshold_g:
-        acc[0] = 0.0
-
-    for i in range(1, acc.size - 1):
-        if math.fabs(acc[i]) > acc_threshold_g:
-            acc[i] = acc[i - 1]
+def wrap_to_pipi(input_angle):
+    # Vectorized version of transform_to_pipi (angle only)
+    pi = math.pi
+    a = np.asarray(input_angle, dtype=float)
+    s = np.sign(a)
 
-    if math.fabs(acc[-1]) > acc_threshold_g:
-        acc[-1] = acc[-2]
+    p1 = a + s * pi
+    p1 = p1 - 2 * pi * np.trunc(p1 / (2 * pi))
+    r = a + pi
+    r = r - 2 * pi * np.trunc(r / (2 * pi))
+    p2 = np.sign(s + 2 * (np.sign(np.abs(r / (2 * pi))) - 1)) * pi
 
-    return acc
+    return p1 - p2
 
 
-def compute_accelerations(telemetry):
-    v = np.array(telemetry["Speed"]) / 3.6
-    lon_acc = smooth_derivative(telemetry["Time"], v) / 9.81
+def unwrap_heading(dx, dy, lengths=None):
+    #
+    # Continuous heading angle of the trajectory. Each sample takes the representation of
+    # atan2(dy, dx) closest to the previous sample, restarting at the first sample of every lap.
+    #
+    angle = np.arctan2(dy, dx)
+    shape = angle.shape
+    if angle.ndim == 2:
+        lengths = np.full(shape[0], shape[1])
+    angle = angle.ravel()
+    starts, _ = _segment_bounds(angle.size, lengths)
+
+    step = np.empty(angle.size)
+    step[1:] = angle[1:] - angle[:-1]
+    step[starts] = angle[starts]
+
+    # Number of full revolutions removed by the wrap at every step
+    revolutions = np.rint((wrap_to_pipi(step) - step) / (2 * math.pi))
+    revolutions = np.cumsum(revolutions)
+    offsets = np.zeros(starts.size)
+    offsets[1:] = revolutions[starts[1:] - 1]
+    revolutions -= np.repeat(offsets, np.diff(np.append(starts, angle.size)))
+
+    theta = angle + 2 * math.pi * revolutions
+    return theta.reshape(shape)
+
+
+def remove_acceleration_outliers(acc, lengths=None):
+    # Samples above the threshold repeat the previous valid value (the first sample of a lap falls back to 0)
+    acc_threshold_g = ACC_THRESHOLD_G
+    acc = np.asarray(acc, dtype=float)
+    shape = acc.shape
+    if acc.ndim == 2:
+        lengths = np.full(shape[0], shape[1])
+    acc = acc.ravel()
+    starts, _ = _segment_bounds(acc.size, lengths)
+
+    outlier = np.abs(acc) > acc_threshold_g
+    first = starts[outlier[starts]]
+    acc[first] = 0.0
+    outlier[first] = False
+
+    source = np.where(outlier, 0, np.arange(acc.size))
+    np.maximum.accumulate(source, out=source)
+    acc[:] = acc[source]
+
+    return acc.reshape(shape)
+
+
+def accelerations_from_arrays(time, speed, distance, x, y, lengths=None):
+    #
+    # Core acceleration engine. Channels are either 1D (one lap, or a ragged batch of
+    # concatenated laps described by `lengths`) or 2D (stacked laps of equal size).
+    #
+    v = np.asarray(speed, dtype=float) / 3.6
+    lon_acc = smooth_derivative(time, v, lengths=lengths) / 9.81
 
-    dx = smooth_derivative(telemetry["Distance"], telemetry["X"])
-    dy = smooth_derivative(telemetry["Distance"], telemetry["Y"])
+    dx = smooth_derivative(distance, x, lengths=lengths)
+    dy = smooth_derivative(distance, y, lengths=lengths)
 
-    theta = np.zeros(dx.size)
-    theta[0] = math.atan2(dy[0], dx[0])
-    for i in range(0, dx.size):
-        theta[i] = (
-            theta[i - 1] + transform_to_pipi(math.atan2(dy[i], dx[i]) - theta[i - 1])[0]
-        )
+    theta = unwrap_heading(dx, dy, lengths=lengths)
 
-    kappa = smooth_derivative(telemetry["Distance"], theta)
+    kappa = smooth_derivative(distance, theta, lengths=lengths)
     lat_acc = v * v * kappa / 9.81
 
     # Remove outliers
-    lon_acc = remove_acceleration_outliers(lon_acc)
-    lat_acc = remove_acceleration_outliers(lat_acc)
+    lon_acc = remove_acceleration_outliers(lon_acc, lengths=lengths)
+    lat_acc = remove_acceleration_outliers(lat_acc, lengths=lengths)
+
+    return np.round(lon_acc, 2), np.round(lat_acc, 2)
+
+
+def compute_accelerations(telemetry):
+    return accelerations_from_arrays(telemetry["Time"], telemetry["Speed"], telemetry["Distance"],
+                                     telemetry["X"], telemetry["Y"])
+
+
+def compute_accelerations_batch(telemetries):
+    #
+    # Accelerations of many laps in a single pass. Returns one (lon_acc, lat_acc) pair per telemetry.
+    #
+    telemetries = list(telemetries)
+    if not telemetries:
+        return []
+    lengths = [len(tel) for tel in telemetries]
+
+    def channel(name):
+        return np.concatenate([to_seconds(tel[name]) for tel in telemetries])
+
+    lon_acc, lat_acc = accelerations_from_arrays(channel("Time"), channel("Speed"), channel("Distance"),
+                                                 channel("X"), channel("Y"), lengths=lengths)
 
-    return np.round(lon_acc, 2), np.round(lat_acc, 2)
\ No newline at end of file
+    splits = np.cumsum(lengths)[:-1]
+    return list(zip(np.split(lon_acc, splits), np.split(lat_acc, splits)))
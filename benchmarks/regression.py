@@ -0,0 +1,158 @@
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+from aceleration import compute_accelerations, compute_accelerations_batch, accelerations_from_arrays, \
+    to_seconds, transform_to_pipi
+from F1Event import F1Event
+from cache import SessionCache
+from benchmarks.synthetic import build_session
+
+
+#
+# Regression checks of the optimized data paths against the original implementations,
+# on a synthetic session:
+#
+#   python -m benchmarks.regression
+#
+# Accelerations are rounded to 0.01 g, so the vectorized engine may differ from the
+# original loop by one unit in the last place on rounding ties; anything larger fails.
+# The cache check evicts from a temporary cache directory.
+#
+
+
+def _loop_derivative(t, v):
+    # smooth_derivative original, amostra por amostra
+    t = np.asarray(t, dtype=float)
+    v = np.asarray(v, dtype=float)
+    n = t.size
+    dvdt = np.zeros(n)
+    dvdt[0] = (v[1] - v[0]) / (t[1] - t[0])
+    dvdt[1] = (v[2] - v[0]) / (t[2] - t[0])
+    dvdt[2] = (v[3] - v[1]) / (t[3] - t[1])
+    dvdt[n - 1] = (v[n - 1] - v[n - 2]) / (t[n - 1] - t[n - 2])
+    dvdt[n - 2] = (v[n - 1] - v[n - 3]) / (t[n - 1] - t[n - 3])
+    dvdt[n - 3] = (v[n - 2] - v[n - 4]) / (t[n - 2] - t[n - 4])
+    c = [5.0 / 32.0, 4.0 / 32.0, 1.0 / 32.0]
+    for i in range(3, n - 3):
+        for j in range(1, 4):
+            if (t[i + j] - t[i - j]) != 0:
+                dvdt[i] += 2 * j * c[j - 1] * (v[i + j] - v[i - j]) / (t[i + j] - t[i - j])
+    return dvdt
+
+
+def _loop_outliers(acc):
+    if math.fabs(acc[0]) > 7.5:
+        acc[0] = 0.0
+    for i in range(1, acc.size - 1):
+        if math.fabs(acc[i]) > 7.5:
+            acc[i] = acc[i - 1]
+    if math.fabs(acc[-1]) > 7.5:
+        acc[-1] = acc[-2]
+    return acc
+
+
+def loop_accelerations(telemetry):
+    # compute_accelerations original (laço em Python), referência das verificações
+    v = np.array(telemetry['Speed'], dtype=float) / 3.6
+    lon_acc = _loop_derivative(to_seconds(telemetry['Time']), v) / 9.81
+
+    dx = _loop_derivative(telemetry['Distance'], telemetry['X'])
+    dy = _loop_derivative(telemetry['Distance'], telemetry['Y'])
+
+    theta = np.zeros(dx.size)
+    theta[0] = math.atan2(dy[0], dx[0])
+    for i in range(0, dx.size):
+        theta[i] = theta[i - 1] + transform_to_pipi(math.atan2(dy[i], dx[i]) - theta[i - 1])[0]
+
+    kappa = _loop_derivative(telemetry['Distance'], theta)
+    lat_acc = v * v * kappa / 9.81
+
+    lon_acc = _loop_outliers(lon_acc)
+    lat_acc = _loop_outliers(lat_acc)
+    return np.round(lon_acc, 2), np.round(lat_acc, 2)
+
+
+def _difference(results, expected):
+    return max(float(np.max(np.abs(np.asarray(a) - np.asarray(b)), initial=0.0))
+               for result, reference in zip(results, expected) for a, b in zip(result, reference))
+
+
+def check_accelerations(n_drivers: int = 4, n_laps: int = 6, samples_per_lap: int = 300,
+                        tolerance: float = 0.01 + 1e-9):
+    # Maior diferença (g) de cada caminho para o laço original; {caso: diferença}
+    session = build_session(n_drivers, n_laps, samples_per_lap)
+    event = F1Event(session.event.year, 'Synthetic', 'R', session=session, save_figures=False)
+    keys = [(drv, int(lap_number)) for drv in event.get_drivers()
+            for lap_number in event.get_laps(drv)['LapNumber']]
+    telemetries = [event.get_lap_telemetry(*key, driver_ahead=False) for key in keys]
+    # o laço original não aceita NaN (ex.: X/Y antes da primeira amostra de posição da primeira volta)
+    finite = [all(np.isfinite(to_seconds(tel[name])).all() for name in ('Time', 'Speed', 'Distance', 'X', 'Y'))
+              for tel in telemetries]
+    keys = [key for key, ok in zip(keys, finite) if ok]
+    telemetries = [tel for tel, ok in zip(telemetries, finite) if ok]
+    if len(set(len(tel) for tel in telemetries)) < 2:
+        raise RuntimeError("the synthetic laps should have different sizes to exercise the ragged batch")
+    expected = [loop_accelerations(tel) for tel in telemetries]
+
+    # voltas de mesmo tamanho empilhadas (entrada 2D), cortadas no tamanho da menor
+    size = min(len(tel) for tel in telemetries)
+    stacked = [tel.iloc[:size] for tel in telemetries]
+    channels = [np.stack([to_seconds(tel[name]) for tel in stacked])
+                for name in ('Time', 'Speed', 'Distance', 'X', 'Y')]
+    lon_acc, lat_acc = accelerations_from_arrays(*channels)
+
+    differences = {
+        'single_lap': _difference([compute_accelerations(tel) for tel in telemetries], expected),
+        'ragged_batch': _difference(compute_accelerations_batch(telemetries), expected),
+        'stacked_batch': _difference(list(zip(lon_acc, lat_acc)), [loop_accelerations(tel) for tel in stacked]),
+        # cache de acelerações do F1Event: primeira chamada calcula, a segunda lê do cache
+        'event_cache': max(_difference(event.get_accelerations(keys, telemetries), expected),
+                           _difference(event.get_accelerations(keys), expected)),
+    }
+    failed = {case: difference for case, difference in differences.items() if difference > tolerance}
+    return differences, failed
+
+
+def check_cache_eviction():
+    # evict apaga só sessões antigas: as usadas desde o início do processo (podem estar em leitura) ficam
+    path = tempfile.mkdtemp()
+    old = time.time() - 3600
+    for idx, session in enumerate(('2023/A/R', '2023/B/R', '2024/C/R', '2024/D/R')):
+        directory = os.path.join(path, *session.split('/'))
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'laps.ff1pkl'), 'wb') as f:
+            f.write(b'0' * 1000)
+        if session != '2024/D/R':
+            os.utime(directory, (old + idx, old + idx))
+    evicted = SessionCache(path).evict(max_size=0)
+    expected = [os.path.join('2023', 'A', 'R'), os.path.join('2023', 'B', 'R'), os.path.join('2024', 'C', 'R')]
+    kept = os.path.isdir(os.path.join(path, '2024', 'D', 'R'))
+    return evicted, [] if evicted == expected and kept else [f"evicted {evicted}, in-use session kept: {kept}"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.regression')
+    parser.add_argument('--drivers', type=int, default=4)
+    parser.add_argument('--laps', type=int, default=6)
+    parser.add_argument('--samples', type=int, default=300, help='samples per lap')
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    differences, failed = check_accelerations(args.drivers, args.laps, args.samples)
+    for case, difference in differences.items():
+        print(f"accelerations {case:<16}max difference {difference:.4f} g{'  FAILED' if case in failed else ''}")
+    evicted, errors = check_cache_eviction()
+    print(f"cache eviction            evicted {len(evicted)} old sessions{'  FAILED: ' + errors[0] if errors else ''}")
+    if failed or errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
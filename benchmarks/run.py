@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from aceleration import compute_accelerations, compute_accelerations_batch
+from F1Event import F1Event
+from session_index import SessionIndex
+from lap_summary import LapSummary
+from corners import CornerTable
+from lap_index import LapVectors
+from fastf1.livetiming.data import LiveTimingData
+
+from live import live_event
+from benchmarks.synthetic import build_session, write_live_recording
+
+
+#
+# Offline benchmarks of the F1Event / aceleration.py data paths on a synthetic session.
+#
+#   python -m benchmarks.run                              # 20 drivers x 70 laps x ~700 samples/lap
+#   python -m benchmarks.run --save-baseline base.json
+#   python -m benchmarks.run --baseline base.json         # compare against a saved run
+#
+
+
+class Context:
+    def __init__(self, n_drivers, n_laps, samples_per_lap):
+        self.session = build_session(n_drivers, n_laps, samples_per_lap)
+        self.event = F1Event(self.session.event.year, 'Synthetic', 'R', session=self.session, save_figures=False)
+        self.drivers = self.event.get_drivers()
+        self.n_laps = len(self.session.laps)
+
+        # telemetria das voltas mais rápidas, preparada fora da medição
+        self.fastest = [(drv, int(self.event.session_index.fastest_lap(drv)['LapNumber'])) for drv in self.drivers]
+        self.telemetry = [self.event.get_lap_telemetry(*key) for key in self.fastest]
+        self.samples = sum(len(tel) for tel in self.telemetry)
+
+
+def _cold(event, method, *args):
+    # roda o método sem reaproveitar nada calculado em execuções anteriores
+    def run():
+        event._reset_caches()
+        getattr(event, method)(*args)
+        plt.close('all')
+    return run
+
+
+def _live_replay(ctx):
+    # reproduz a corrida inteira a partir de uma gravação de live timing (já lida do disco)
+    path = os.path.join(tempfile.mkdtemp(), 'live.txt')
+    write_live_recording(ctx.session, path)
+    livedata = LiveTimingData(path)
+    livedata.load()
+
+    def run():
+        live_event(ctx.session.event.year, 'Synthetic', 'R', livedata=livedata, session=ctx.session).run()
+    return run
+
+
+def cases(ctx):
+    # nome -> (função medida, unidades processadas por chamada, unidade)
+    pair = ctx.drivers[:2]
+    pair_samples = sum(len(tel) for tel in ctx.telemetry[:2])
+    return {
+        'compute_accelerations': (lambda: [compute_accelerations(tel) for tel in ctx.telemetry], ctx.samples, 'samples'),
+        'compute_accelerations_batch': (lambda: compute_accelerations_batch(ctx.telemetry), ctx.samples, 'samples'),
+        'session_index': (lambda: SessionIndex(ctx.session), ctx.n_laps, 'laps'),
+        'lap_summary': (lambda: LapSummary(ctx.session), ctx.n_laps, 'laps'),
+        'corner_table': (lambda: CornerTable(ctx.session, ctx.event.circuit_info().corners), ctx.n_laps, 'laps'),
+        'lap_vectors': (lambda: LapVectors(ctx.session), ctx.n_laps, 'laps'),
+        'strategy_simulation': (_cold(ctx.event, 'strategy_simulation_data', None, 1000, (1, 2, 3), 0), ctx.n_laps, 'laps'),
+        'get_lap_telemetry': (lambda: [ctx.event.get_lap_telemetry(*key) for key in ctx.fastest[:2]], pair_samples, 'samples'),
+        'telemetry_between_drivers': (_cold(ctx.event, 'telemetry_between_drivers', *pair), pair_samples, 'samples'),
+        'gg_plot': (_cold(ctx.event, 'gg_plot', ctx.drivers, [lap for _, lap in ctx.fastest]), ctx.samples, 'samples'),
+        'gg_envelope': (_cold(ctx.event, 'gg_envelope'), ctx.n_laps, 'laps'),
+        'plot_top_speed': (_cold(ctx.event, 'plot_top_speed'), ctx.n_laps, 'laps'),
+        'telemetry_tensor': (_cold(ctx.event, 'telemetry_tensor'), ctx.samples, 'samples'),
+        'race_trace_chart': (_cold(ctx.event, 'race_trace_chart'), ctx.n_laps, 'laps'),
+        'plot_tyre_degredation': (_cold(ctx.event, 'plot_tyre_degredation'), ctx.n_laps, 'laps'),
+        'tyre_strategy': (_cold(ctx.event, 'tyre_strategy'), ctx.n_laps, 'laps'),
+        'position_changes': (_cold(ctx.event, 'position_changes'), ctx.n_laps, 'laps'),
+        'live_replay': (_live_replay(ctx), ctx.n_laps, 'laps'),
+    }
+
+
+def measure(fn, units, unit, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = statistics.median(times)
+    return {'seconds': seconds, 'min_seconds': min(times), 'throughput': units / seconds,
+            'unit': f'{unit}/s', 'peak_mb': peak / 1e6}
+
+
+def report(results, baseline=None, tolerance=0.2):
+    regressions = []
+    print(f"{'case':<30}{'median (s)':>12}{'throughput':>22}{'peak (MB)':>12}{'vs baseline':>14}")
+    for name, result in results.items():
+        line = (f"{name:<30}{result['seconds']:>12.4f}"
+                f"{result['throughput']:>14.0f} {result['unit']:<9}{result['peak_mb']:>10.1f}")
+        if baseline is not None and name in baseline:
+            ratio = result['seconds'] / baseline[name]['seconds']
+            line += f"{ratio:>13.2f}x"
+            if ratio > 1 + tolerance:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run')
+    parser.add_argument('--drivers', type=int, default=20)
+    parser.add_argument('--laps', type=int, default=70)
+    parser.add_argument('--samples', type=int, default=700, help='samples per lap')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', help='run only these cases')
+    parser.add_argument('--save-baseline', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against a JSON file written by --save-baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown flagged as regression')
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    ctx = Context(args.drivers, args.laps, args.samples)
+    selected = cases(ctx)
+    if args.only:
+        selected = {name: selected[name] for name in args.only}
+
+    results = {name: measure(fn, units, unit, args.repeat) for name, (fn, units, unit) in selected.items()}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = report(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'config': {'drivers': args.drivers, 'laps': args.laps, 'samples': args.samples},
+                       'results': results}, f, indent=2)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
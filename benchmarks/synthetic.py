@@ -0,0 +1,250 @@
+import functools
+import json
+
+import numpy as np
+import pandas as pd
+from fastf1.core import Session, Laps, Telemetry, SessionResults
+from fastf1.events import Event
+from fastf1.mvapi.data import CircuitInfo
+from fastf1.plotting import _interface
+from fastf1.plotting._base import Driver, DriverTeamMapping, Team
+
+
+TEAMS = [
+    ('Red Bull Racing', '3671c6', ('VER', 'TSU')),
+    ('McLaren', 'ff8000', ('NOR', 'PIA')),
+    ('Ferrari', 'e8002d', ('LEC', 'HAM')),
+    ('Mercedes', '27f4d2', ('RUS', 'ANT')),
+    ('Aston Martin', '229971', ('ALO', 'STR')),
+    ('Alpine', '0093cc', ('GAS', 'DOO')),
+    ('Williams', '64c4ff', ('ALB', 'SAI')),
+    ('Racing Bulls', '6692ff', ('LAW', 'HAD')),
+    ('Kick Sauber', '52e252', ('HUL', 'BOR')),
+    ('Haas F1 Team', 'b6babd', ('OCO', 'BEA')),
+]
+
+TRACK_LENGTH = 5000.0
+SESSION_START = pd.Timedelta(minutes=55)
+
+
+def _track(d):
+    # closed track shape with a few tighter sections
+    u = 2 * np.pi * d / TRACK_LENGTH
+    x = 2500 * np.cos(u) + 300 * np.cos(3 * u)
+    y = 1200 * np.sin(u) + 200 * np.sin(5 * u)
+    return x, y
+
+
+def _reference_lap(n=5000):
+    d = np.linspace(0, TRACK_LENGTH, n)
+    u = 2 * np.pi * d / TRACK_LENGTH
+    speed = 230 + 80 * np.cos(5 * u) + 20 * np.sin(3 * u)
+    dt = np.diff(d) / (speed[1:] / 3.6)
+    t = np.concatenate([[0.0], np.cumsum(dt)])
+    return d, speed, t
+
+
+def build_session(n_drivers=20, n_laps=70, samples_per_lap=700, year=2025, seed=0):
+    #
+    # Builds a loaded FastF1 race session without network access: laps, results,
+    # car data and position data (on a time base shared by all drivers, as in the
+    # live timing feed), circuit info and team colors.
+    #
+    t0_date = pd.Timestamp(f'{year}-03-16 03:05:00')
+    rng = np.random.default_rng(seed)
+    ref_d, ref_speed, ref_t = _reference_lap()
+    ref_time = ref_t[-1]
+    dt = ref_time / samples_per_lap
+
+    event = Event({'RoundNumber': 1, 'Country': 'Synthetic', 'Location': 'Synthetic',
+                   'EventName': 'Synthetic Grand Prix', 'EventDate': pd.Timestamp(f'{year}-03-16'),
+                   'OfficialEventName': 'Synthetic Grand Prix', 'EventFormat': 'conventional',
+                   'Session5': 'Race', 'Session5Date': pd.Timestamp(f'{year}-03-16 15:00+11:00'),
+                   'Session5DateUtc': pd.Timestamp(f'{year}-03-16 04:00'), 'F1ApiSupport': True}, year=year)
+    session = Session.__new__(Session)
+    session.event = event
+    session.name = 'Race'
+    session.f1_api_support = True
+    session.date = pd.Timestamp(f'{year}-03-16 04:00')
+    session.api_path = f'/static/{year}/synthetic/race/'
+    session._RACE_LIKE_SESSIONS = ('Race', 'Sprint')
+    session._QUALI_LIKE_SESSIONS = ('Qualifying', 'Sprint Qualifying')
+    session._session_split_times = None
+    session._t0_date = t0_date
+    session._session_start_time = SESSION_START
+    session._total_laps = n_laps
+
+    drivers = []
+    for team, color, abbs in TEAMS:
+        for abb in abbs:
+            drivers.append((team, color, abb))
+    drivers = drivers[:n_drivers]
+
+    lap_rows = []
+    car_data = {}
+    pos_data = {}
+    for idx, (team, color, abb) in enumerate(drivers):
+        number = str(idx + 1)
+        base = ref_time * (1 + 0.002 * idx)
+        pits = sorted(rng.choice(np.arange(max(2, n_laps // 5), max(3, n_laps - n_laps // 7)), size=2, replace=False))
+        compounds = rng.choice(['SOFT', 'MEDIUM', 'HARD'], size=3)
+        stint = 1
+        tyre_life = 0
+        lap_start = SESSION_START
+        lap_starts = []
+        lap_times = []
+        best = pd.Timedelta.max
+        for lap in range(1, n_laps + 1):
+            if lap - 1 in pits:
+                stint += 1
+                tyre_life = 0
+            tyre_life += 1
+            fuel = 110 - lap * 110 / n_laps
+            lap_time = base + 0.03 * fuel + 0.05 * tyre_life + rng.normal(0, 0.3)
+            if lap - 1 in pits or lap in pits:
+                lap_time += 10
+            lap_td = pd.Timedelta(seconds=lap_time)
+            split = lap_time * np.array([0.3, 0.4, 0.3])
+            personal_best = lap_td < best
+            best = min(best, lap_td)
+            lap_rows.append({
+                'Time': lap_start + lap_td, 'Driver': abb, 'DriverNumber': number,
+                'LapTime': lap_td, 'LapNumber': float(lap), 'Stint': float(stint),
+                'PitOutTime': lap_start if lap - 1 in pits else pd.NaT,
+                'PitInTime': lap_start + lap_td if lap in pits else pd.NaT,
+                'Sector1Time': pd.Timedelta(seconds=split[0]),
+                'Sector2Time': pd.Timedelta(seconds=split[1]),
+                'Sector3Time': pd.Timedelta(seconds=split[2]),
+                'Sector1SessionTime': lap_start + pd.Timedelta(seconds=split[0]),
+                'Sector2SessionTime': lap_start + pd.Timedelta(seconds=split[:2].sum()),
+                'Sector3SessionTime': lap_start + lap_td,
+                'SpeedI1': 280.0, 'SpeedI2': 290.0, 'SpeedFL': 300.0, 'SpeedST': 320.0,
+                'IsPersonalBest': personal_best, 'Compound': compounds[stint - 1],
+                'TyreLife': float(tyre_life), 'FreshTyre': True, 'Team': team,
+                'LapStartTime': lap_start, 'LapStartDate': t0_date + lap_start,
+                'TrackStatus': '1' if rng.random() > 0.05 else '4', 'Position': np.nan,
+                'Deleted': False, 'DeletedReason': '', 'FastF1Generated': False, 'IsAccurate': True,
+            })
+
+            lap_starts.append(lap_start)
+            lap_times.append(lap_time)
+            lap_start = lap_start + lap_td
+
+        # telemetry samples on a session-wide time base shared by all drivers
+        lap_starts_s = np.array([(x - SESSION_START).total_seconds() for x in lap_starts])
+        lap_times_s = np.array(lap_times)
+        end = lap_starts_s[-1] + lap_times_s[-1]
+        for store, offset in ((car_data, 0.0), (pos_data, 0.37)):
+            t = np.arange(offset * dt, end, dt)
+            lap_idx = np.searchsorted(lap_starts_s, t, side='right') - 1
+            scale = lap_times_s[lap_idx] / ref_time
+            d = np.interp((t - lap_starts_s[lap_idx]) / scale, ref_t, ref_d)
+            session_time = SESSION_START + pd.to_timedelta(t, unit='s')
+            if store is car_data:
+                speed = np.interp(d, ref_d, ref_speed) / scale + rng.normal(0, 1, t.size)
+                df = pd.DataFrame({
+                    'Date': t0_date + session_time, 'SessionTime': session_time,
+                    'RPM': 8000 + 30 * speed, 'Speed': speed,
+                    'nGear': np.clip((speed // 45).astype(int) + 1, 1, 8),
+                    'Throttle': np.clip((speed - 150) * 1.2, 0, 100),
+                    'Brake': np.gradient(speed) < -1.5,
+                    'DRS': np.where((d > 500) & (d < 1200), 12, 1),
+                    'Source': 'car',
+                })
+            else:
+                x, y = _track(d)
+                df = pd.DataFrame({
+                    'Date': t0_date + session_time, 'SessionTime': session_time,
+                    'Status': 'OnTrack', 'X': x, 'Y': y, 'Z': np.zeros(t.size), 'Source': 'pos',
+                })
+            df['Time'] = df['SessionTime'] - df['SessionTime'].iloc[0]
+            store[number] = Telemetry(df, session=session, driver=number)
+
+    laps = pd.DataFrame(lap_rows)
+    laps['Position'] = laps.groupby('LapNumber')['Time'].rank(method='first')
+    session._laps = Laps(laps, session=session, _force_default_cols=True)
+    session._car_data = car_data
+    session._pos_data = pos_data
+
+    final = laps[laps['LapNumber'] == n_laps].sort_values('Time')
+    results = pd.DataFrame({
+        'DriverNumber': final['DriverNumber'].values, 'Abbreviation': final['Driver'].values,
+        'TeamName': final['Team'].values, 'Position': np.arange(1.0, len(final) + 1),
+        'Status': 'Finished',
+    }, index=final['DriverNumber'].values)
+    session._results = SessionResults(results, _force_default_cols=True)
+    session._session_info = {'Meeting': {'Circuit': {'Key': 0, 'ShortName': 'Synthetic'}}}
+    session._weather_data = pd.DataFrame()
+    session._race_control_messages = pd.DataFrame()
+    session._track_status = pd.DataFrame({'Time': [pd.Timedelta(0)], 'Status': ['1'], 'Message': ['AllClear']})
+
+    corners_d = np.linspace(300, TRACK_LENGTH - 300, 12)
+    cx, cy = _track(corners_d)
+    corners = pd.DataFrame({'X': cx, 'Y': cy, 'Number': np.arange(1, 13), 'Letter': '',
+                            'Angle': 0.0, 'Distance': corners_d})
+    circuit_info = CircuitInfo(corners=corners, marshal_lights=corners.copy(),
+                               marshal_sectors=corners.copy(), rotation=0.0)
+    session.get_circuit_info = functools.partial(_circuit_info, circuit_info)
+
+    _register_team_colors(session, drivers)
+    return session
+
+
+def _circuit_info(circuit_info):
+    return circuit_info
+
+
+def _register_team_colors(session, drivers):
+    # plotting looks the driver/team mapping up from the livetiming API; provide it locally
+    teams = {}
+    for team_name, color, abb in drivers:
+        if team_name not in teams:
+            teams[team_name] = Team(name=team_name, normalized_name=team_name.lower(),
+                                    short_name=team_name, drivers=[],
+                                    colors={'official': f'#{color}', 'fastf1': f'#{color}'})
+        team = teams[team_name]
+        team.add_driver(Driver(team=team, abbreviation=abb, name=abb, normalized_name=abb.lower()))
+    _interface._DRIVER_TEAM_MAPPINGS[session.api_path] = DriverTeamMapping(
+        year=str(session.event['EventDate'].year), teams=list(teams.values()))
+
+
+def _lap_time_string(lap_time):
+    seconds = lap_time.total_seconds()
+    return f"{int(seconds // 60)}:{seconds % 60:06.3f}"
+
+
+def write_live_recording(session, path):
+    #
+    # Writes the laps of a (synthetic) session as a live timing recording in the
+    # SignalRClient format read by fastf1.livetiming.data.LiveTimingData.
+    #
+    laps = session.laps
+    start = laps['LapStartTime'].min()
+    start_utc = (session._t0_date + start).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    messages = [(start, 'SessionData', {'StatusSeries': [{'Utc': start_utc, 'SessionStatus': 'Started'}]})]
+    driver_list = {number: {'Tla': abb, 'TeamName': team, 'RacingNumber': number}
+                   for number, abb, team in zip(session.results['DriverNumber'], session.results['Abbreviation'],
+                                                session.results['TeamName'])}
+    messages.append((start, 'DriverList', driver_list))
+    messages.append((start, 'LapCount', {'CurrentLap': 1, 'TotalLaps': session.total_laps}))
+
+    for (number, stint), stint_laps in laps.groupby(['DriverNumber', 'Stint'], sort=False):
+        first = stint_laps.iloc[0]
+        stint_msg = {'Compound': first['Compound'], 'New': 'true', 'StartLaps': int(first['TyreLife']) - 1}
+        # new tyres are announced shortly after the in-lap
+        messages.append((first['LapStartTime'] + pd.Timedelta(seconds=1), 'TimingAppData', {'Lines': {number: {'Stints': {str(int(stint) - 1): stint_msg}}}}))
+    for _, lap in laps.iterrows():
+        line = {'NumberOfLaps': int(lap['LapNumber']), 'LastLapTime': {'Value': _lap_time_string(lap['LapTime'])}}
+        if not pd.isna(lap['Position']):
+            line['Position'] = str(int(lap['Position']))
+        messages.append((lap['Time'], 'TimingData', {'Lines': {lap['DriverNumber']: line}}))
+        if not pd.isna(lap['PitInTime']):
+            messages.append((lap['PitInTime'] - pd.Timedelta(seconds=1), 'TimingData', {'Lines': {lap['DriverNumber']: {'InPit': True}}}))
+        if not pd.isna(lap['PitOutTime']):
+            messages.append((lap['PitOutTime'], 'TimingData', {'Lines': {lap['DriverNumber']: {'PitOut': True, 'InPit': False}}}))
+
+    messages.sort(key=lambda message: message[0])
+    with open(path, 'w') as f:
+        for session_time, category, msg in messages:
+            date = (session._t0_date + session_time).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            f.write(json.dumps([category, msg, date]) + '\n')
@@ -0,0 +1,266 @@
+import contextvars
+import logging
+import os
+import shutil
+import threading
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+import fastf1 as ff1
+import pandas as pd
+
+
+# Mensagens INFO de fastf1.req que marcam leituras do cache (dependem do texto do FastF1; ver SessionCache.track)
+hit_messages = ('Using cached data for',)
+miss_messages = ('No cached data found for', 'Updating cache for')
+
+# Sessões usadas desde o início deste processo (mtime mais novo) não são apagadas por evict
+_process_start = time.time()
+
+
+class _CacheLog(logging.Handler):
+    # Conta leituras do cache a partir das mensagens de fastf1.req, no contador do contexto atual
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.counts = contextvars.ContextVar('cache_counts', default=None)
+
+    def emit(self, record):
+        counts = self.counts.get()
+        if counts is None:
+            return
+        message = record.getMessage()
+        if message.startswith(hit_messages):
+            counts['hits'] += 1
+        elif message.startswith(miss_messages):
+            counts['misses'] += 1
+
+
+_cache_log = _CacheLog()
+
+# O handler fica em fastf1.req (em INFO) só enquanto houver algum track() ativo
+_req_logger = logging.getLogger('fastf1.req')
+_req_lock = threading.Lock()
+_req_depth = 0
+_req_level = logging.NOTSET
+
+
+@contextmanager
+def _request_log():
+    global _req_depth, _req_level
+    with _req_lock:
+        if _req_depth == 0:
+            _req_level = _req_logger.level
+            if _req_logger.getEffectiveLevel() > logging.INFO:
+                _req_logger.setLevel(logging.INFO)
+            _req_logger.addHandler(_cache_log)
+        _req_depth += 1
+    try:
+        yield
+    finally:
+        with _req_lock:
+            _req_depth -= 1
+            if _req_depth == 0:
+                _req_logger.removeHandler(_cache_log)
+                _req_logger.setLevel(_req_level)
+
+
+def _fastf1_cache(attribute, fallback):
+    # Único acesso a partes privadas de ff1.Cache (métodos são chamados); fallback() se o FastF1 mudar
+    if not hasattr(ff1.Cache, attribute):
+        return fallback()
+    value = getattr(ff1.Cache, attribute)
+    return value() if callable(value) else value
+
+
+def _warn_unrecognised():
+    global _unrecognised_warned
+    if not _unrecognised_warned:
+        _unrecognised_warned = True
+        warnings.warn("FastF1 wrote cache files without a recognised log message; "
+                      "cache hit/miss statistics are unavailable (see cache.hit_messages)")
+
+
+def _pickles(path):
+    # {arquivo .ff1pkl: mtime} de uma sessão do cache
+    if not os.path.isdir(path):
+        return dict()
+    return {entry.name: entry.stat().st_mtime for entry in os.scandir(path) if entry.name.endswith('.ff1pkl')}
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+_default_cache = None
+_unrecognised_warned = False
+
+
+def default_cache_path():
+    # FASTF1_CACHE, se definido; senão o diretório padrão do FastF1 (ex.: ~/.cache/fastf1)
+    path = os.environ.get('FASTF1_CACHE') or _fastf1_cache('_get_default_cache_path',
+                                                            lambda: os.path.join('~', '.cache', 'fastf1'))
+    return os.path.expanduser(os.path.expandvars(path))
+
+
+class SessionCache:
+    #
+    # The FastF1 cache in one explicit directory, shared by every F1Event:
+    #
+    #   cache = SessionCache('~/f1cache', max_size=20 * 2**30)
+    #   event = F1Event(2024, 'Monza', 'R', cache=cache)
+    #   cache.warm_up([(2024, 'Monza', 'Q'), (2024, 'Singapore', 'R')])
+    #   cache.stats()
+    #
+    # Each session is one directory (<year>/<event>/<session>). When the sessions
+    # take more than `max_size` bytes, the least recently used ones are deleted;
+    # opening a session marks its directory as used (mtime), so the order is shared
+    # by every process using the cache. FastF1's HTTP cache (fastf1_http_cache.sqlite)
+    # expires on its own and is not counted.
+    #
+    # Hits and misses are FastF1 parsed-data reads (.ff1pkl files) per session,
+    # counted in this process while the session is loading, from the INFO messages
+    # of the fastf1.req logger (hit_messages / miss_messages; the handler and the
+    # INFO level are only set inside track()). If a load writes .ff1pkl files but no
+    # miss message is seen, the messages changed and a warning is issued. Counts
+    # follow the context of the load: threads started inside track() must run in
+    # a copy of it (contextvars.copy_context), as F1Event does.
+    #
+    # Eviction never deletes a session used (opened or loaded) since this process
+    # started, nor the one being loaded. A session that another, older process
+    # opened before that and is still reading can be deleted under it.
+    #
+    def __init__(self, path: Optional[str] = None, max_size: Optional[int] = None):
+        self.path = os.path.abspath(os.path.expanduser(path if path is not None else default_cache_path()))
+        self.max_size = max_size
+        self._counts = dict()
+
+    def enable(self):
+        # Só o caminho configurado; get_cache_info() percorreria o diretório inteiro
+        if _fastf1_cache('_CACHE_DIR', lambda: ff1.Cache.get_cache_info()[0]) != self.path:
+            os.makedirs(self.path, exist_ok=True)
+            ff1.Cache.enable_cache(self.path)
+
+    def session_path(self, session):
+        # api_path = '/static/<ano>/<evento>/<sessão>/'
+        return os.path.join(self.path, *session.api_path[len('/static/'):].strip('/').split('/'))
+
+    def get_session(self, year, place, modality):
+        self.enable()
+        return ff1.get_session(year, place, modality)
+
+    @contextmanager
+    def track(self, session):
+        # Conta hits/misses das leituras feitas dentro do bloco e marca a sessão como usada
+        self.enable()
+        path = self.session_path(session)
+        counts = self._counts.setdefault(path, Counter())
+        self.touch(session)
+        before = _pickles(path)
+        misses = counts['misses']
+        token = _cache_log.counts.set(counts)
+        try:
+            with _request_log():
+                yield counts
+        finally:
+            _cache_log.counts.reset(token)
+            written = {name for name, mtime in _pickles(path).items() if before.get(name) != mtime}
+            if written and counts['misses'] == misses:
+                _warn_unrecognised()
+            self.touch(session)
+            if self.max_size is not None:
+                self.evict(keep=(path,))
+
+    def touch(self, session):
+        path = self.session_path(session)
+        if os.path.isdir(path):
+            os.utime(path)
+
+    def sessions(self):
+        # Diretórios de sessão do cache: Session, Size (bytes), LastUsed
+        rows = []
+        for year in _subdirs(self.path):
+            for event in _subdirs(year):
+                for session in _subdirs(event):
+                    rows.append({'Session': os.path.relpath(session, self.path), 'Path': session,
+                                 'Size': _directory_size(session), 'LastUsed': os.path.getmtime(session)})
+        sessions = pd.DataFrame(rows, columns=['Session', 'Path', 'Size', 'LastUsed'])
+        sessions['LastUsed'] = pd.to_datetime(sessions['LastUsed'], unit='s')
+        return sessions.sort_values('LastUsed', ascending=False, ignore_index=True)
+
+    def size(self):
+        return int(self.sessions()['Size'].sum())
+
+    def evict(self, max_size: Optional[int] = None, keep: tuple = ()):
+        # Apaga as sessões menos usadas até o cache caber em max_size; devolve as sessões apagadas.
+        # Sessões usadas desde o início do processo podem estar sendo lidas (aqui ou em outro processo) e ficam
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return []
+        sessions = self.sessions()
+        total = sessions['Size'].sum()
+        in_use = pd.to_datetime(_process_start, unit='s')
+        evicted = []
+        for session in sessions[::-1].itertuples():
+            if total <= max_size:
+                break
+            if session.Path in keep or session.LastUsed >= in_use:
+                continue
+            shutil.rmtree(session.Path, ignore_errors=True)
+            total -= session.Size
+            evicted.append(session.Session)
+        return evicted
+
+    def stats(self):
+        # Hits/misses por sessão carregada neste processo, com o tamanho atual de cada sessão
+        sessions = self.sessions().set_index('Path')
+        rows = []
+        for path, counts in self._counts.items():
+            rows.append({'Session': os.path.relpath(path, self.path), 'Hits': counts['hits'],
+                         'Misses': counts['misses'], 'Size': sessions['Size'].get(path, 0),
+                         'Cached': path in sessions.index})
+        return pd.DataFrame(rows, columns=['Session', 'Hits', 'Misses', 'Size', 'Cached'])
+
+    def hit_rate(self):
+        hits = sum(counts['hits'] for counts in self._counts.values())
+        misses = sum(counts['misses'] for counts in self._counts.values())
+        return hits / (hits + misses) if hits + misses else float('nan')
+
+    def warm_up(self, sessions: list, laps: bool = True, telemetry: bool = True, weather: bool = True,
+                messages: bool = True, skip_errors: bool = False):
+        #
+        # Loads each (year, place, modality) once so that later F1Events only read
+        # from the cache. Returns one row per session: Hits, Misses, Seconds, Error.
+        #
+        rows = []
+        for year, place, modality in sessions:
+            start = time.perf_counter()
+            row = {'Year': year, 'Place': place, 'Modality': modality, 'Hits': 0, 'Misses': 0, 'Error': None}
+            try:
+                session = self.get_session(year, place, modality)
+                with self.track(session) as counts:
+                    session.load(laps=laps, telemetry=telemetry, weather=weather, messages=messages)
+                row.update(Hits=counts['hits'], Misses=counts['misses'])
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                row['Error'] = repr(e)
+            row['Seconds'] = time.perf_counter() - start
+            rows.append(row)
+        return pd.DataFrame(rows, columns=['Year', 'Place', 'Modality', 'Hits', 'Misses', 'Seconds', 'Error'])
+
+
+def _subdirs(path):
+    if not os.path.isdir(path):
+        return []
+    return [entry.path for entry in os.scandir(path) if entry.is_dir()]
+
+
+def default_cache():
+    # Cache usado pelos F1Event criados sem `cache`
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SessionCache()
+    return _default_cache
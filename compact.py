@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+
+# Floats com valores inteiros até 2**24 são representados exatamente em float32
+_FLOAT32_EXACT = 2 ** 24
+
+
+def _is_text(series):
+    values = series.dropna()
+    return len(values) > 0 and all(isinstance(value, str) for value in values)
+
+
+def compact_column(series, float32: bool = False, categories: bool = True):
+    #
+    # Smallest safe dtype for one column:
+    #   strings (object) with repeated values -> category
+    #   integers                              -> smallest integer type
+    #   floats                                -> float32 if `float32` or if all values are integers < 2**24
+    # Timedeltas, datetimes and booleans are kept.
+    #
+    kind = series.dtype.kind
+    if kind == 'O' and categories:
+        if _is_text(series) and series.nunique() <= len(series) // 2:
+            return series.astype('category')
+    elif kind == 'i':
+        return pd.to_numeric(series, downcast='integer')
+    elif kind == 'u':
+        return pd.to_numeric(series, downcast='unsigned')
+    elif kind == 'f' and series.dtype != np.float32:
+        if float32:
+            return series.astype(np.float32)
+        values = series.to_numpy()
+        finite = values[np.isfinite(values)]
+        if np.all(finite == np.round(finite)) and np.all(np.abs(finite) < _FLOAT32_EXACT):
+            return series.astype(np.float32)
+    return series
+
+
+def compact_frame(df, float32: bool = False, categories: bool = True):
+    # Converte as colunas no próprio DataFrame (mantém Laps/Telemetry e seus metadados); devolve bytes economizados
+    before = df.memory_usage(deep=True).sum()
+    for column in df.columns:
+        series = df[column]
+        compacted = compact_column(series, float32, categories)
+        if compacted is not series:
+            df[column] = compacted
+    return int(before - df.memory_usage(deep=True).sum())
+
+
+def compact_session(session, laps: bool = True, telemetry: bool = True):
+    # Compacta as voltas e a telemetria (float32) já carregadas; devolve {tabela: bytes economizados}
+    # Colunas de texto da telemetria (Source, Status) continuam object: o FastF1 escreve nelas ao reamostrar
+    saved = dict()
+    if laps and hasattr(session, '_laps'):
+        saved['laps'] = compact_frame(session._laps)
+    if telemetry:
+        for name in ('_car_data', '_pos_data'):
+            data = getattr(session, name, None)
+            if data:
+                saved[name.strip('_')] = sum(compact_frame(tel, float32=True, categories=False) for tel in data.values())
+    return saved
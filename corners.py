@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from lap_summary import car_data_by_lap, lap_distance
+
+
+class CornerTable:
+    # Entrada, ápice, saída, ponto de frenagem (m antes da curva) e tempo de cada curva em cada volta,
+    # numa janela de +-window metros; NaN se a janela não é coberta pelas amostras da volta
+    columns = ('Row', 'Driver', 'LapNumber', 'Corner', 'Distance', 'EntrySpeed', 'ApexSpeed', 'ApexDistance',
+               'ExitSpeed', 'BrakingPoint', 'CornerTime')
+
+    def __init__(self, session, corners: pd.DataFrame, window: float = 100.0):
+        laps = session.laps
+        corners = corners.sort_values('Distance', kind='mergesort')
+        self.window = window
+        self.corners = [f"T{number}{letter}" for number, letter in zip(corners['Number'], corners['Letter'])]
+        distance = corners['Distance'].to_numpy(dtype=float)
+        n_corners = len(distance)
+        middle = (distance[1:] + distance[:-1]) / 2
+        lower = np.maximum(distance - window, np.concatenate(([-np.inf], middle)))
+        upper = np.minimum(distance + window, np.concatenate((middle, [np.inf])))
+
+        samples = car_data_by_lap(session, ('Speed', 'Brake'))
+        row = samples['Row'].to_numpy(dtype=int)
+        time = samples['Time'].to_numpy()
+        speed = samples['Speed'].to_numpy()
+        brake = samples['Brake'].to_numpy() > 0
+
+        # Distância na volta: velocidade integrada desde LapStartTime, reiniciando a cada volta
+        travelled = lap_distance(samples, laps)
+        new_lap = np.ones(len(row), dtype=bool)
+        new_lap[1:] = row[1:] != row[:-1]
+        starts = np.flatnonzero(new_lap)
+        lap_id = np.cumsum(new_lap) - 1
+        n_laps = len(starts)
+
+        # Bordas das janelas: interpolação numa distância "global" crescente (volta * span + distância)
+        span = 2 * (travelled.max() if len(travelled) else 0) + 2 * window + 1
+        position = lap_id * span + travelled
+        first = travelled[starts]
+        last = travelled[np.append(starts[1:], len(row)) - 1]
+        entry = (np.arange(n_laps)[:, None] * span + lower).ravel()
+        leave = (np.arange(n_laps)[:, None] * span + upper).ravel()
+        covered = ((lower >= first[:, None]) & (upper <= last[:, None])).ravel()
+
+        def at(query, values):
+            result = np.full(query.size, np.nan)
+            if len(position):
+                result[covered] = np.interp(query[covered], position, values)
+            return result
+
+        entry_time, leave_time = at(entry, time), at(leave, time)
+
+        # Ápice: menor velocidade de cada (volta, curva) entre as amostras dentro da janela
+        corner = np.clip(np.searchsorted(middle, travelled), 0, max(n_corners - 1, 0))
+        inside = (travelled >= lower[corner]) & (travelled <= upper[corner]) if n_corners else \
+            np.zeros(len(row), dtype=bool)
+        key = lap_id[inside] * n_corners + corner[inside]
+        order = np.lexsort((speed[inside], key))
+        key = key[order]
+        lowest = np.ones(len(key), dtype=bool)
+        lowest[1:] = key[1:] != key[:-1]
+        apex_speed = np.full(n_laps * n_corners, np.nan)
+        apex_distance = np.full(n_laps * n_corners, np.nan)
+        apex_speed[key[lowest]] = speed[inside][order][lowest]
+        apex_distance[key[lowest]] = travelled[inside][order][lowest]
+
+        # Ponto de frenagem: último início de frenagem entre a curva anterior e a curva
+        onset = brake & ~np.concatenate(([False], brake[:-1]))
+        onset[starts] = brake[starts]
+        approaching = np.searchsorted(distance, travelled, side='left')
+        onset &= approaching < n_corners
+        key = lap_id[onset] * n_corners + approaching[onset]
+        latest = np.ones(len(key), dtype=bool)
+        latest[:-1] = key[1:] != key[:-1]
+        braking_point = np.full(n_laps * n_corners, np.nan)
+        braking_point[key[latest]] = distance[approaching[onset][latest]] - travelled[onset][latest]
+
+        lap_rows = np.repeat(row[starts], n_corners)
+        self.table = pd.DataFrame({
+            'Row': lap_rows,
+            'Driver': laps['Driver'].to_numpy()[lap_rows],
+            'LapNumber': laps['LapNumber'].to_numpy()[lap_rows],
+            'Corner': np.tile(self.corners, n_laps),
+            'Distance': np.tile(distance, n_laps),
+            'EntrySpeed': at(entry, speed),
+            'ApexSpeed': apex_speed,
+            'ApexDistance': apex_distance,
+            'ExitSpeed': at(leave, speed),
+            'BrakingPoint': braking_point,
+            'CornerTime': leave_time - entry_time,
+        }, columns=list(self.columns))
+
+    def lap(self, row):
+        return self.table[self.table['Row'] == row].reset_index(drop=True)
+
+    def time_lost(self, reference_row, rows=None):
+        # CornerTime menos o da volta de referência, curva a curva (s)
+        table = self.table if rows is None else self.table[self.table['Row'].isin(rows)]
+        reference = self.lap(reference_row).set_index('Corner')['CornerTime']
+        table = table.reset_index(drop=True)
+        table['TimeLost'] = table['CornerTime'] - table['Corner'].map(reference).to_numpy()
+        return table
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+
+# Each kg of fuel adds 0.03s to laptime. Fuel is 110kg at start of race and 0 at finish
+FUEL_START_KG = 110
+FUEL_SECONDS_PER_KG = 0.03
+
+# Voltas mais lentas que 107% da melhor volta da sessão não entram no ajuste
+QUICKLAP_THRESHOLD = 1.07
+
+
+def fuel_corrected_laptime(lap_time, lap_number, total_laps):
+    # Tempo de volta (s) recalculado para um carro sem combustível
+    fuel = FUEL_START_KG - lap_number * (FUEL_START_KG / total_laps)
+    return lap_time - FUEL_SECONDS_PER_KG * fuel
+
+
+def degradation_laps(laps, total_laps=None):
+    # Voltas usadas no ajuste: bandeira verde, sem entrada/saída de box, sem a largada e a
+    # primeira volta do jogo de pneus; LapTime já corrigido pelo combustível (s)
+    if total_laps is None:
+        total_laps = laps['LapNumber'].max()
+    lap_time = laps['LapTime'].dt.total_seconds()
+    keep = (lap_time.notna() & laps['Stint'].notna() & laps['Compound'].notna() & laps['TyreLife'].notna()
+            & (laps['TrackStatus'] == '1') & laps['PitInTime'].isna() & laps['PitOutTime'].isna()
+            & (laps['LapNumber'] > 1) & (laps['TyreLife'] > 1)
+            & (lap_time < QUICKLAP_THRESHOLD * lap_time.min()))
+    fit_laps = laps.loc[keep, ['Driver', 'Stint', 'Compound', 'TyreLife', 'LapNumber']].copy()
+    fit_laps['LapTime'] = fuel_corrected_laptime(lap_time[keep], fit_laps['LapNumber'], total_laps)
+    return fit_laps
+
+
+class DegradationModel:
+    #
+    # Linear tyre degradation (fuel-corrected LapTime ~ Intercept + Rate * TyreLife)
+    # fitted for every stint of every driver at once, from per-stint sums (np.bincount).
+    #
+    #   stints     Driver, Stint, Compound, Laps, Intercept, Rate, RMSE
+    #   compounds  Compound, Stints, Laps, Rate, Weight, BaseLapTime
+    #
+    # The compound Rate is the least-squares slope shared by all stints on that
+    # compound, each stint keeping its own intercept; Weight is the centered sum of
+    # squares of TyreLife, so rates from many sessions can be pooled (combine_compounds).
+    #
+    def __init__(self, laps, total_laps=None, min_laps: int = 3):
+        fit_laps = degradation_laps(laps, total_laps)
+        keys = fit_laps.groupby(['Driver', 'Stint'], sort=False, observed=True)
+        group = keys.ngroup().to_numpy()
+        x = fit_laps['TyreLife'].to_numpy(dtype=float)
+        y = fit_laps['LapTime'].to_numpy(dtype=float)
+
+        n_groups = keys.ngroups
+        n = np.bincount(group, minlength=n_groups).astype(float)
+        sx = np.bincount(group, x, minlength=n_groups)
+        sy = np.bincount(group, y, minlength=n_groups)
+        sxx = np.bincount(group, x * x, minlength=n_groups) - sx * sx / np.maximum(n, 1)
+        sxy = np.bincount(group, x * y, minlength=n_groups) - sx * sy / np.maximum(n, 1)
+        syy = np.bincount(group, y * y, minlength=n_groups) - sy * sy / np.maximum(n, 1)
+
+        valid = (n >= min_laps) & (sxx > 0)
+        rate = np.full(n_groups, np.nan)
+        rate[valid] = sxy[valid] / sxx[valid]
+        intercept = (sy - rate * sx) / np.maximum(n, 1)
+        rmse = np.sqrt(np.maximum(syy - rate * sxy, 0) / np.maximum(n, 1))
+
+        first = keys.head(1)
+        stints = pd.DataFrame({'Driver': first['Driver'].to_numpy(), 'Stint': first['Stint'].to_numpy(),
+                               'Compound': first['Compound'].to_numpy(), 'Laps': n.astype(int),
+                               'Intercept': intercept, 'Rate': rate, 'RMSE': rmse})
+        self.stints = stints[valid].reset_index(drop=True)
+
+        fits = pd.DataFrame({'Compound': self.stints['Compound'], 'Laps': self.stints['Laps'],
+                             'Sxy': sxy[valid], 'Sxx': sxx[valid],
+                             'BaseLapTime': self.stints['Intercept'] * self.stints['Laps']})
+        compounds = fits.groupby('Compound', observed=True).agg(Stints=('Laps', 'size'), Laps=('Laps', 'sum'),
+                                                                Sxy=('Sxy', 'sum'), Weight=('Sxx', 'sum'),
+                                                                BaseLapTime=('BaseLapTime', 'sum'))
+        compounds['Rate'] = compounds['Sxy'] / compounds['Weight']
+        compounds['BaseLapTime'] = compounds['BaseLapTime'] / compounds['Laps']
+        self.compounds = compounds.reset_index()[['Compound', 'Stints', 'Laps', 'Rate', 'Weight', 'BaseLapTime']]
+
+    def rate(self, compound):
+        rates = self.compounds.set_index('Compound')['Rate']
+        return rates.get(compound, np.nan)
+
+
+def combine_compounds(models):
+    # Curvas por composto de várias sessões (ex.: uma temporada): {sessão: DegradationModel}
+    frames = [model.compounds.assign(Session=[session] * len(model.compounds)) for session, model in models.items()]
+    if not frames:
+        return pd.DataFrame(columns=['Compound', 'Sessions', 'Stints', 'Laps', 'Rate', 'Weight'])
+    compounds = pd.concat(frames, ignore_index=True)
+    compounds['Sxy'] = compounds['Rate'] * compounds['Weight']
+    season = compounds.groupby('Compound', observed=True).agg(Sessions=('Session', 'nunique'), Stints=('Stints', 'sum'),
+                                                              Laps=('Laps', 'sum'), Sxy=('Sxy', 'sum'),
+                                                              Weight=('Weight', 'sum'))
+    season['Rate'] = season['Sxy'] / season['Weight']
+    return season.reset_index()[['Compound', 'Sessions', 'Stints', 'Laps', 'Rate', 'Weight']]
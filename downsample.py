@@ -0,0 +1,78 @@
+import numpy as np
+
+
+# Métodos de decimação aceitos por F1Event(downsample=...)
+methods = ('minmax', 'lttb')
+
+
+def _values(y):
+    # y como float (timedeltas em ns, NaT vira NaN) só para comparar; os pontos mantêm o tipo original
+    if np.issubdtype(y.dtype, np.timedelta64) or np.issubdtype(y.dtype, np.datetime64):
+        values = y.astype('int64').astype(float)
+        values[np.isnat(y)] = np.nan
+        return values
+    return y.astype(float)
+
+
+def _columns(x, n_columns):
+    # Coluna de cada amostra: intervalos iguais de x se x é numérico e crescente, senão da posição na série
+    numeric = np.issubdtype(x.dtype, np.number)
+    if numeric and len(x) > 1 and np.all(np.diff(x) >= 0) and x[-1] > x[0]:
+        edges = np.linspace(x[0], x[-1], n_columns + 1)
+        return np.clip(np.searchsorted(edges, x, side='right') - 1, 0, n_columns - 1)
+    return np.arange(len(x)) * n_columns // max(len(x), 1)
+
+
+def minmax(x, y, points: int):
+    # Mínimo e máximo de y em cada uma de points / 2 colunas de x; o início de cada trecho NaN mantém as falhas
+    if len(x) <= points:
+        return x, y
+    x = np.asarray(x)
+    y = np.asarray(y)
+    values = _values(y)
+    column = _columns(x, max(points // 2, 1))
+    finite = np.flatnonzero(np.isfinite(values))
+    order = finite[np.lexsort((values[finite], column[finite]))]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = column[order[1:]] != column[order[:-1]]
+    last = np.ones(len(order), dtype=bool)
+    last[:-1] = first[1:]
+    gap = np.isnan(values)
+    gap[1:] &= ~gap[:-1]
+    keep = np.unique(np.concatenate([order[first], order[last], np.flatnonzero(gap)]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, points: int):
+    # Largest-Triangle-Three-Buckets: em cada bucket, a amostra do maior triângulo com a anterior e a média do
+    # próximo; NaN são descartados
+    if len(x) <= points or points < 3:
+        return x, y
+    x = np.asarray(x)
+    y = np.asarray(y)
+    finite = np.isfinite(_values(y))
+    x, y = x[finite], y[finite]
+    if len(x) <= points:
+        return x, y
+    values = _values(y)
+    xf = x.astype(float) if np.issubdtype(x.dtype, np.number) else np.arange(len(x), dtype=float)
+    edges = np.linspace(1, len(x) - 1, points - 1).astype(int)
+    keep = [0]
+    for bucket in range(points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else len(x)
+        mean_x, mean_y = xf[end:next_end].mean(), values[end:next_end].mean()
+        previous = keep[-1]
+        area = np.abs((xf[previous] - mean_x) * (values[start:end] - values[previous])
+                      - (xf[previous] - xf[start:end]) * (mean_y - values[previous]))
+        keep.append(start + int(np.argmax(area)))
+    keep.append(len(x) - 1)
+    return x[keep], y[keep]
+
+
+def downsample(x, y, points: int, method: str = 'minmax'):
+    if method == 'minmax':
+        return minmax(x, y, points)
+    if method == 'lttb':
+        return lttb(x, y, points)
+    raise ValueError(f"Unknown downsampling method '{method}', expected one of {methods}")
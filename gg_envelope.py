@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from aceleration import ACC_THRESHOLD_G
+
+
+class GGEnvelope:
+    #
+    # Friction circle of each driver from all the samples of many laps.
+    #
+    #   envelope   (drivers x percentiles x angles) combined acceleration (g) reached at
+    #              each percentile inside each direction bin; NaN where there are no samples
+    #   angles     center of each direction bin (rad, atan2(LonAcc, LatAcc))
+    #   histogram  (drivers x LatAcc bins x LonAcc bins) sample counts, bin edges in `edges`
+    #   summary    per driver: Samples and the `percentiles[-1]` value of braking, traction
+    #              and lateral acceleration (g)
+    #
+    # All drivers are binned at once: samples are sorted by (driver, direction, radius)
+    # and the percentiles are read from each group's range in the sorted array.
+    #
+    def __init__(self, drivers: list, accelerations: list, n_angles: int = 72,
+                 percentiles: tuple = (50, 90, 99), g_step: float = 0.25):
+        # accelerations: (longitudinal, lateral) de cada piloto, todas as amostras das voltas válidas
+        self.drivers = list(drivers)
+        self.percentiles = tuple(percentiles)
+        self.angles = -np.pi + (np.arange(n_angles) + 0.5) * (2 * np.pi / n_angles)
+        self.edges = np.arange(-ACC_THRESHOLD_G, ACC_THRESHOLD_G + g_step / 2, g_step)
+
+        lengths = np.array([len(lon) for lon, _ in accelerations])
+        lon = np.concatenate([np.asarray(lon, dtype=float) for lon, _ in accelerations]) if len(lengths) else np.empty(0)
+        lat = np.concatenate([np.asarray(lat, dtype=float) for _, lat in accelerations]) if len(lengths) else np.empty(0)
+        driver = np.repeat(np.arange(len(self.drivers)), lengths)
+        valid = np.isfinite(lon) & np.isfinite(lat)
+        lon, lat, driver = lon[valid], lat[valid], driver[valid]
+
+        radius = np.hypot(lat, lon)
+        direction = ((np.arctan2(lon, lat) + np.pi) / (2 * np.pi) * n_angles).astype(int) % n_angles
+        group = driver * n_angles + direction
+        order = np.lexsort((radius, group))
+        radius = radius[order]
+        counts = np.bincount(group, minlength=len(self.drivers) * n_angles)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        # Percentil com interpolação linear entre as amostras ordenadas de cada grupo
+        self.envelope = np.full((len(self.drivers), len(self.percentiles), n_angles), np.nan)
+        filled = counts > 0
+        for idx, q in enumerate(self.percentiles):
+            position = starts[filled] + q / 100 * (counts[filled] - 1)
+            low = np.floor(position).astype(int)
+            high = np.minimum(low + 1, starts[filled] + counts[filled] - 1)
+            value = np.full(counts.size, np.nan)
+            value[filled] = radius[low] + (radius[high] - radius[low]) * (position - low)
+            self.envelope[:, idx] = value.reshape(len(self.drivers), n_angles)
+
+        # Histograma 2D de todos os pilotos com um único bincount
+        n_bins = len(self.edges) - 1
+        lat_bin = np.clip(np.searchsorted(self.edges, lat, side='right') - 1, 0, n_bins - 1)
+        lon_bin = np.clip(np.searchsorted(self.edges, lon, side='right') - 1, 0, n_bins - 1)
+        cells = (driver * n_bins + lat_bin) * n_bins + lon_bin
+        self.histogram = np.bincount(cells, minlength=len(self.drivers) * n_bins * n_bins) \
+            .reshape(len(self.drivers), n_bins, n_bins).astype(np.int32)
+
+        q = self.percentiles[-1]
+        rows = []
+        for idx, drv in enumerate(self.drivers):
+            drv_lon = lon[driver == idx]
+            drv_lat = np.abs(lat[driver == idx])
+            rows.append({'Driver': drv, 'Samples': len(drv_lon),
+                         'Braking': _percentile(-drv_lon[drv_lon < 0], q),
+                         'Traction': _percentile(drv_lon[drv_lon > 0], q),
+                         'Lateral': _percentile(drv_lat, q)})
+        self.summary = pd.DataFrame(rows, columns=['Driver', 'Samples', 'Braking', 'Traction', 'Lateral'])
+
+    def radius(self, drv: str, percentile=None):
+        # Envelope (g) de um piloto em cada direção, no percentil pedido (padrão: o maior)
+        percentile = self.percentiles[-1] if percentile is None else percentile
+        return self.envelope[self.drivers.index(drv), self.percentiles.index(percentile)]
+
+    def outline(self, drv: str, percentile=None):
+        # Polígono fechado (LatAcc, LonAcc) do envelope, pulando as direções sem amostras
+        radius = self.radius(drv, percentile)
+        filled = ~np.isnan(radius)
+        angles = np.append(self.angles[filled], self.angles[filled][:1])
+        radius = np.append(radius[filled], radius[filled][:1])
+        return radius * np.cos(angles), radius * np.sin(angles)
+
+    def frame(self):
+        # Envelope em formato longo: Driver, Percentile, Angle (rad), Radius (g)
+        n_drivers, n_percentiles, n_angles = self.envelope.shape
+        return pd.DataFrame({
+            'Driver': np.repeat(self.drivers, n_percentiles * n_angles),
+            'Percentile': np.tile(np.repeat(self.percentiles, n_angles), n_drivers),
+            'Angle': np.tile(self.angles, n_drivers * n_percentiles),
+            'Radius': self.envelope.ravel(),
+        })
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else np.nan
@@ -0,0 +1,103 @@
+import contextlib
+import json
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+
+
+# Contexto reutilizado quando a instrumentação está desligada (custo de uma checagem)
+_disabled_span = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ('instrumentation', 'name', 'start', 'children')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.children = 0.0
+        self.instrumentation._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        stack = self.instrumentation._stack
+        stack.pop()
+        parent = None
+        if stack:
+            stack[-1].children += seconds
+            parent = stack[-1].name
+        self.instrumentation.spans.append({'name': self.name, 'parent': parent, 'depth': len(stack),
+                                           'start': self.start, 'seconds': seconds,
+                                           'self_seconds': seconds - self.children})
+        return False
+
+
+class Instrumentation:
+    #
+    # Timing spans (public methods and their main phases) and counters for one F1Event.
+    # Disabled by default; enable with F1Event(..., instrument=True) or `enabled = True`.
+    #
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans = []
+        self.counters = Counter()
+        self._local = threading.local()
+
+    @property
+    def _stack(self):
+        # Spans abertos da thread atual (métodos podem rodar em paralelo, ex.: gg_envelope)
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def __getstate__(self):
+        # threading.local não é serializável (F1Event é enviado aos processos do render)
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _disabled_span
+        return _Span(self, name)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def reset(self):
+        self.spans = []
+        self.counters = Counter()
+        self._local = threading.local()
+
+    def trace(self):
+        return pd.DataFrame(self.spans, columns=['name', 'parent', 'depth', 'start', 'seconds', 'self_seconds'])
+
+    def summary(self):
+        # Tempo total e próprio (sem as fases internas) por método/fase
+        trace = self.trace()
+        summary = trace.groupby('name').agg(calls=('seconds', 'size'), total=('seconds', 'sum'),
+                                            self_time=('self_seconds', 'sum'), mean=('seconds', 'mean'),
+                                            max=('seconds', 'max'))
+        return summary.sort_values(by='total', ascending=False)
+
+    def to_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump({'spans': self.spans, 'counters': dict(self.counters)}, f, indent=2)
+
+    def to_csv(self, path: str):
+        self.trace().to_csv(path, index=False)
+
+    def __str__(self):
+        counters = '\n'.join(f'{name}: {value}' for name, value in sorted(self.counters.items()))
+        return f'{self.summary().to_string()}\n\n{counters}'
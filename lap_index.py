@@ -0,0 +1,206 @@
+import json
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from lap_summary import car_data_by_lap, lap_distance
+
+
+# Canais dos vetores e a escala de cada um (velocidade em km/h, acelerador em %, freio 0/1)
+vector_channels = {'Speed': 360.0, 'Throttle': 100.0, 'Brake': 1.0}
+lap_columns = ('Year', 'Place', 'Modality', 'EventName', 'Driver', 'Team', 'LapNumber', 'LapTime', 'Stint',
+               'Compound', 'TyreLife', 'PitLap', 'TrackStatus')
+
+
+class LapVectors:
+    # Velocidade, acelerador e freio de cada volta em n_points frações da distância da volta
+    # (vectors: voltas x canais x pontos, float32), com os dados de cada volta em laps
+    def __init__(self, session, n_points: int = 200):
+        laps = session.laps
+        self.n_points = n_points
+        samples = car_data_by_lap(session, tuple(vector_channels))
+        samples['Brake'] = (samples['Brake'] > 0).astype(float)
+        travelled = lap_distance(samples, laps)
+        row = samples['Row'].to_numpy(dtype=int)
+
+        new_lap = np.ones(len(row), dtype=bool)
+        new_lap[1:] = row[1:] != row[:-1]
+        starts = np.flatnonzero(new_lap)
+        lap_id = np.cumsum(new_lap) - 1
+        ends = np.append(starts[1:], len(row)) - 1
+        length = travelled[ends]
+        fraction = travelled / np.where(length > 0, length, np.nan)[lap_id]
+
+        # Pontos antes da primeira amostra da volta ficam com o valor dela (sem misturar com a volta anterior)
+        grid = np.clip(np.linspace(0, 1, n_points)[None, :], fraction[starts][:, None], 1)
+        grid = (np.arange(len(starts))[:, None] * 2 + grid).ravel()
+        position = lap_id * 2 + fraction
+        vectors = np.empty((len(starts), len(vector_channels), n_points), dtype=np.float32)
+        for idx, (channel, scale) in enumerate(vector_channels.items()):
+            values = samples[channel].to_numpy(dtype=float) / scale
+            vectors[:, idx] = np.interp(grid, position, values).reshape(len(starts), n_points) if len(row) else 0
+
+        keep = (ends > starts) & (length > 0) & np.isfinite(vectors).all(axis=(1, 2))
+        rows = row[starts][keep]
+        self.vectors = vectors[keep]
+        self.laps = pd.DataFrame({
+            'Row': rows,
+            'Driver': laps['Driver'].to_numpy()[rows],
+            'Team': laps['Team'].to_numpy()[rows],
+            'LapNumber': laps['LapNumber'].to_numpy()[rows],
+            'LapTime': laps['LapTime'].dt.total_seconds().to_numpy()[rows],
+            'Stint': laps['Stint'].to_numpy()[rows],
+            'Compound': laps['Compound'].to_numpy()[rows],
+            'TyreLife': laps['TyreLife'].to_numpy()[rows],
+            'PitLap': (laps['PitInTime'].notna() | laps['PitOutTime'].notna()).to_numpy()[rows],
+            'TrackStatus': laps['TrackStatus'].to_numpy()[rows],
+        })
+
+    def vector(self, drv: str, lap_number: int):
+        position = np.flatnonzero((self.laps['Driver'] == drv).to_numpy()
+                                  & (self.laps['LapNumber'] == lap_number).to_numpy())
+        if len(position) == 0:
+            raise KeyError(f"No car data for lap {lap_number} of {drv}")
+        return self.vectors[position[0]]
+
+
+class LapIndex:
+    # Índice persistente (vectors.npy, index.json e pca.npz em `path`) de LapVectors de várias sessões,
+    # ex.: index.append(event); index.fit(); index.nearest(event.lap_vectors.vector('VER', 12))
+    def __init__(self, path: Optional[str] = None, n_points: int = 200):
+        self.path = path
+        self.n_points = n_points
+        self.vectors = np.empty((0, len(vector_channels), n_points), dtype=np.float32)
+        self.laps = pd.DataFrame(columns=list(lap_columns))
+        self.mean = None
+        self.components = None
+        self.projected = None
+        self._norms = dict()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            index_path = os.path.join(path, 'index.json')
+            if os.path.exists(index_path):
+                with open(index_path) as f:
+                    index = json.load(f)
+                self.n_points = index['n_points']
+                self.laps = pd.DataFrame(index['laps'], columns=list(lap_columns))
+                self.vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r')
+            pca_path = os.path.join(path, 'pca.npz')
+            if os.path.exists(pca_path):
+                with np.load(pca_path) as pca:
+                    self.mean, self.components, self.projected = pca['mean'], pca['components'], pca['projected']
+
+    def __len__(self):
+        return len(self.laps)
+
+    def __contains__(self, session):
+        year, place, modality = session
+        return bool(self._session_mask(year, place, modality).any())
+
+    def _session_mask(self, year, place, modality):
+        return ((self.laps['Year'] == int(year)) & (self.laps['Place'] == str(place))
+                & (self.laps['Modality'] == modality)).to_numpy()
+
+    def append(self, event):
+        # Indexa as voltas de um F1Event; devolve o número de voltas
+        return self.append_vectors(event.year, event.place, event.modality, event.lap_vectors,
+                                   event_name=event.event.event['EventName'])
+
+    def append_vectors(self, year, place, modality, lap_vectors: LapVectors, event_name: Optional[str] = None):
+        if lap_vectors.n_points != self.n_points:
+            raise ValueError(f"Lap vectors have {lap_vectors.n_points} points, the index uses {self.n_points}")
+        keep = ~self._session_mask(year, place, modality)
+        laps = lap_vectors.laps.drop(columns='Row')
+        laps.insert(0, 'Year', int(year))
+        laps.insert(1, 'Place', str(place))
+        laps.insert(2, 'Modality', modality)
+        laps.insert(3, 'EventName', event_name)
+        self.laps = pd.concat([self.laps[keep], laps[list(lap_columns)]], ignore_index=True)
+        self.vectors = np.concatenate([self.vectors[keep], lap_vectors.vectors])
+        if self.components is not None:
+            self.projected = np.concatenate([self.projected[keep], self._project(lap_vectors.vectors)])
+        self._norms = dict()
+        self._save()
+        return len(laps)
+
+    def with_vectors(self, year, place, modality, lap_vectors: LapVectors, event_name: Optional[str] = None):
+        # Cópia em memória (sem PCA) com mais uma sessão, para consultas que não devem alterar este índice
+        index = LapIndex(n_points=self.n_points)
+        index.laps, index.vectors = self.laps, self.vectors
+        index.append_vectors(year, place, modality, lap_vectors, event_name=event_name)
+        return index
+
+    def fit(self, n_components: int = 32):
+        # PCA de todos os vetores (SVD); consultas sem `channels` passam a usar a projeção
+        flat = self.vectors.reshape(len(self.vectors), -1).astype(float)
+        self.mean = flat.mean(axis=0)
+        _, singular, components = np.linalg.svd(flat - self.mean, full_matrices=False)
+        self.components = components[:n_components]
+        self.projected = self._project(self.vectors)
+        self._norms = dict()
+        self._save()
+        variance = singular ** 2
+        return variance[:n_components].sum() / variance.sum()
+
+    def _project(self, vectors):
+        flat = vectors.reshape(len(vectors), -1).astype(float)
+        return ((flat - self.mean) @ self.components.T).astype(np.float32)
+
+    def _space(self, channels):
+        # Matriz pesquisada e normas ao quadrado de cada linha, por subconjunto de canais
+        key = None if channels is None else tuple(channels)
+        if key not in self._norms:
+            if key is None and self.components is not None:
+                matrix = np.asarray(self.projected, dtype=float)
+            else:
+                selected = list(range(len(vector_channels))) if key is None else \
+                    [list(vector_channels).index(channel) for channel in key]
+                matrix = np.asarray(self.vectors[:, selected], dtype=float).reshape(len(self.vectors), -1)
+            self._norms[key] = (matrix, np.einsum('ij,ij->i', matrix, matrix))
+        return self._norms[key]
+
+    def nearest(self, vector, k: int = 10, channels: Optional[list] = None):
+        # As k voltas mais próximas (Distance: diferença RMS por ponto); `channels` restringe a comparação
+        matrix, norms = self._space(channels)
+        vector = np.asarray(vector, dtype=float)
+        if channels is None and self.components is not None:
+            query = self._project(vector[None])[0].astype(float)
+            size = vector.size
+        else:
+            if channels is not None:
+                vector = vector[[list(vector_channels).index(channel) for channel in channels]]
+            query = vector.ravel()
+            size = query.size
+        squared = norms - 2 * (matrix @ query) + query @ query
+        k = min(k, len(squared))
+        closest = np.argpartition(squared, k - 1)[:k] if k else np.empty(0, dtype=int)
+        closest = closest[np.argsort(squared[closest], kind='mergesort')]
+        result = self.laps.iloc[closest].reset_index(drop=True)
+        result['Distance'] = np.sqrt(np.maximum(squared[closest], 0) / size)
+        return result
+
+    def _save(self):
+        if self.path is None:
+            return
+        np.save(os.path.join(self.path, 'vectors.tmp.npy'), np.asarray(self.vectors))
+        os.replace(os.path.join(self.path, 'vectors.tmp.npy'), os.path.join(self.path, 'vectors.npy'))
+        if self.components is not None:
+            np.savez(os.path.join(self.path, 'pca.tmp.npz'), mean=self.mean, components=self.components,
+                     projected=self.projected)
+            os.replace(os.path.join(self.path, 'pca.tmp.npz'), os.path.join(self.path, 'pca.npz'))
+        laps = self.laps.astype(object).where(self.laps.notna(), None)
+        index = {'channels': list(vector_channels), 'n_points': self.n_points,
+                 'laps': laps.to_dict('records')}
+        tmp_path = os.path.join(self.path, 'index.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, default=_json_value)
+        os.replace(tmp_path, os.path.join(self.path, 'index.json'))
+
+
+def _json_value(value):
+    # tipos do NumPy nas colunas de voltas
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
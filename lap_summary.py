@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+
+# Acelerador a partir do qual a volta conta como "pé embaixo" (%); DRS acima disso está aberto/habilitado
+FULL_THROTTLE = 99
+DRS_OPEN = 5
+
+
+class LapSummary:
+    # Estatísticas do car data de cada volta da sessão (velocidades, acelerador, freio, marchas),
+    # indexadas pela posição da volta em session.laps, como no SessionIndex
+    columns = ('Driver', 'LapNumber', 'TopSpeed', 'TopSpeedDRS', 'TopSpeedNoDRS', 'MeanSpeed',
+               'FullThrottle', 'Braking', 'GearChanges', 'Samples')
+
+    def __init__(self, session):
+        laps = session.laps
+        summary = pd.DataFrame(columns=list(self.columns[2:]), index=pd.Index([], name='Row'), dtype=float)
+        samples = car_data_by_lap(session, ('Speed', 'DRS', 'Throttle', 'Brake', 'nGear'))
+        if len(samples):
+            samples['FullThrottle'] = samples['Throttle'] >= FULL_THROTTLE
+            samples['Braking'] = samples['Brake'] > 0
+            samples['SpeedDRS'] = samples['Speed'].where(samples['DRS'] > DRS_OPEN)
+            samples['SpeedNoDRS'] = samples['Speed'].where(samples['DRS'] < DRS_OPEN)
+            # troca de marcha entre amostras consecutivas da mesma volta
+            same_lap = samples['Row'].eq(samples['Row'].shift())
+            samples['GearChange'] = same_lap & samples['nGear'].ne(samples['nGear'].shift())
+            summary = samples.groupby('Row').agg(TopSpeed=('Speed', 'max'), TopSpeedDRS=('SpeedDRS', 'max'),
+                                                 TopSpeedNoDRS=('SpeedNoDRS', 'max'), MeanSpeed=('Speed', 'mean'),
+                                                 FullThrottle=('FullThrottle', 'mean'), Braking=('Braking', 'mean'),
+                                                 GearChanges=('GearChange', 'sum'), Samples=('Speed', 'size'))
+
+        summary = summary.reindex(pd.RangeIndex(len(laps), name='Row'))
+        summary['GearChanges'] = summary['GearChanges'].fillna(0).astype(int)
+        summary['Samples'] = summary['Samples'].fillna(0).astype(int)
+        summary.insert(0, 'Driver', laps['Driver'].to_numpy())
+        summary.insert(1, 'LapNumber', laps['LapNumber'].to_numpy())
+        self.laps = summary[list(self.columns)]
+
+    def lap(self, row):
+        return self.laps.loc[row]
+
+    def drivers(self):
+        # Por piloto, em toda a sessão: maiores velocidades e médias ponderadas pelas amostras
+        laps = self.laps[self.laps['Samples'] > 0]
+        weights = laps['Samples']
+        totals = laps[['MeanSpeed', 'FullThrottle', 'Braking']].mul(weights, axis=0)
+        totals['Samples'] = weights
+        totals['Driver'] = laps['Driver'].to_numpy()
+        grouped = totals.groupby('Driver', sort=False, observed=True)
+        drivers = grouped[['MeanSpeed', 'FullThrottle', 'Braking']].sum().div(grouped['Samples'].sum(), axis=0)
+        speeds = laps.groupby('Driver', sort=False, observed=True)[['TopSpeed', 'TopSpeedDRS', 'TopSpeedNoDRS']].max()
+        gears = laps.groupby('Driver', sort=False, observed=True)['GearChanges'].sum()
+        return speeds.join(drivers).join(gears).reset_index()
+
+
+def car_data_by_lap(session, channels):
+    # Amostras do car data dentro de [LapStartTime, Time] de cada volta, agrupadas por volta (Row), Time em s
+    laps = session.laps
+    lap_start = laps['LapStartTime'].dt.total_seconds().to_numpy()
+    lap_end = laps['Time'].dt.total_seconds().to_numpy()
+    timed = ~np.isnan(lap_start) & ~np.isnan(lap_end)
+
+    frames = []
+    for number, rows in laps.groupby('DriverNumber', observed=True).indices.items():
+        rows = rows[timed[rows]]
+        if len(rows) == 0 or str(number) not in session.car_data:
+            continue
+        rows = rows[np.argsort(lap_end[rows], kind='mergesort')]
+        car_data = session.car_data[str(number)]
+        time = car_data['SessionTime'].dt.total_seconds().to_numpy()
+
+        lap = np.searchsorted(lap_end[rows], time, side='left')
+        inside = lap < len(rows)
+        inside[inside] = time[inside] >= lap_start[rows[lap[inside]]]
+        frame = {'Row': rows[lap[inside]], 'Time': time[inside]}
+        for channel in channels:
+            frame[channel] = car_data[channel].to_numpy(dtype=float)[inside]
+        frames.append(pd.DataFrame(frame))
+
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype=float) for column in ('Row', 'Time') + tuple(channels)})
+    return pd.concat(frames, ignore_index=True)
+
+
+def lap_distance(samples, laps):
+    # Distância desde LapStartTime em cada amostra de car_data_by_lap (m), integrando Speed volta a volta
+    row = samples['Row'].to_numpy(dtype=int)
+    time = samples['Time'].to_numpy()
+    new_lap = np.ones(len(row), dtype=bool)
+    new_lap[1:] = row[1:] != row[:-1]
+    starts = np.flatnonzero(new_lap)
+    lap_start = laps['LapStartTime'].dt.total_seconds().to_numpy()
+    elapsed = np.diff(time, prepend=np.nan)
+    elapsed[starts] = time[starts] - lap_start[row[starts]]
+    step = samples['Speed'].to_numpy(dtype=float) / 3.6 * elapsed
+    total = np.cumsum(step)
+    return total - np.repeat(total[starts] - step[starts], np.diff(np.append(starts, len(row))))
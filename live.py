@@ -0,0 +1,232 @@
+import heapq
+import time
+from typing import Optional
+
+import fastf1 as ff1
+import numpy as np
+import pandas as pd
+from fastf1.core import SessionResults
+from fastf1.livetiming.data import LiveTimingData
+from fastf1.utils import to_timedelta
+
+from F1Event import F1Event
+from live_session import LiveSession
+
+
+#
+# Replay of a recorded live timing feed (fastf1.livetiming SignalRClient output),
+# appending laps to an F1Event as they are completed:
+#
+#   replay = live_event(2025, 'Monza', 'R', 'saved_data.txt')
+#   for new_laps in replay.updates():
+#       replay.event.race_trace_chart()
+#   replay.latency()
+#
+# Only lap timing is replayed (laps, positions, tyres, track status); methods that
+# need car data, position data or race control messages are not available.
+#
+
+live_categories = ('DriverList', 'LapCount', 'TrackStatus', 'TimingAppData', 'TimingData')
+
+
+def live_messages(livedata: LiveTimingData, categories: tuple = live_categories):
+    # Mensagens das categorias em ordem cronológica: (SessionTime, categoria, mensagem)
+    streams = []
+    for category in categories:
+        if livedata.has(category):
+            streams.append([(pd.Timedelta(td), category, msg) for td, msg in livedata.get(category)])
+    return heapq.merge(*streams, key=lambda message: message[0])
+
+
+def _stints(line):
+    stints = line.get('Stints', {})
+    if isinstance(stints, list):
+        return enumerate(stints)
+    return ((int(idx), stint) for idx, stint in stints.items())
+
+
+class LiveTiming:
+    #
+    # Incremental parser of TimingData / TimingAppData / TrackStatus messages.
+    # feed() returns the laps completed by a message, as rows of the laps table.
+    # A lap is emitted once both its NumberOfLaps and its LastLapTime have arrived.
+    #
+    def __init__(self, drivers: Optional[dict] = None):
+        # drivers: {número: (abreviação, equipe)}
+        self.drivers = dict(drivers or {})
+        self.track_status = '1'
+        self.total_laps = None
+        self._state = dict()
+
+    def _driver_state(self, number):
+        if number not in self._state:
+            self._state[number] = {'laps': 0, 'emitted': 0, 'lap_time': pd.NaT, 'new_lap_time': False,
+                                   'lap_start': pd.NaT, 'lap_end': pd.NaT, 'position': np.nan, 'best': pd.NaT,
+                                   'stints': dict(), 'stint_first_lap': 1, 'pit_in': pd.NaT,
+                                   'pit_out': pd.NaT, 'track_status': self.track_status}
+        return self._state[number]
+
+    def feed(self, session_time, category, msg):
+        if category == 'DriverList':
+            for number, driver in msg.items():
+                if isinstance(driver, dict) and 'Tla' in driver:
+                    self.drivers[number] = (driver['Tla'], driver.get('TeamName'))
+        elif category == 'LapCount':
+            self.total_laps = msg.get('TotalLaps', self.total_laps)
+        elif category == 'TrackStatus':
+            self.track_status = str(msg.get('Status', self.track_status))
+            for state in self._state.values():
+                if self.track_status not in state['track_status']:
+                    state['track_status'] += self.track_status
+        elif category == 'TimingAppData':
+            for number, line in msg.get('Lines', {}).items():
+                state = self._driver_state(number)
+                for idx, stint in _stints(line):
+                    if idx not in state['stints']:
+                        state['stint_first_lap'] = state['laps'] + 1
+                    state['stints'].setdefault(idx, dict()).update(stint)
+        elif category == 'TimingData':
+            rows = []
+            for number, line in msg.get('Lines', {}).items():
+                rows += self._timing_line(session_time, number, line)
+            return rows
+        return []
+
+    def _timing_line(self, session_time, number, line):
+        state = self._driver_state(number)
+        if 'Position' in line:
+            state['position'] = float(line['Position'])
+        if line.get('InPit') is True and pd.isna(state['pit_in']):
+            state['pit_in'] = session_time
+        if line.get('PitOut') is True:
+            state['pit_out'] = session_time
+        last_lap_time = line.get('LastLapTime')
+        if isinstance(last_lap_time, dict) and last_lap_time.get('Value'):
+            state['lap_time'] = to_timedelta(last_lap_time['Value'])
+            state['new_lap_time'] = True
+        if 'NumberOfLaps' in line:
+            laps = int(line['NumberOfLaps'])
+            rows = []
+            if laps > state['laps'] and state['laps'] > state['emitted']:
+                # a volta anterior terminou sem LastLapTime
+                new_lap_time = state['new_lap_time']
+                state['new_lap_time'] = False
+                rows.append(self._lap(session_time, number, state))
+                state['new_lap_time'] = new_lap_time
+            if laps > state['laps']:
+                state['laps'] = laps
+                state['lap_end'] = session_time
+            if state['laps'] > state['emitted'] and state['new_lap_time']:
+                rows.append(self._lap(session_time, number, state))
+            return rows
+        if state['laps'] > state['emitted'] and state['new_lap_time']:
+            return [self._lap(session_time, number, state)]
+        return []
+
+    def _lap(self, session_time, number, state):
+        lap_number = state['emitted'] + 1
+        if not pd.isna(state['lap_end']):
+            session_time = state['lap_end']
+        lap_time = state['lap_time'] if state['new_lap_time'] else pd.NaT
+        stint = max(state['stints'], default=None)
+        tyre = state['stints'].get(stint, {})
+        start_laps = int(tyre.get('StartLaps', 0) or 0)
+        personal_best = not pd.isna(lap_time) and (pd.isna(state['best']) or lap_time < state['best'])
+        if personal_best:
+            state['best'] = lap_time
+        driver, team = self.drivers.get(number, (number, None))
+
+        row = {'Time': session_time, 'Driver': driver, 'DriverNumber': number, 'LapTime': lap_time,
+               'LapNumber': float(lap_number), 'Stint': np.nan if stint is None else float(stint + 1),
+               'PitOutTime': state['pit_out'], 'PitInTime': state['pit_in'],
+               'IsPersonalBest': personal_best, 'Compound': tyre.get('Compound'),
+               'TyreLife': float(start_laps + lap_number - state['stint_first_lap'] + 1),
+               'FreshTyre': str(tyre.get('New')).lower() == 'true', 'Team': team,
+               'LapStartTime': state['lap_start'], 'TrackStatus': state['track_status'],
+               'Position': state['position']}
+
+        state['emitted'] = lap_number
+        state['new_lap_time'] = False
+        state['lap_start'] = session_time
+        state['pit_in'] = pd.NaT
+        state['pit_out'] = pd.NaT
+        state['track_status'] = self.track_status
+        return row
+
+
+class LiveReplay:
+    #
+    # Feeds recorded live timing messages to an F1Event. Every message that completes
+    # laps appends them with F1Event.append_laps, which only processes the new rows.
+    # The time from receiving that message to the views being updated is recorded.
+    #
+    def __init__(self, event: F1Event, livedata: LiveTimingData, timing: LiveTiming):
+        self.event = event
+        self.livedata = livedata
+        self.timing = timing
+        self.latencies = []
+
+    def updates(self, speed: Optional[float] = None):
+        # Gera o DataFrame de voltas novas a cada atualização; speed=1 reproduz em tempo real
+        start_wall = time.perf_counter()
+        start_session = None
+        for session_time, category, msg in live_messages(self.livedata):
+            if speed is not None:
+                if start_session is None:
+                    start_session = session_time
+                delay = (session_time - start_session).total_seconds() / speed - (time.perf_counter() - start_wall)
+                if delay > 0:
+                    time.sleep(delay)
+
+            received = time.perf_counter()
+            rows = self.timing.feed(session_time, category, msg)
+            if not rows:
+                continue
+            laps = pd.DataFrame(rows)
+            self.event.append_laps(laps)
+            latency = time.perf_counter() - received
+            self.latencies += [{'Driver': row['Driver'], 'LapNumber': row['LapNumber'], 'Time': row['Time'],
+                                'Laps': len(rows), 'Latency': latency} for row in rows]
+            yield laps
+
+    def run(self, speed: Optional[float] = None, on_update=None):
+        # Reproduz toda a gravação; on_update(event, novas_voltas) é chamado a cada atualização
+        for laps in self.updates(speed):
+            if on_update is not None:
+                on_update(self.event, laps)
+        return self.latency()
+
+    def latency(self):
+        # Latência (s) entre a mensagem que completa a volta e as views atualizadas
+        return pd.DataFrame(self.latencies, columns=['Driver', 'LapNumber', 'Time', 'Laps', 'Latency'])
+
+
+def live_event(year: int, place: str, modality: str, *files, livedata: Optional[LiveTimingData] = None,
+               session: Optional[ff1.core.Session] = None, **kwargs):
+    #
+    # Creates an F1Event with no laps for a recorded live timing file and returns its
+    # LiveReplay. The driver list comes from the recording; `session` defaults to
+    # ff1.get_session (event schedule only, nothing is loaded). Extra keyword
+    # arguments go to F1Event.
+    #
+    if livedata is None:
+        livedata = LiveTimingData(*files)
+    if session is None:
+        session = ff1.get_session(year, place, modality)
+    session = LiveSession.from_session(session)
+
+    timing = LiveTiming()
+    for category in ('DriverList', 'LapCount'):
+        if livedata.has(category):
+            for session_time, msg in livedata.get(category):
+                timing.feed(session_time, category, msg)
+
+    results = pd.DataFrame({'DriverNumber': list(timing.drivers),
+                            'Abbreviation': [abb for abb, _ in timing.drivers.values()],
+                            'TeamName': [team for _, team in timing.drivers.values()]},
+                           index=list(timing.drivers))
+    session._results = SessionResults(results, _force_default_cols=True)
+    session._total_laps = timing.total_laps
+    kwargs.setdefault('save_figures', False)
+    event = F1Event(year, place, modality, session=session, **kwargs)
+    return LiveReplay(event, livedata, timing)
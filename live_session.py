@@ -0,0 +1,35 @@
+import pandas as pd
+from fastf1.core import Session, Laps
+
+
+class LiveSession(Session):
+    #
+    # FastF1 session whose laps table grows while a session is followed live
+    # (see live.py). Appended laps are buffered and only concatenated to the
+    # table the next time `laps` is read, so appending costs O(new laps).
+    #
+    @classmethod
+    def from_session(cls, session):
+        # Sessão sem voltas, com os mesmos dados de evento (schedule, api_path, ...)
+        live = cls.__new__(cls)
+        live.__dict__.update(session.__dict__)
+        live._laps = Laps(session=live, _force_default_cols=True)
+        live._pending_laps = []
+        live.n_laps = 0
+        return live
+
+    @property
+    def laps(self):
+        if self._pending_laps:
+            frames = [self._laps] if len(self._laps) else []
+            self._laps = Laps(pd.concat(frames + self._pending_laps, ignore_index=True),
+                              session=self, _force_default_cols=True)
+            self._pending_laps = []
+        return self._laps
+
+    def append_laps(self, laps):
+        # Devolve a posição da primeira volta nova na tabela
+        start = self.n_laps
+        self._pending_laps.append(laps)
+        self.n_laps += len(laps)
+        return start
@@ -0,0 +1,105 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+class RaceGaps:
+    #
+    # Lap completion times of the whole field as a drivers x laps matrix (seconds,
+    # NaN where the lap was not completed) and the gaps derived from it:
+    #
+    #   to_virtual  virtual driver - driver  (> 0: ahead of the virtual driver)
+    #   to_leader   driver - first car to complete the lap  (>= 0)
+    #   interval    driver - car ahead on that lap  (NaN for the leader)
+    #
+    # The virtual driver completes each lap in the mean time of the first
+    # `reference_drivers` drivers (results order), as in race_trace_chart.
+    #
+    # append() adds new laps (live timing) and only recomputes the lap columns
+    # they touch; the matrices grow by doubling their lap capacity.
+    #
+    _matrices = ('times', 'to_virtual', 'to_leader', 'interval')
+    _vectors = ('virtual', 'leader')
+
+    def __init__(self, laps, drivers, reference_drivers: int = 10):
+        self.drivers = list(drivers)
+        self.reference_drivers = reference_drivers
+        self._capacity = 0
+        self._buffers = dict()
+        self._resize(len(self.drivers), 0)
+        self._set_laps(0)
+        self.append(laps)
+
+    def _resize(self, n_drivers, capacity):
+        for name in self._matrices:
+            buffer = np.full((n_drivers, capacity), np.nan)
+            old = self._buffers.get(name)
+            if old is not None:
+                buffer[:old.shape[0], :old.shape[1]] = old
+            self._buffers[name] = buffer
+        for name in self._vectors:
+            buffer = np.full(capacity, np.nan)
+            old = self._buffers.get(name)
+            if old is not None:
+                buffer[:old.shape[0]] = old
+            self._buffers[name] = buffer
+        self._capacity = capacity
+
+    def _set_laps(self, n_laps):
+        # atributos públicos são views dos buffers
+        self.laps = np.arange(1, n_laps + 1)
+        for name in self._matrices:
+            setattr(self, name, self._buffers[name][:, :n_laps])
+        for name in self._vectors:
+            setattr(self, name, self._buffers[name][:n_laps])
+
+    def append(self, laps):
+        new_drivers = [drv for drv in pd.unique(laps['Driver']) if drv not in self.drivers]
+        lap_numbers = laps['LapNumber'].to_numpy(dtype=float)
+        times = laps['Time'].dt.total_seconds().to_numpy()
+        valid = ~np.isnan(lap_numbers) & ~np.isnan(times)
+        n_laps = max(len(self.laps), int(lap_numbers[valid].max()) if valid.any() else 0)
+
+        if new_drivers or n_laps > self._capacity:
+            self.drivers += new_drivers
+            capacity = max(n_laps, 2 * self._capacity) if n_laps > self._capacity else self._capacity
+            self._resize(len(self.drivers), capacity)
+        self._set_laps(n_laps)
+        if not valid.any():
+            return
+
+        codes = pd.Categorical(laps['Driver'], categories=self.drivers).codes
+        valid &= codes >= 0
+        columns = lap_numbers[valid].astype(int) - 1
+        self.times[codes[valid], columns] = times[valid]
+        self._update(np.unique(columns))
+
+    def _update(self, columns):
+        times = self.times[:, columns]
+        with warnings.catch_warnings():
+            # voltas que ninguém completou ficam NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            virtual = np.nanmean(times[:self.reference_drivers], axis=0)
+            leader = np.nanmin(times, axis=0)
+        self.virtual[columns] = virtual
+        self.leader[columns] = leader
+        self.to_virtual[:, columns] = virtual - times
+        self.to_leader[:, columns] = times - leader
+
+        # Ordem de passagem em cada volta (NaN por último) e diferença para o carro anterior
+        order = np.argsort(times, axis=0)
+        ordered = np.take_along_axis(times, order, axis=0)
+        interval = np.full_like(ordered, np.nan)
+        interval[1:] = np.diff(ordered, axis=0)
+        updated = np.empty_like(interval)
+        np.put_along_axis(updated, order, interval, axis=0)
+        self.interval[:, columns] = updated
+
+    def row(self, drv, kind: str = 'to_virtual'):
+        return getattr(self, kind)[self.drivers.index(drv)]
+
+    def frame(self, kind: str = 'to_virtual'):
+        # DataFrame pilotos x voltas de times, to_virtual, to_leader ou interval
+        return pd.DataFrame(getattr(self, kind), index=pd.Index(self.drivers, name='Driver'),
+                            columns=pd.Index(self.laps, name='LapNumber'))
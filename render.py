@@ -0,0 +1,170 @@
+import argparse
+import os
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from F1Event import F1Event
+from cache import SessionCache
+
+
+race_plots = ('race_trace_chart', 'position_changes', 'tyre_strategy', 'plot_tyre_degredation',
+              'plot_race_pace', 'plot_top_speed', 'engine_manufacter', 'plot_car_characteristics',
+              'plot_bargraph_times', 'telemetry_between_drivers', 'gg_plot', 'corner_analysis',
+              'plot_strategies')
+qualifying_plots = ('plot_bargraph_times', 'plot_bargraph_best_sectors', 'plot_bargraph_team',
+                    'session_pace_evolution', 'engine_manufacter', 'plot_car_characteristics',
+                    'plot_top_speed', 'telemetry_between_drivers', 'gg_plot', 'corner_analysis')
+practice_plots = ('plot_bargraph_times', 'plot_bargraph_best_sectors', 'engine_manufacter',
+                  'plot_car_characteristics', 'plot_top_speed', 'telemetry_between_drivers', 'gg_plot',
+                  'corner_analysis')
+
+# Gráficos que precisam de car data / position data
+telemetry_plots = ('telemetry_between_drivers', 'gg_plot', 'engine_manufacter',
+                   'plot_car_characteristics', 'plot_top_speed', 'corner_analysis')
+
+_event = None
+
+
+def default_plots(modality: str):
+    if modality in ('R', 'S'):
+        return race_plots
+    if modality in ('Q', 'SQ', 'SS'):
+        return qualifying_plots
+    return practice_plots
+
+
+def plot_arguments(name: str, drivers: list):
+    # Argumentos de cada método de plot que depende de pilotos
+    if name == 'telemetry_between_drivers':
+        return (drivers[0], drivers[1])
+    if name in ('gg_plot', 'plot_race_pace', 'corner_analysis'):
+        return (drivers,)
+    if name == 'driver_laptimes':
+        return (drivers[0],)
+    return ()
+
+
+def _init_worker(event):
+    global _event
+    matplotlib.use('Agg')
+    _event = event
+
+
+def _render_plot(name, args, out, formats, dpi):
+    # Cada gráfico roda com seu próprio rc_context, sem alterar o estado global do processo
+    plt.close('all')
+    paths = []
+    with plt.rc_context(), warnings.catch_warnings():
+        # plt.show() não faz nada no backend Agg
+        warnings.simplefilter('ignore', UserWarning)
+        getattr(_event, name)(*args)
+        fig = plt.gcf()
+        for fmt in formats:
+            path = os.path.join(out, f'{name}.{fmt}')
+            fig.savefig(path, dpi=dpi, format=fmt)
+            paths.append(path)
+    plt.close('all')
+    return paths
+
+
+def render(year: int, place: str, modality: str, out: str, plots: Optional[list] = None,
+           drivers: Optional[list] = None, formats: tuple = ('png',), dpi: int = 350,
+           workers: Optional[int] = None, downsample: Optional[str] = None):
+    #
+    # Renders the selected plots of one session to `out`, one plot per task in a
+    # pool of worker processes. Returns {plot: [paths]} and {plot: error}. `downsample`
+    # decimates the plotted lines (see F1Event).
+    #
+    if plots is None:
+        plots = default_plots(modality)
+    os.makedirs(out, exist_ok=True)
+
+    channels = ['messages']
+    if any(name in telemetry_plots for name in plots):
+        channels.append('telemetry')
+    event = F1Event(year, place, modality, lazy=True, channels=channels, save_figures=False, downsample=downsample)
+    # Comparações usam dois pilotos: completa com os primeiros da sessão
+    drivers = list(drivers or [])
+    drivers += [drv for drv in event.get_drivers() if drv not in drivers][:max(2 - len(drivers), 0)]
+    if len(drivers) < 2 and 'telemetry_between_drivers' in plots:
+        raise ValueError(f"telemetry_between_drivers needs two drivers, got {drivers}")
+
+    rendered = dict()
+    errors = dict()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(event,)) as pool:
+        futures = {name: pool.submit(_render_plot, name, plot_arguments(name, drivers), out, formats, dpi)
+                   for name in plots}
+        for name, future in futures.items():
+            try:
+                rendered[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+    return rendered, errors
+
+
+def warm_up(args):
+    max_size = None if args.max_size is None else int(args.max_size * 2 ** 30)
+    cache = SessionCache(args.cache, max_size=max_size)
+    sessions = []
+    for session in args.sessions:
+        year, place, modality = session.split(':')
+        sessions.append((int(year), place, modality))
+    full = not args.laps_only
+    warmed = cache.warm_up(sessions, telemetry=full, weather=full, messages=full, skip_errors=True)
+    print(warmed.to_string(index=False))
+    print(f"{cache.path}: {cache.size() / 2 ** 20:.1f} MB")
+    if warmed['Error'].notna().any():
+        sys.exit(1)
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(prog='python -m F1Event')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    render_parser = commands.add_parser('render', help='render session plots without a display')
+    render_parser.add_argument('year', type=int)
+    render_parser.add_argument('place')
+    render_parser.add_argument('modality', choices=['Q', 'R', 'S', 'SQ', 'SS', 'FP1', 'FP2', 'FP3'])
+    render_parser.add_argument('--out', required=True, help='output directory')
+    render_parser.add_argument('--plots', nargs='+', help='F1Event plot methods (default: all for the modality)')
+    render_parser.add_argument('--drivers', nargs='+',
+                               help='drivers for comparison plots (missing ones are filled with the top 2)')
+    render_parser.add_argument('--format', nargs='+', default=['png'], choices=['png', 'svg'], dest='formats')
+    render_parser.add_argument('--dpi', type=int, default=350)
+    render_parser.add_argument('--workers', type=int)
+    render_parser.add_argument('--downsample', choices=['minmax', 'lttb'],
+                               help='decimate plotted lines, keeping peaks (default: draw every sample)')
+
+    warm_parser = commands.add_parser('warm-up', help='fill the FastF1 cache for a list of sessions')
+    warm_parser.add_argument('sessions', nargs='+', metavar='YEAR:PLACE:MODALITY', help='ex.: 2024:Monza:R')
+    warm_parser.add_argument('--cache', help='cache directory (default: FASTF1_CACHE or the FastF1 default)')
+    warm_parser.add_argument('--max-size', type=float, help='cache size limit in GB (least recently used sessions are deleted)')
+    warm_parser.add_argument('--laps-only', action='store_true', help='skip car data, position data, weather and messages')
+
+    args = parser.parse_args(argv)
+    if args.command == 'warm-up':
+        warm_up(args)
+        return
+    try:
+        rendered, errors = render(args.year, args.place, args.modality, args.out, plots=args.plots,
+                                  drivers=args.drivers, formats=tuple(args.formats), dpi=args.dpi,
+                                  workers=args.workers, downsample=args.downsample)
+    except ValueError as e:
+        render_parser.error(str(e))
+    for name, paths in rendered.items():
+        for path in paths:
+            print(path)
+    for name, error in errors.items():
+        print(f"{name}: {error!r}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import fastf1 as ff1
+import pandas as pd
+
+from F1Event import F1Event
+from degradation import DegradationModel, combine_compounds
+from lap_index import LapIndex
+from season_store import SeasonStore
+
+
+sprint_modalities = ('S', 'SQ', 'SS')
+
+
+def season_sessions(year: int, modality: str = 'R'):
+    # Lista (ano, evento, modalidade) de todos os eventos já disputados na temporada
+    schedule = ff1.get_event_schedule(year, include_testing=False)
+    schedule = schedule[schedule['EventDate'] < pd.Timestamp.now()]
+    if modality in sprint_modalities:
+        schedule = schedule[schedule['EventFormat'].str.contains('sprint')]
+    return [(year, event_name, modality) for event_name in schedule['EventName']]
+
+
+def _event(event):
+    return event
+
+
+def _laps(event):
+    return event.get_laps_race()
+
+
+def _summary(event):
+    return event.event.event['EventName'], event.season_summary_data()
+
+
+def _vectors(event):
+    return event.event.event['EventName'], event.lap_vectors
+
+
+def _load_session(session, transform, kwargs):
+    year, place, modality = session
+    return transform(F1Event(year, place, modality, **kwargs))
+
+
+def load_sessions(sessions: list, workers: Optional[int] = None, transform: Callable = _event,
+                  max_tasks_per_child: Optional[int] = None, skip_errors: bool = False, **kwargs):
+    #
+    # Loads many sessions in a process pool, reading from the local FastF1 cache.
+    # `sessions` is a list of (year, place, modality) tuples (see season_sessions).
+    # Returns {(year, place, modality): transform(F1Event)}; `transform` runs in the
+    # worker, so it must be picklable (a module-level function) and should return only
+    # what the caller needs, e.g. the lap table. By default it returns the F1Event.
+    #
+    # Memory is bounded by `workers` (sessions held at once) and `max_tasks_per_child`
+    # (restarts a worker after that many sessions). Extra keyword arguments go to F1Event;
+    # by default workers load lazily, i.e. laps and results only.
+    #
+    kwargs.setdefault('lazy', True)
+    if workers is None:
+        workers = os.cpu_count()
+    sessions = [tuple(session) for session in sessions]
+
+    results = dict()
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=max_tasks_per_child) as pool:
+        futures = [pool.submit(_load_session, session, transform, kwargs) for session in sessions]
+        for session, future in zip(sessions, futures):
+            try:
+                results[session] = future.result()
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                warnings.warn(f"Could not load {session}: {e!r}")
+    return results
+
+
+def load_season(year: int, modality: str = 'R', **kwargs):
+    return load_sessions(season_sessions(year, modality), **kwargs)
+
+
+def season_degradation(year: int, modality: str = 'R', **kwargs):
+    #
+    # Tyre degradation of every past event of the season, from the lap tables only.
+    # Returns ({(year, place, modality): DegradationModel}, pooled compound rates).
+    #
+    laps = load_sessions(season_sessions(year, modality), transform=_laps, **kwargs)
+    models = {session: DegradationModel(session_laps) for session, session_laps in laps.items()}
+    return models, combine_compounds(models)
+
+
+def update_season_store(store, year: int, modality: str = 'R', **kwargs):
+    #
+    # Appends to the season store (a SeasonStore or its path) every past event of the
+    # season that is not there yet; sessions are processed in a pool (see load_sessions)
+    # and written by this process. Returns the store.
+    #
+    if isinstance(store, str):
+        store = SeasonStore(store)
+    sessions = [session for session in season_sessions(year, modality) if session not in store]
+    kwargs.setdefault('skip_errors', True)
+    kwargs.setdefault('channels', ['telemetry', 'messages'])
+    summaries = load_sessions(sessions, transform=_summary, **kwargs)
+    for (year, place, modality), (event_name, summary) in summaries.items():
+        store.append_summary(year, place, modality, summary, event_name=event_name)
+    return store
+
+
+def update_lap_index(index, year: int, modality: str = 'R', **kwargs):
+    #
+    # Appends to the lap index (a LapIndex or its path) the laps of every past event of
+    # the season that is not there yet, as update_season_store. Returns the index.
+    #
+    if isinstance(index, str):
+        index = LapIndex(index)
+    sessions = [session for session in season_sessions(year, modality) if session not in index]
+    kwargs.setdefault('skip_errors', True)
+    kwargs.setdefault('channels', ['telemetry'])
+    vectors = load_sessions(sessions, transform=_vectors, **kwargs)
+    for (year, place, modality), (event_name, lap_vectors) in vectors.items():
+        index.append_vectors(year, place, modality, lap_vectors, event_name=event_name)
+    return index
@@ -0,0 +1,149 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+
+
+# Colunas de season_summary_data gravadas por sessão; tempos em segundos, velocidades em km/h
+summary_columns = ('Driver', 'Team', 'Engine', 'LapNumber', 'LapTime', 'GapToPole', 'TopSpeed', 'MeanSpeed',
+                   'Sector1Time', 'Sector2Time', 'Sector3Time', 'TheoreticalBest')
+session_columns = ('Year', 'Place', 'Modality', 'EventName')
+
+_schema = """
+CREATE TABLE IF NOT EXISTS drivers (
+    Year INTEGER NOT NULL, Place TEXT NOT NULL, Modality TEXT NOT NULL, EventName TEXT,
+    Driver TEXT NOT NULL, Team TEXT, Engine TEXT, LapNumber INTEGER, LapTime REAL, GapToPole REAL,
+    TopSpeed REAL, MeanSpeed REAL, Sector1Time REAL, Sector2Time REAL, Sector3Time REAL, TheoreticalBest REAL,
+    PRIMARY KEY (Year, Place, Modality, Driver)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    Year INTEGER NOT NULL, Place TEXT NOT NULL, Modality TEXT NOT NULL, EventName TEXT,
+    Drivers INTEGER, Added REAL,
+    PRIMARY KEY (Year, Place, Modality)
+);
+CREATE INDEX IF NOT EXISTS drivers_season ON drivers (Year, Modality);
+"""
+
+
+class SeasonStore:
+    #
+    # SQLite file with one summary row per driver per processed session
+    # (F1Event.season_summary_data), so season comparisons do not load sessions:
+    #
+    #   store = SeasonStore('season.sqlite')
+    #   store.append(F1Event(2024, 'Monza', 'Q'))
+    #   store.engines(2024, 'Q')
+    #
+    # Sessions are keyed by (year, place, modality) as passed to F1Event; appending a
+    # session again replaces its rows.
+    #
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as con:
+            con.executescript(_schema)
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def __contains__(self, session):
+        year, place, modality = session
+        with self._connect() as con:
+            row = con.execute('SELECT 1 FROM sessions WHERE Year = ? AND Place = ? AND Modality = ?',
+                              (int(year), str(place), modality)).fetchone()
+        return row is not None
+
+    def append(self, event):
+        # Grava o resumo por piloto de um F1Event; devolve o número de linhas
+        return self.append_summary(event.year, event.place, event.modality, event.season_summary_data(),
+                                   event_name=event.event.event['EventName'])
+
+    def append_summary(self, year, place, modality, summary: pd.DataFrame, event_name: Optional[str] = None):
+        key = (int(year), str(place), modality)
+        rows = summary[list(summary_columns)].astype(object).where(summary[list(summary_columns)].notna(), None)
+        records = [key + (event_name,) + tuple(row) for row in rows.itertuples(index=False)]
+        columns = session_columns + summary_columns
+        with self._connect() as con:
+            con.execute('DELETE FROM drivers WHERE Year = ? AND Place = ? AND Modality = ?', key)
+            con.executemany(f"INSERT INTO drivers ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                            records)
+            con.execute('INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)',
+                        key + (event_name, len(records), time.time()))
+        return len(records)
+
+    def sessions(self, year: Optional[int] = None, modality: Optional[str] = None):
+        where, params = _filters(year=year, modality=modality)
+        with self._connect() as con:
+            sessions = pd.read_sql_query(f'SELECT * FROM sessions{where} ORDER BY Year, Added', con, params=params)
+        sessions['Added'] = pd.to_datetime(sessions['Added'], unit='s')
+        return sessions
+
+    def query(self, year: Optional[int] = None, modality: Optional[str] = None, drivers: Optional[list] = None,
+              teams: Optional[list] = None):
+        # Linhas por piloto e sessão, na ordem em que as sessões foram gravadas
+        where, params = _filters(year=year, modality=modality, drivers=drivers, teams=teams, prefix='d.')
+        with self._connect() as con:
+            return pd.read_sql_query('SELECT d.* FROM drivers d JOIN sessions s USING (Year, Place, Modality)'
+                                     f'{where} ORDER BY s.Added, d.LapTime', con, params=params)
+
+    def engines(self, year: Optional[int] = None, modality: str = 'R'):
+        # Por motor e evento: menor GapToPole e maior TopSpeed entre os carros com aquele motor
+        rows = self.query(year, modality)
+        # dropna=False: sessões gravadas sem EventName (ou pilotos sem Engine) não somem do resultado
+        return (rows.groupby(['Year', 'Place', 'EventName', 'Engine'], sort=False, dropna=False)
+                .agg(GapToPole=('GapToPole', 'min'), TopSpeed=('TopSpeed', 'max')).reset_index())
+
+    def car_characteristics(self, year: Optional[int] = None, modality: str = 'R'):
+        # Por equipe: média na temporada de MeanSpeed/TopSpeed da volta mais rápida da equipe em cada evento
+        rows = self.query(year, modality)
+        # equipes sem volta cronometrada no evento não entram na média
+        rows = rows[rows['LapTime'].notna()]
+        fastest = rows.loc[rows.groupby(['Year', 'Place', 'Team'], sort=False, dropna=False)['LapTime'].idxmin()]
+        return (fastest.groupby('Team').agg(Events=('Place', 'size'), MeanSpeed=('MeanSpeed', 'mean'),
+                                            TopSpeed=('TopSpeed', 'mean'), GapToPole=('GapToPole', 'mean'))
+                .sort_values('GapToPole').reset_index())
+
+    def plot_engines(self, year: Optional[int] = None, modality: str = 'R'):
+        import matplotlib.pyplot as plt
+
+        engines = self.engines(year, modality)
+        fig, ax = plt.subplots(figsize=(14, 6))
+        for engine, rows in engines.groupby('Engine', sort=False):
+            ax.plot(rows['EventName'].fillna(rows['Place']), rows['GapToPole'], marker='o', label=engine)
+        ax.set(xlabel='Event', ylabel='Gap to pole (s)')
+        ax.tick_params(axis='x', rotation=60)
+        ax.legend()
+        plt.suptitle(f"Engine Manufacturers {'' if year is None else year} - {modality}")
+
+    def plot_car_characteristics(self, year: Optional[int] = None, modality: str = 'R'):
+        import matplotlib.pyplot as plt
+
+        teams = self.car_characteristics(year, modality)
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.scatter(teams['MeanSpeed'], teams['TopSpeed'])
+        for _, team in teams.iterrows():
+            ax.annotate(team['Team'], (team['MeanSpeed'], team['TopSpeed'] + 0.3))
+        ax.set(xlabel='Mean Speed (km/h)', ylabel='Top Speed (km/h)')
+        plt.suptitle(f"Car Characteristics {'' if year is None else year} - {modality}")
+
+
+def _filters(year=None, modality=None, drivers=None, teams=None, prefix=''):
+    clauses, params = [], []
+    if year is not None:
+        clauses.append(f'{prefix}Year = ?')
+        params.append(int(year))
+    if modality is not None:
+        clauses.append(f'{prefix}Modality = ?')
+        params.append(modality)
+    for column, values in (('Driver', drivers), ('Team', teams)):
+        if values:
+            clauses.append(f"{prefix}{column} IN ({', '.join('?' * len(values))})")
+            params += list(values)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+
+class SessionIndex:
+    #
+    # Per-session lookup tables built with a single pass over the laps table.
+    # Only row positions are stored, so the index stays valid when columns are
+    # added to the laps table; rows are always read from the live table.
+    #
+    def __init__(self, session):
+        self.session = session
+        laps = session.laps
+
+        # (1) Laps of each driver (row positions in session.laps)
+        self.driver_rows = {drv: np.sort(rows) for drv, rows in laps.groupby('Driver', observed=True).indices.items()}
+
+        # (2) Lap number -> row position, per driver
+        self.lap_rows = {drv: dict() for drv in self.driver_rows}
+        for pos, (drv, lap_number) in enumerate(zip(laps['Driver'], laps['LapNumber'])):
+            if not pd.isna(lap_number):
+                self.lap_rows[drv][int(lap_number)] = pos
+
+        # (3) Fastest lap of each driver, same rule as Laps.pick_fastest (personal bests only, first clocked on ties)
+        candidates = pd.DataFrame({'Driver': laps['Driver'].to_numpy(),
+                                   'LapTime': laps['LapTime'].to_numpy(),
+                                   'Row': np.arange(len(laps))})
+        candidates = candidates[(laps['IsPersonalBest'] == True).to_numpy() & candidates['LapTime'].notna().to_numpy()]  # noqa: E712
+        candidates = candidates.sort_values(by='LapTime', kind='mergesort').drop_duplicates(subset='Driver')
+        self.fastest_rows = dict(zip(candidates['Driver'], candidates['Row']))
+        self._fastest_times = dict(zip(candidates['Driver'], candidates['LapTime']))
+
+        # (4) Team and team color of each driver
+        self.team = {drv: laps['Team'].iloc[rows[0]] for drv, rows in self.driver_rows.items()}
+        self._team_colors = dict()
+        self._team_color = dict()
+
+    @property
+    def team_color(self):
+        # Cores calculadas no primeiro acesso (fastf1.plotting importa o matplotlib)
+        for drv, team in self.team.items():
+            if drv not in self._team_color:
+                self._team_color[drv] = self._color(team)
+        return self._team_color
+
+    def _color(self, team):
+        if team not in self._team_colors:
+            from fastf1 import plotting
+            try:
+                self._team_colors[team] = plotting.get_team_color(team, session=self.session)
+            except Exception:
+                self._team_colors[team] = None
+        return self._team_colors[team]
+
+    def append(self, laps, start):
+        # Inclui voltas novas (ex.: live timing), que ocupam as posições start, start + 1, ... de session.laps
+        for drv, rows in laps.groupby('Driver', observed=True).indices.items():
+            rows = np.sort(rows)
+            if drv not in self.driver_rows:
+                self.driver_rows[drv] = np.empty(0, dtype=int)
+                self.lap_rows[drv] = dict()
+                self.team[drv] = laps['Team'].iloc[rows[0]]
+            self.driver_rows[drv] = np.concatenate((self.driver_rows[drv], rows + start))
+
+        personal_best = (laps['IsPersonalBest'] == True).to_numpy()  # noqa: E712
+        for pos, (drv, lap_number, lap_time) in enumerate(zip(laps['Driver'], laps['LapNumber'], laps['LapTime'])):
+            if not pd.isna(lap_number):
+                self.lap_rows[drv][int(lap_number)] = start + pos
+            if personal_best[pos] and not pd.isna(lap_time):
+                if drv not in self._fastest_times or lap_time < self._fastest_times[drv]:
+                    self.fastest_rows[drv] = start + pos
+                    self._fastest_times[drv] = lap_time
+
+    def drivers(self):
+        return list(self.driver_rows)
+
+    def laps(self, drv):
+        rows = self.driver_rows.get(drv, [])
+        return self.session.laps.iloc[rows]
+
+    def lap(self, drv, lap_number):
+        return self.session.laps.iloc[self.lap_rows[drv][int(lap_number)]]
+
+    def fastest_lap(self, drv):
+        if drv not in self.fastest_rows:
+            return None
+        return self.session.laps.iloc[self.fastest_rows[drv]]
+
+
+class SectorIndex:
+    #
+    # Best sector times of each driver, found with one groupby-idxmin over the laps table
+    # (times in seconds). The laps table is only read, never modified.
+    #
+    #   best          per driver: Sector{n}Time, Sector{n}Lap, Sector{n}Rank, TheoreticalBest, TheoreticalRank
+    #   session_best  per sector: Time, Driver, LapNumber
+    #
+    sectors = (1, 2, 3)
+
+    def __init__(self, session):
+        laps = session.laps
+        columns = [f'Sector{n}Time' for n in self.sectors]
+        times = pd.DataFrame({column: laps[column].dt.total_seconds().to_numpy() for column in columns})
+        times['Driver'] = laps['Driver'].to_numpy()
+        lap_numbers = laps['LapNumber'].to_numpy()
+
+        # pilotos sem nenhum tempo de setor ficam de fora
+        times = times[times[columns].notna().any(axis=1)]
+        rows = times.groupby('Driver')[columns].idxmin()
+
+        best = pd.DataFrame(index=rows.index)
+        for n, column in zip(self.sectors, columns):
+            valid = rows[column].notna()
+            best_rows = rows.loc[valid, column].astype(int)
+            best[column] = times.loc[best_rows, column].set_axis(best_rows.index)
+            best[f'Sector{n}Lap'] = pd.Series(lap_numbers[best_rows], index=best_rows.index)
+        best['TheoreticalBest'] = best[columns].sum(axis=1, min_count=len(columns))
+        for n, column in zip(self.sectors, columns):
+            best[f'Sector{n}Rank'] = best[column].rank(method='min')
+        best['TheoreticalRank'] = best['TheoreticalBest'].rank(method='min')
+        self.best = best
+
+        session_best = []
+        for n, column in zip(self.sectors, columns):
+            drv = best[column].idxmin() if best[column].notna().any() else None
+            session_best.append({'Sector': n, 'Time': best[column].get(drv, np.nan), 'Driver': drv,
+                                 'LapNumber': best[f'Sector{n}Lap'].get(drv, np.nan)})
+        self.session_best = pd.DataFrame(session_best).set_index('Sector')
+
+    def ranking(self, sector):
+        # Pilotos ordenados pelo melhor tempo no setor (1, 2, 3) ou pela volta teórica ('theoretical')
+        if sector == 'theoretical':
+            column, lap_column = 'TheoreticalBest', None
+        else:
+            column, lap_column = f'Sector{sector}Time', f'Sector{sector}Lap'
+        ranking = self.best[[column] + ([lap_column] if lap_column else [])].dropna(subset=[column])
+        ranking = ranking.sort_values(by=column, kind='mergesort').rename(columns={column: 'Time', lap_column: 'LapNumber'})
+        return ranking.rename_axis('Driver').reset_index()
+
+    def theoretical_best(self, drv):
+        return self.best['TheoreticalBest'].get(drv, np.nan)
@@ -0,0 +1,202 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from degradation import FUEL_SECONDS_PER_KG, FUEL_START_KG, DegradationModel
+
+
+# Compostos de pista seca; o regulamento obriga a usar pelo menos dois deles na corrida
+DRY_COMPOUNDS = ('SOFT', 'MEDIUM', 'HARD')
+
+# Perda no pit lane (s) quando a sessão não tem paradas com bandeira verde
+DEFAULT_PIT_LOSS = 22.0
+
+# Safety car: chance de acontecer na corrida, duração (voltas), tempo de volta sob SC em relação
+# à volta base mais rápida e fração da perda no pit lane de uma parada feita sob SC
+SAFETY_CAR_PROBABILITY = 0.5
+SAFETY_CAR_LAPS = 4
+SAFETY_CAR_LAP_FACTOR = 1.4
+SAFETY_CAR_PIT_FACTOR = 0.5
+
+
+def pit_losses(laps):
+    # Perda de cada parada com bandeira verde (s): volta de entrada + volta de saída menos duas
+    # voltas normais do piloto (mediana das voltas sem box com bandeira verde)
+    lap_time = laps['LapTime'].dt.total_seconds()
+    green = (laps['TrackStatus'] == '1') & lap_time.notna()
+    normal = green & laps['PitInTime'].isna() & laps['PitOutTime'].isna() & (laps['LapNumber'] > 1)
+    reference = lap_time[normal].groupby(laps.loc[normal, 'Driver'], observed=True).median()
+
+    in_laps = pd.DataFrame({'Driver': laps['Driver'], 'LapNumber': laps['LapNumber'] + 1, 'InLap': lap_time})
+    in_laps = in_laps[green & laps['PitInTime'].notna()]
+    out_laps = pd.DataFrame({'Driver': laps['Driver'], 'LapNumber': laps['LapNumber'], 'OutLap': lap_time})
+    out_laps = out_laps[green & laps['PitOutTime'].notna()]
+    stops = in_laps.merge(out_laps, on=['Driver', 'LapNumber'])
+    stops['PitLoss'] = stops['InLap'] + stops['OutLap'] - 2 * stops['Driver'].map(reference).to_numpy(dtype=float)
+    stops['LapNumber'] -= 1
+    return stops.dropna(subset=['PitLoss']).reset_index(drop=True)[['Driver', 'LapNumber', 'PitLoss']]
+
+
+def _grid(total_laps, n_compounds, stops, pit_step, min_stint, two_compounds):
+    # Voltas de parada possíveis (combinações x stops) e sequências de compostos (sequências x stints)
+    grid = range(min_stint, total_laps - min_stint + 1, pit_step)
+    pits = np.array(list(itertools.combinations(grid, stops)), dtype=int).reshape(-1, stops)
+    bounds = np.column_stack([np.zeros(len(pits), dtype=int), pits, np.full(len(pits), total_laps)])
+    pits = pits[(np.diff(bounds, axis=1) >= min_stint).all(axis=1)]
+
+    sequences = np.array(list(itertools.product(range(n_compounds), repeat=stops + 1)), dtype=int)
+    if two_compounds:
+        sequences = sequences[(sequences != sequences[:, :1]).any(axis=1)]
+    return pits, sequences
+
+
+def strategies(total_laps: int, n_compounds: int, stops: int, pit_step: int = 2, min_stint: int = 8,
+               two_compounds: bool = True):
+    # Todas as estratégias com `stops` paradas: voltas de parada (grade de pit_step, stints >= min_stint)
+    # x sequências de compostos (índices), com dois compostos diferentes se exigido
+    pits, sequences = _grid(total_laps, n_compounds, stops, pit_step, min_stint, two_compounds)
+    return np.repeat(pits, len(sequences), axis=0), np.tile(sequences, (len(pits), 1))
+
+
+def _elapsed(pits, tyres, total_laps, base, rate):
+    # Tempo acumulado no fim de cada volta (estratégias x voltas + 1, começando em 0), sem paradas
+    lap = np.arange(1, total_laps + 1)
+    stint = (lap[None, None, :] > pits[:, :, None]).sum(axis=1)
+    starts = np.column_stack([np.zeros(len(pits), dtype=int), pits])
+    age = lap[None, :] - np.take_along_axis(starts, stint, axis=1)
+    compound = np.take_along_axis(tyres, stint, axis=1)
+    fuel = FUEL_SECONDS_PER_KG * (FUEL_START_KG - lap * (FUEL_START_KG / total_laps))
+    lap_time = base[compound] + rate[compound] * age + fuel[None, :]
+    return np.concatenate([np.zeros((len(pits), 1)), np.cumsum(lap_time, axis=1)], axis=1)
+
+
+def _expected_times(chunk, total_laps, base, rate, pit_loss, pit_std, scenarios):
+    # Tempo sem safety car e tempo médio nos cenários; o tempo é linear nos termos do cenário,
+    # então a média sai de elapsed @ pesos, sem a matriz estratégias x cenários
+    pits, tyres = chunk
+    n_stops = pits.shape[1]
+    elapsed = _elapsed(pits, tyres, total_laps, base, rate)
+    green_time = elapsed[:, -1] + n_stops * pit_loss
+
+    sc_start, sc_end, noise = scenarios
+    has_sc = sc_start > 0
+    n_scenarios = len(sc_start)
+    weights = (np.bincount(sc_end[has_sc], minlength=total_laps + 1)
+               - np.bincount(sc_start[has_sc] - 1, minlength=total_laps + 1)) / n_scenarios
+    coverage = np.cumsum(np.bincount(sc_start[has_sc], minlength=total_laps + 2)
+                         - np.bincount(sc_end[has_sc] + 1, minlength=total_laps + 2))[:total_laps + 1] / n_scenarios
+    sc_laps = np.where(has_sc, sc_end - sc_start + 1, 0)
+    expected = (green_time - elapsed @ weights + sc_laps.mean() * SAFETY_CAR_LAP_FACTOR * base.min()
+                - coverage[pits].sum(axis=1) * pit_loss * (1 - SAFETY_CAR_PIT_FACTOR)
+                + noise.mean() * pit_std * np.sqrt(n_stops))
+    return green_time, expected
+
+
+def _race_times(chunk, total_laps, base, rate, pit_loss, pit_std, scenarios):
+    # Tempo de corrida de cada estratégia (linhas) em cada cenário (colunas)
+    pits, tyres = chunk
+    n_stops = pits.shape[1]
+    elapsed = _elapsed(pits, tyres, total_laps, base, rate)
+    green_time = elapsed[:, -1] + n_stops * pit_loss
+
+    # Voltas sob safety car valem o mesmo para todos; a estratégia perde as voltas normais que
+    # teria feito na janela e ganha nas paradas feitas dentro dela
+    sc_start, sc_end, noise = scenarios
+    has_sc = sc_start > 0
+    sc_laps = np.where(has_sc, sc_end - sc_start + 1, 0)
+    skipped = elapsed[:, sc_end] - elapsed[:, np.maximum(sc_start - 1, 0)]
+    under_sc = ((pits[:, :, None] >= sc_start) & (pits[:, :, None] <= sc_end)).sum(axis=1)
+    return (green_time[:, None] - np.where(has_sc, skipped, 0)
+            + sc_laps * SAFETY_CAR_LAP_FACTOR * base.min()
+            - np.where(has_sc, under_sc, 0) * pit_loss * (1 - SAFETY_CAR_PIT_FACTOR)
+            + noise[None, :] * pit_std * np.sqrt(n_stops))
+
+
+class StrategySimulator:
+    # Tempo de prova (Monte Carlo) das estratégias: volta = BaseLapTime + Rate * TyreLife + combustível + offset,
+    # com o DegradationModel e a perda mediana nos boxes da sessão; todas contra os mesmos cenários de safety car
+    def __init__(self, laps, total_laps: int, model: Optional[DegradationModel] = None, offset: float = 0.0,
+                 safety_car_probability: float = SAFETY_CAR_PROBABILITY):
+        if model is None:
+            model = DegradationModel(laps, total_laps)
+        self.total_laps = int(total_laps)
+        self.safety_car_probability = safety_car_probability
+        compounds = model.compounds[model.compounds['Compound'].isin(DRY_COMPOUNDS)
+                                    & model.compounds['Rate'].notna()]
+        self.compounds = compounds['Compound'].tolist()
+        self.base = compounds['BaseLapTime'].to_numpy(dtype=float) + offset
+        self.rate = compounds['Rate'].to_numpy(dtype=float)
+
+        self.stops = pit_losses(laps)
+        if len(self.stops):
+            self.pit_loss = float(self.stops['PitLoss'].median())
+            self.pit_std = float(self.stops['PitLoss'].std()) if len(self.stops) > 1 else 0.0
+        else:
+            self.pit_loss, self.pit_std = DEFAULT_PIT_LOSS, 0.0
+
+    def scenarios(self, n_simulations: int, seed: Optional[int] = None):
+        # (início do SC, fim do SC, ruído das paradas) de cada simulação; início 0 = sem SC
+        rng = np.random.default_rng(seed)
+        has_sc = rng.random(n_simulations) < self.safety_car_probability
+        sc_start = np.where(has_sc, rng.integers(1, self.total_laps + 1, n_simulations), 0)
+        sc_end = np.where(has_sc, np.minimum(sc_start + SAFETY_CAR_LAPS - 1, self.total_laps), 0)
+        return sc_start, sc_end, rng.standard_normal(n_simulations)
+
+    def simulate(self, n_simulations: int = 1000, stops: tuple = (1, 2, 3), pit_step: int = 2, min_stint: int = 8,
+                 seed: Optional[int] = None, workers: Optional[int] = None, chunk_size: int = 5000,
+                 distribution: int = 1000):
+        # Ranking das estratégias (melhor primeiro, GapToBest em s); Std, P10 e P90 só nas `distribution` melhores
+        if not self.compounds:
+            raise ValueError("No compound with a fitted degradation rate")
+        scenarios = self.scenarios(n_simulations, seed)
+        arguments = dict(total_laps=self.total_laps, base=self.base, rate=self.rate, pit_loss=self.pit_loss,
+                         pit_std=self.pit_std, scenarios=scenarios)
+        groups, chunks, labels = [], [], []
+        for n_stops in stops:
+            pits, sequences = _grid(self.total_laps, len(self.compounds), n_stops, pit_step, min_stint,
+                                    two_compounds=len(self.compounds) > 1)
+            pits, tyres = np.repeat(pits, len(sequences), axis=0), np.tile(sequences, (len(pits), 1))
+            groups.append((pits, tyres))
+            for start in range(0, len(pits), chunk_size):
+                chunks.append((pits[start:start + chunk_size], tyres[start:start + chunk_size]))
+            # rótulos das combinações distintas, repetidos na mesma ordem das estratégias
+            pit_laps = ['-'.join(str(lap) for lap in row) for row in pits[::max(len(sequences), 1)]]
+            compounds = ['-'.join(self.compounds[idx] for idx in row) for row in sequences]
+            labels.append(pd.DataFrame({'Stops': n_stops, 'Compounds': np.tile(compounds, len(pit_laps)),
+                                        'PitLaps': np.repeat(pit_laps, len(sequences))}))
+
+        if not chunks:
+            # nenhuma estratégia cabe em total_laps com esse min_stint: ranking vazio
+            return pd.DataFrame(columns=['Stops', 'Compounds', 'PitLaps', 'GreenTime', 'ExpectedTime', 'Std', 'P10',
+                                         'P90', 'GapToBest'])
+        if workers == 1 or len(chunks) <= 1:
+            results = [_expected_times(chunk, **arguments) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(chunks))) as pool:
+                results = list(pool.map(partial(_expected_times, **arguments), chunks))
+
+        ranking = pd.concat(labels, ignore_index=True)
+        ranking['GreenTime'] = np.concatenate([green_time for green_time, _ in results])
+        ranking['ExpectedTime'] = np.concatenate([expected for _, expected in results])
+        for column in ('Std', 'P10', 'P90'):
+            ranking[column] = np.nan
+
+        # Distribuição completa (estratégias x simulações) só das melhores, grupo a grupo
+        best = np.argsort(ranking['ExpectedTime'].to_numpy(), kind='mergesort')[:distribution]
+        offsets = np.cumsum([0] + [len(pits) for pits, _ in groups])
+        for idx, (pits, tyres) in enumerate(groups):
+            rows = best[(best >= offsets[idx]) & (best < offsets[idx + 1])]
+            if len(rows) == 0:
+                continue
+            times = _race_times((pits[rows - offsets[idx]], tyres[rows - offsets[idx]]), **arguments)
+            ranking.loc[rows, 'Std'] = times.std(axis=1)
+            ranking.loc[rows, 'P10'], ranking.loc[rows, 'P90'] = np.percentile(times, [10, 90], axis=1)
+
+        ranking = ranking.sort_values('ExpectedTime', kind='mergesort').reset_index(drop=True)
+        ranking['GapToBest'] = ranking['ExpectedTime'] - ranking['ExpectedTime'].min()
+        return ranking
@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+class TelemetryStore:
+    #
+    # Columnar on-disk store of derived per-lap telemetry for one session.
+    #
+    # Each write creates a segment directory with one .npy file per channel, holding
+    # the samples of all laps written together. index.json maps every (driver, lap)
+    # to its segment and row range. Reads use memory maps, so opening a session that
+    # was already processed does not touch the FastF1 cache.
+    #
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+        self.index_path = os.path.join(self.path, 'index.json')
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        else:
+            self._index = {'segments': [], 'laps': {}}
+        self._segments = dict()
+
+    def __contains__(self, key):
+        drv, lap_number = key
+        return str(int(lap_number)) in self._index['laps'].get(drv, {})
+
+    def laps(self):
+        return [(drv, int(lap_number)) for drv, laps in self._index['laps'].items() for lap_number in laps]
+
+    def channels(self, drv, lap_number):
+        segment = self._index['laps'][drv][str(int(lap_number))][0]
+        return list(self._index['segments'][segment])
+
+    def write_laps(self, telemetry):
+        # telemetry: {(piloto, volta): DataFrame}
+        telemetry = {key: tel for key, tel in telemetry.items() if key not in self}
+        if not telemetry:
+            return
+
+        segment = len(self._index['segments'])
+        segment_dir = os.path.join(self.path, f'segment_{segment:04d}')
+        os.makedirs(segment_dir, exist_ok=True)
+
+        frames = [pd.DataFrame(tel).reset_index(drop=True) for tel in telemetry.values()]
+        data = pd.concat(frames, ignore_index=True)
+        for channel in data.columns:
+            values = data[channel].to_numpy()
+            if values.dtype == object:
+                # strings are stored as fixed width unicode so they can be memory mapped too
+                values = data[channel].fillna('').astype(str).to_numpy().astype(str)
+            np.save(os.path.join(segment_dir, f'{channel}.npy'), values)
+
+        start = 0
+        for (drv, lap_number), frame in zip(telemetry, frames):
+            self._index['laps'].setdefault(drv, dict())[str(int(lap_number))] = [segment, start, start + len(frame)]
+            start += len(frame)
+        self._index['segments'].append(list(data.columns))
+        self._save_index()
+
+    def read_lap(self, drv, lap_number, channels=None):
+        segment, start, stop = self._index['laps'][drv][str(int(lap_number))]
+        arrays = self._segment(segment)
+        if channels is None:
+            channels = self._index['segments'][segment]
+        return pd.DataFrame({channel: arrays[channel][start:stop] for channel in channels})
+
+    def _segment(self, segment):
+        if segment not in self._segments:
+            segment_dir = os.path.join(self.path, f'segment_{segment:04d}')
+            self._segments[segment] = {
+                channel: np.load(os.path.join(segment_dir, f'{channel}.npy'), mmap_mode='r')
+                for channel in self._index['segments'][segment]
+            }
+        return self._segments[segment]
+
+    def _save_index(self):
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
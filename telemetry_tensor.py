@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from aceleration import to_seconds
+
+
+class TelemetryTensor:
+    #
+    # Laps of any number of drivers resampled onto one distance grid.
+    #
+    #   data      (laps x channels x distance bins), channels in `channels`
+    #   time      (laps x distance bins), seconds since the start of each lap
+    #   distance  grid in meters, every `step` meters from the start line
+    #
+    # Bins past the end of a lap are NaN. All laps are resampled with a single
+    # np.interp per channel: each lap is shifted to its own distance range so the
+    # concatenated samples stay increasing.
+    #
+    channels = ('Speed', 'Throttle', 'Brake', 'nGear', 'LonAcc', 'LatAcc')
+
+    def __init__(self, keys: list, telemetries: list, accelerations: list, step: float = 5.0):
+        # keys: (piloto, volta) de cada telemetria; accelerations: (longitudinal, lateral) de cada uma
+        self.keys = [(drv, int(lap_number)) for drv, lap_number in keys]
+        self.drivers = [drv for drv, _ in self.keys]
+        self.step = step
+
+        if not telemetries:
+            raise ValueError("TelemetryTensor needs at least one lap")
+        lengths = np.array([len(tel) for tel in telemetries])
+        if not lengths.all():
+            raise ValueError(f"No telemetry samples for {[key for key, n in zip(self.keys, lengths) if n == 0]}")
+        distance = np.concatenate([tel['Distance'].to_numpy(dtype=float) for tel in telemetries])
+        lap_of_sample = np.repeat(np.arange(len(telemetries)), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        ends = starts + lengths - 1
+        lap_start = distance[starts]
+        lap_end = distance[ends]
+
+        self.distance = np.arange(0, np.max(lap_end), step)
+        span = self.distance[-1] + 2 * step - min(np.min(lap_start), 0)
+        offsets = np.arange(len(telemetries)) * span
+        sample_x = distance + offsets[lap_of_sample]
+        grid_x = (self.distance[None, :] + offsets[:, None]).ravel()
+        valid = (self.distance[None, :] >= lap_start[:, None]) & (self.distance[None, :] <= lap_end[:, None])
+
+        # nGear usa a última amostra antes do ponto, os demais canais são interpolados
+        previous = np.clip(np.searchsorted(sample_x, grid_x, side='right') - 1, 0, len(sample_x) - 1)
+        values = {
+            'Speed': np.concatenate([tel['Speed'].to_numpy(dtype=float) for tel in telemetries]),
+            'Throttle': np.concatenate([tel['Throttle'].to_numpy(dtype=float) for tel in telemetries]),
+            'Brake': np.concatenate([tel['Brake'].to_numpy(dtype=float) for tel in telemetries]),
+            'nGear': np.concatenate([tel['nGear'].to_numpy(dtype=float) for tel in telemetries]),
+            'LonAcc': np.concatenate([np.asarray(lon, dtype=float) for lon, _ in accelerations]),
+            'LatAcc': np.concatenate([np.asarray(lat, dtype=float) for _, lat in accelerations]),
+        }
+        time = np.concatenate([to_seconds(tel['Time']) for tel in telemetries])
+
+        shape = (len(telemetries), len(self.distance))
+        self.data = np.empty((len(telemetries), len(self.channels), len(self.distance)))
+        for idx, channel in enumerate(self.channels):
+            if channel == 'nGear':
+                resampled = values[channel][previous]
+            else:
+                resampled = np.interp(grid_x, sample_x, values[channel])
+            self.data[:, idx] = np.where(valid, resampled.reshape(shape), np.nan)
+        self.time = np.where(valid, np.interp(grid_x, sample_x, time).reshape(shape), np.nan)
+
+    def _row(self, reference):
+        # índice da volta de referência: posição, piloto ou (piloto, volta)
+        if isinstance(reference, (int, np.integer)):
+            return int(reference)
+        if isinstance(reference, tuple):
+            return self.keys.index((reference[0], int(reference[1])))
+        return self.drivers.index(reference)
+
+    def channel(self, name: str):
+        return self.data[:, self.channels.index(name)]
+
+    def delta(self, reference=0):
+        # Diferença de todos os canais para a volta de referência (laps x channels x bins)
+        return self.data - self.data[self._row(reference)]
+
+    def time_delta(self, reference=0):
+        # Tempo ganho (< 0) ou perdido (> 0) para a volta de referência ao longo da volta (s)
+        return self.time - self.time[self._row(reference)]
+
+    def dominance(self, n_minisectors: int = 25):
+        # Piloto mais rápido em cada mini setor (menor tempo entre as bordas); None usa cada bin
+        n_bins = len(self.distance)
+        if n_minisectors is None:
+            edges = np.arange(n_bins)
+        else:
+            edges = np.unique(np.linspace(0, n_bins - 1, n_minisectors + 1).round().astype(int))
+        duration = np.diff(self.time[:, edges], axis=1)
+        fastest = np.argmin(np.where(np.isnan(duration), np.inf, duration), axis=0)
+        covered = ~np.isnan(duration).all(axis=0)
+        return pd.DataFrame({
+            'Start': self.distance[edges[:-1]],
+            'End': self.distance[edges[1:]],
+            'Driver': np.where(covered, np.array(self.drivers, dtype=object)[fastest], None),
+            'Duration': np.where(covered, duration[fastest, np.arange(len(fastest))], np.nan),
+        })